@@ -30,9 +30,12 @@ __email__      = 'oval@arch.ethz.ch'
 __all__ = [
 	'densification',
 	'densify_quad_mesh',
+	'densify_quad_mesh_chunks',
+	'face_coons_patch',
+	'patch_boundary_key',
 ]
 
-def densify_quad_mesh(mesh):
+def densify_quad_mesh(mesh, budget = None):
 	"""Generate dense quad mesh from coarse quad mesh
 	based on strip density parameters already stored as edge attributes.
 
@@ -40,24 +43,150 @@ def densify_quad_mesh(mesh):
 	----------
 	mesh : CoarseQuadMesh
 		A coarse quad mesh to densify.
+	budget : int, optional
+		A memory budget in bytes for the dense mesh, checked against its predicted size before densifying.
 
 	Returns
 	-------
 	QuadMesh
 		A dense quad mesh.
+
+	Raises
+	------
+	ValueError
+		If the predicted memory of the dense mesh exceeds the budget.
+
 	"""
 
+	if budget is not None:
+		size = mesh.dense_mesh_size()
+		if size['memory'] > budget:
+			raise ValueError('The dense mesh with {} faces would need about {} bytes, above the budget of {} bytes.'.format(size['faces'], size['memory'], budget))
+
+	return _densify_faces(mesh, list(mesh.faces()))
+
+def densify_quad_mesh_chunks(mesh, budget):
+	"""Generate dense quad meshes from chunks of faces of a coarse quad mesh, each one within a memory budget.
+
+	The chunks are groups of neighbouring faces, and their dense meshes match along their common boundaries.
+
+	Parameters
+	----------
+	mesh : CoarseQuadMesh
+		A coarse quad mesh to densify.
+	budget : int
+		A memory budget in bytes per dense mesh.
+
+	Returns
+	-------
+	list
+		The dense quad meshes, one per chunk.
+
+	Raises
+	------
+	ValueError
+		If the dense mesh of a single face exceeds the budget.
+
+	"""
+
+	return [_densify_faces(mesh, fkeys) for fkeys in mesh.dense_mesh_chunks(budget)]
+
+def _densify_faces(mesh, fkeys):
+
 	meshes = []
 
-	for fkey in mesh.faces():
-		ab, bc, cd, da = [[mesh.edge_point(u, v, float(i) / float(mesh.get_edge_attribute((u, v), 'density_parameter'))) for i in range(0, mesh.get_edge_attribute((u, v), 'density_parameter') + 1)] for u, v in mesh.face_halfedges(fkey)]
-		vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
+	for fkey in fkeys:
+		vertices, faces, density_parameters = face_coons_patch(mesh, fkey)
 		meshes.append(QuadMesh.from_vertices_and_faces(vertices, faces))
 
 	vertices, face_vertices = join_and_weld_meshes(meshes)
 	
 	return QuadMesh.from_vertices_and_faces(vertices, face_vertices)
 
+def face_coons_patch(mesh, fkey, resolution = 1.):
+	"""Generate the dense patch of a face of a coarse quad mesh
+	based on the density parameters of its edges.
+
+	Parameters
+	----------
+	mesh : CoarseQuadMesh
+		A coarse quad mesh with density parameters stored as edge attributes.
+	fkey : int
+		A face key.
+	resolution : float, optional
+		A factor on the density parameters, for coarser or finer levels of detail.
+
+	Returns
+	-------
+	vertices : list
+		The vertex coordinates of the patch.
+	faces : list
+		The faces of the patch, as lists of vertex indices.
+	(n, m) : tuple
+		The numbers of subdivisions along the first and the second edge of the face.
+		The patch vertex at i / n along the first edge and at j / m along the second edge has the index i * (m + 1) + j.
+
+	"""
+
+	polylines = []
+	for u, v in mesh.face_halfedges(fkey):
+		density_parameter = max(1, int(round(mesh.get_edge_attribute((u, v), 'density_parameter') * resolution)))
+		polylines.append([mesh.edge_point(u, v, float(i) / float(density_parameter)) for i in range(0, density_parameter + 1)])
+	ab, bc, cd, da = polylines
+
+	vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
+
+	return vertices, faces, (len(ab) - 1, len(bc) - 1)
+
+def patch_boundary_key(face_vertices, n, m, i, j):
+	"""Return the topological key of a point on the boundary of the dense patch of a coarse face,
+	to identify the points shared by the patches of neighbouring faces without comparing coordinates.
+
+	Parameters
+	----------
+	face_vertices : list
+		The vertices [a, b, c, d] of the coarse face.
+	n, m : int
+		The numbers of subdivisions along ab and along bc.
+	i, j : int
+		The position of the point in the patch.
+
+	Returns
+	-------
+	key : int, tuple, None
+		The coarse vertex key for a corner, (u, v, k) for the k-th point along the coarse edge (u, v) with u < v,
+		None for an inner point.
+
+	"""
+
+	a, b, c, d = face_vertices
+
+	if (i, j) == (0, 0):
+		return a
+	if (i, j) == (n, 0):
+		return b
+	if (i, j) == (n, m):
+		return c
+	if (i, j) == (0, m):
+		return d
+
+	if j == 0:
+		u, v, k, length = a, b, i, n
+	elif i == n:
+		u, v, k, length = b, c, j, m
+	elif j == m:
+		u, v, k, length = d, c, i, n
+	elif i == 0:
+		u, v, k, length = a, d, j, m
+	else:
+		return None
+
+	# the parameter along the edge from its lower vertex key, shared by the two faces of the edge
+	if u > v:
+		return (v, u, length - k)
+
+	return (u, v, k)
+
 def densification(mesh, target_length, custom = True):
 	"""Densifies a quad mesh based on a target length.
 	
@@ -0,0 +1,229 @@
+from compas.geometry.algorithms.interpolation import discrete_coons_patch
+
+from compas_pattern.datastructures.quad_mesh import QuadMesh
+
+from compas_pattern.algorithms.densification import face_coons_patch
+from compas_pattern.algorithms.densification import patch_boundary_key
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'DensificationCache',
+]
+
+class DensificationCache(object):
+    """The dense mesh of a coarse quad mesh, updated in place after a change of density parameters.
+
+    The patch of each coarse face is remembered with the density parameters it was generated from.
+    After a change, only the faces whose density parameters differ are densified again:
+    their dense faces and the vertices used only by them are deleted and the new patches are spliced in,
+    sharing the points of the unchanged coarse vertices and edges.
+    The other vertices keep their keys, so that their positions can be carried over, for instance to warm-start a smoothing.
+
+    Parameters
+    ----------
+    mesh : CoarseQuadMesh
+        A coarse quad mesh with density parameters stored as edge attributes.
+
+    Attributes
+    ----------
+    dense : QuadMesh
+        The dense mesh.
+
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.dense = QuadMesh()
+        # dense vertex key of each point on the coarse vertices and edges, and the other way around
+        self._point_vertex = {}
+        self._vertex_point = {}
+        # per coarse face, the density parameters, the dense vertices and the dense faces of its patch
+        self._face_parameters = {}
+        self._face_vertices = {}
+        self._face_faces = {}
+
+        self.update(list(self.mesh.faces()))
+
+    def _density_parameters(self, fkey):
+        return tuple([self.mesh.get_edge_attribute((u, v), 'density_parameter') for u, v in self.mesh.face_halfedges(fkey)])
+
+    def stale_faces(self):
+        """The faces whose patch is missing or out of date.
+
+        Returns
+        -------
+        fkeys : list
+            The coarse faces with new density parameters, added faces and deleted faces.
+
+        """
+
+        fkeys = [fkey for fkey in self.mesh.faces() if self._face_parameters.get(fkey) != self._density_parameters(fkey)]
+        fkeys += [fkey for fkey in self._face_parameters if fkey not in self.mesh.face]
+
+        return fkeys
+
+    def update(self, fkeys = None):
+        """Densify again the faces whose density parameters changed and splice their patches in the dense mesh.
+
+        Parameters
+        ----------
+        fkeys : list, optional
+            The coarse faces to densify again. The stale faces by default.
+
+        Returns
+        -------
+        changes : dict
+            The coarse 'faces' densified again or removed, and the 'added' and 'removed' dense vertex keys.
+
+        """
+
+        if fkeys is None:
+            fkeys = self.stale_faces()
+
+        # remove the old patches and the vertices not used by the other patches
+        candidates = set()
+        for fkey in fkeys:
+            if fkey not in self._face_parameters:
+                continue
+            for dense_fkey in self._face_faces[fkey]:
+                self.dense.delete_face(dense_fkey)
+            candidates.update(self._face_vertices[fkey])
+            del self._face_parameters[fkey]
+            del self._face_vertices[fkey]
+            del self._face_faces[fkey]
+
+        removed = []
+        for vkey in candidates:
+            if len(self.dense.halfedge[vkey]) == 0:
+                self.dense.delete_vertex(vkey)
+                key = self._vertex_point.pop(vkey, None)
+                if key is not None:
+                    del self._point_vertex[key]
+                removed.append(vkey)
+
+        # add the new patches, sharing the points on the coarse vertices and edges
+        added = []
+        for fkey in fkeys:
+            if fkey not in self.mesh.face:
+                continue
+            face_vertices = self.mesh.face_vertices(fkey)
+            vertices, faces, (n, m) = face_coons_patch(self.mesh, fkey)
+
+            local_to_global = []
+            for k, (x, y, z) in enumerate(vertices):
+                key = patch_boundary_key(face_vertices, n, m, k // (m + 1), k % (m + 1))
+                if key is not None and key in self._point_vertex:
+                    local_to_global.append(self._point_vertex[key])
+                    continue
+                vkey = self.dense.add_vertex(attr_dict = {'x': x, 'y': y, 'z': z})
+                if key is not None:
+                    self._point_vertex[key] = vkey
+                    self._vertex_point[vkey] = key
+                local_to_global.append(vkey)
+                added.append(vkey)
+
+            self._face_parameters[fkey] = self._density_parameters(fkey)
+            self._face_vertices[fkey] = local_to_global
+            self._face_faces[fkey] = [self.dense.add_face([local_to_global[k] for k in face]) for face in faces]
+
+        return {'faces': fkeys, 'added': added, 'removed': removed}
+
+    def dense_vertex(self, key):
+        """The dense vertex on a coarse vertex or on a coarse edge.
+
+        Parameters
+        ----------
+        key : int, tuple
+            A coarse vertex key, or (u, v, k) for the k-th point along the coarse edge (u, v) with u < v.
+
+        Returns
+        -------
+        int
+            The dense vertex key, None if there is none.
+
+        """
+
+        return self._point_vertex.get(key)
+
+    def _face_coons_weights(self, fkey, corner_values):
+        # the Coons patch of values at the corners of a face, linear along its edges
+
+        polylines = []
+        for (u, v), (value_u, value_v), density_parameter in zip(self.mesh.face_halfedges(fkey), zip(corner_values, corner_values[1:] + corner_values[:1]), self._face_parameters[fkey]):
+            density_parameter = max(1, int(round(density_parameter)))
+            polylines.append([[value_u[i] + float(k) / float(density_parameter) * (value_v[i] - value_u[i]) for i in range(3)] for k in range(0, density_parameter + 1)])
+        ab, bc, cd, da = polylines
+
+        vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
+
+        return vertices
+
+    def prolongation(self):
+        """The weights of the coarse vertices in the position of each dense vertex, through the Coons patches of the faces.
+
+        The Coons patch of a face is linear in the positions of its corners,
+        so that it interpolates any value at the coarse vertices, like a displacement, on the dense vertices.
+
+        Returns
+        -------
+        weights : dict
+            The weights of the coarse vertices per dense vertex {dense_vertex_key: {vertex_key: weight}}.
+
+        """
+
+        weights = {}
+        for fkey, vkeys in self._face_vertices.items():
+            a, b, c, d = self.mesh.face_vertices(fkey)
+            # the weights of three corners at once, one per coordinate, then of the fourth corner
+            abc = self._face_coons_weights(fkey, [[1., 0., 0.], [0., 1., 0.], [0., 0., 1.], [0., 0., 0.]])
+            d_ = self._face_coons_weights(fkey, [[0., 0., 0.], [0., 0., 0.], [0., 0., 0.], [1., 0., 0.]])
+
+            for vkey, (wa, wb, wc), (wd, _, _) in zip(vkeys, abc, d_):
+                if vkey in weights:
+                    continue
+                vertex_weights = {}
+                for corner, weight in zip([a, b, c, d], [wa, wb, wc, wd]):
+                    if abs(weight) > 1e-12:
+                        vertex_weights[corner] = vertex_weights.get(corner, 0.) + weight
+                weights[vkey] = vertex_weights
+
+        return weights
+
+    def change_density_parameter(self, strip, new_density_parameter):
+        """Change the density parameter in a strip and densify again the faces crossed by the strip.
+
+        Parameters
+        ----------
+        strip : int
+            The key of the strip.
+        new_density_parameter : int
+            The new density parameter.
+
+        Returns
+        -------
+        changes : dict
+            The changes of the dense mesh, as returned by update.
+
+        """
+
+        self.mesh.change_density_parameter(strip, new_density_parameter)
+
+        fkeys = []
+        for u, v in self.mesh.strips_to_edges_dict()[strip]:
+            for fkey in [self.mesh.halfedge[u][v], self.mesh.halfedge[v][u]]:
+                if fkey is not None and fkey not in fkeys:
+                    fkeys.append(fkey)
+
+        return self.update(fkeys)
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
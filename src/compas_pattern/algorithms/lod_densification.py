@@ -0,0 +1,219 @@
+from collections import OrderedDict
+
+from compas_pattern.datastructures.quad_mesh import QuadMesh
+
+from compas_pattern.algorithms.densification import face_coons_patch
+from compas_pattern.algorithms.densification import patch_boundary_key
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'DenseMeshView',
+]
+
+class DenseMeshView(object):
+    """A lazy view of the dense mesh of a coarse quad mesh, densifying a face only when it is queried.
+
+    The patches are cached per face and per resolution, so that several levels of detail can be kept at once,
+    like a coarse one for display and a fine one for export.
+    A cached patch is reused as long as the corners and the density parameters of its face do not change.
+    The least recently used patches are evicted once the cached patches exceed the capacity.
+
+    Parameters
+    ----------
+    mesh : CoarseQuadMesh
+        A coarse quad mesh with density parameters stored as edge attributes.
+    capacity : int, optional
+        The maximum number of dense faces in the cache.
+
+    """
+
+    def __init__(self, mesh, capacity = 100000):
+        self.mesh = mesh
+        self.capacity = capacity
+        self._patches = OrderedDict()
+        self._size = 0
+        self._statistics = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _face_signature(self, fkey, resolution):
+        # the data a face patch depends on, to detect stale patches
+        signature = []
+        for u, v in self.mesh.face_halfedges(fkey):
+            signature.append(tuple(self.mesh.vertex_coordinates(u)))
+            signature.append(max(1, int(round(self.mesh.get_edge_attribute((u, v), 'density_parameter') * resolution))))
+
+        return tuple(signature)
+
+    def face_patch(self, fkey, resolution = 1.):
+        """The dense patch of a face, from the cache or densified on demand.
+
+        Parameters
+        ----------
+        fkey : int
+            A face key of the coarse mesh.
+        resolution : float, optional
+            A factor on the density parameters, for coarser or finer levels of detail.
+
+        Returns
+        -------
+        vertices, faces, (n, m)
+            The patch, as returned by face_coons_patch, to read but not to modify.
+
+        """
+
+        key = (fkey, resolution)
+        signature = self._face_signature(fkey, resolution)
+
+        if key in self._patches:
+            cached_signature, patch = self._patches.pop(key)
+            self._size -= len(patch[1])
+            if cached_signature == signature:
+                self._statistics['hits'] += 1
+                self._patches[key] = (signature, patch)
+                self._size += len(patch[1])
+                return patch
+
+        self._statistics['misses'] += 1
+        patch = face_coons_patch(self.mesh, fkey, resolution)
+        self._patches[key] = (signature, patch)
+        self._size += len(patch[1])
+        self._evict()
+
+        return patch
+
+    def _evict(self):
+        # remove the least recently used patches, but always keep the last one
+        while self._size > self.capacity and len(self._patches) > 1:
+            key, (signature, patch) = self._patches.popitem(last = False)
+            self._size -= len(patch[1])
+            self._statistics['evictions'] += 1
+
+    def strip_faces(self, strip):
+        """The faces crossed by a strip.
+
+        Parameters
+        ----------
+        strip : hashable
+            A strip key, as stored in the 'strip' edge attribute.
+
+        Returns
+        -------
+        fkeys : list
+            The keys of the faces on either side of the edges of the strip.
+
+        """
+
+        fkeys = []
+        for u, v in self.mesh.strips_to_edges_dict().get(strip, []):
+            for fkey in [self.mesh.halfedge[u][v], self.mesh.halfedge[v][u]]:
+                if fkey is not None and fkey not in fkeys:
+                    fkeys.append(fkey)
+
+        return fkeys
+
+    def strip_patches(self, strip, resolution = 1.):
+        """The dense patches of the faces crossed by a strip.
+
+        Parameters
+        ----------
+        strip : hashable
+            A strip key, as stored in the 'strip' edge attribute.
+        resolution : float, optional
+            A factor on the density parameters.
+
+        Returns
+        -------
+        patches : dict
+            The patch of each face crossed by the strip.
+
+        """
+
+        return {fkey: self.face_patch(fkey, resolution) for fkey in self.strip_faces(strip)}
+
+    def to_mesh(self, fkeys = None, resolution = 1., cls = QuadMesh):
+        """Build the dense mesh of some faces from their patches.
+
+        The patches are welded along their shared coarse vertices and edges, without comparing coordinates.
+
+        Parameters
+        ----------
+        fkeys : list, optional
+            The keys of the faces to densify. All the faces by default.
+        resolution : float, optional
+            A factor on the density parameters.
+        cls : Mesh, optional
+            The mesh class to instantiate.
+
+        Returns
+        -------
+        mesh
+            The dense mesh.
+
+        """
+
+        if fkeys is None:
+            fkeys = list(self.mesh.faces())
+
+        vertices = []
+        faces = []
+        index = {}
+        for fkey in fkeys:
+            face_vertices = self.mesh.face_vertices(fkey)
+            patch_vertices, patch_faces, (n, m) = self.face_patch(fkey, resolution)
+
+            local_to_global = []
+            for k, xyz in enumerate(patch_vertices):
+                key = patch_boundary_key(face_vertices, n, m, k // (m + 1), k % (m + 1))
+                if key is not None and key in index:
+                    local_to_global.append(index[key])
+                    continue
+                if key is not None:
+                    index[key] = len(vertices)
+                local_to_global.append(len(vertices))
+                vertices.append(xyz)
+
+            faces += [[local_to_global[k] for k in face] for face in patch_faces]
+
+        return cls.from_vertices_and_faces(vertices, faces)
+
+    def clear(self, resolution = None):
+        """Remove the cached patches, of one resolution or of all resolutions.
+
+        Parameters
+        ----------
+        resolution : float, optional
+            The resolution of the patches to remove. All the patches by default.
+
+        """
+
+        for key in list(self._patches.keys()):
+            if resolution is None or key[1] == resolution:
+                signature, patch = self._patches.pop(key)
+                self._size -= len(patch[1])
+
+    def statistics(self):
+        """The cache statistics.
+
+        Returns
+        -------
+        statistics : dict
+            The number of 'hits', 'misses' and 'evictions', the number of cached 'patches' and of their dense 'faces'.
+
+        """
+
+        statistics = dict(self._statistics)
+        statistics['patches'] = len(self._patches)
+        statistics['faces'] = self._size
+
+        return statistics
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
@@ -1,6 +1,23 @@
+import time
+
+from functools import partial
+
+try:
+    from multiprocessing import Pool
+    from multiprocessing.pool import ThreadPool
+
+except ImportError:
+    import platform
+    if platform.python_implementation() != 'IronPython':
+        raise
+    Pool = ThreadPool = None
+
 from compas.datastructures.mesh import Mesh
 
 from compas_pattern.topology.conway_operators import *
+from compas_pattern.topology.conway_arrays import CONWAY_NAMES
+from compas_pattern.topology.conway_arrays import conway_arrays
+from compas_pattern.topology.conway_arrays import conway_operator
 
 __author__     = ['Robin Oval']
 __copyright__  = 'Copyright 2017, Block Research Group - ETH Zurich'
@@ -10,6 +27,8 @@ __email__      = 'oval@arch.ethz.ch'
 
 __all__ = [
     'patterning',
+    'batch_patterning',
+    'patterning_metrics',
 ]
 
 def patterning(mesh, operator):
@@ -19,8 +38,9 @@ def patterning(mesh, operator):
     ----------
     mesh : Mesh
         A planar mesh to transform.
-    operator_name : string
-        An operator for mesh transformation.
+    operator : string
+        An operator for mesh transformation, like 'conway_ambo',
+        or a chain of operators in Conway notation, like 'dajk', applied as a sequence of primitive operators.
 
     Returns
     -------
@@ -51,11 +71,139 @@ def patterning(mesh, operator):
                  }
 
     try:
-        operators[operator](mesh)
-        return mesh
+        if operator in operators:
+            return operators[operator](mesh)
+        return conway_operator(mesh, operator)
     except:
         return mesh
 
+# read-only seed of the batch, set once per worker process
+_SEED = None
+
+def _init_batch_worker(vertices, faces):
+
+    global _SEED
+    _SEED = (vertices, faces)
+
+def _batch_worker(operator):
+
+    vertices, faces = _SEED
+
+    return _batch_job(vertices, faces, operator)
+
+def _batch_job(vertices, faces, operator):
+
+    t0 = time.time()
+    try:
+        vertices, faces = conway_arrays(vertices, faces, operator)
+        error = None
+    except Exception as e:
+        vertices, faces = None, None
+        error = '{}: {}'.format(type(e).__name__, e)
+    t1 = time.time()
+
+    return {
+        'operator': operator,
+        'vertices': vertices,
+        'faces': faces,
+        'time': t1 - t0,
+        'metrics': patterning_metrics(vertices, faces) if error is None else None,
+        'error': error,
+    }
+
+def patterning_metrics(vertices, faces):
+    """Summary metrics of a pattern given as vertex and face arrays.
+
+    Parameters
+    ----------
+    vertices : list
+        The vertex coordinates.
+    faces : list
+        The faces as lists of vertex indices.
+
+    Returns
+    -------
+    metrics : dict
+        The numbers of vertices, edges and faces, the Euler characteristic,
+        and the number of faces per face degree.
+
+    """
+
+    edges = set()
+    degrees = {}
+    for face in faces:
+        n = len(face)
+        degrees[n] = degrees.get(n, 0) + 1
+        for i in range(n):
+            u, v = face[i - 1], face[i]
+            edges.add((u, v) if u < v else (v, u))
+
+    V = len(vertices)
+    E = len(edges)
+    F = len(faces)
+
+    return {'vertices': V, 'edges': E, 'faces': F, 'euler': V - E + F, 'face_degrees': degrees}
+
+def batch_patterning(mesh, operators = None, processes = None, threads = False, as_mesh = False):
+    """Apply many patterning operators or chains of operators on the same seed mesh in parallel.
+
+    The seed is converted once into arrays and shared read-only with the workers.
+    Results are yielded as soon as each operator is finished, in completion order.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A seed mesh.
+    operators : list, optional
+        Operator names, like 'conway_ambo', or chains in Conway notation, like 'dajk'.
+        All the operators by default.
+    processes : int, optional
+        The number of workers. Default is the number of CPUs.
+        0 to run sequentially in the calling thread.
+    threads : bool, optional
+        True to use a thread pool instead of a process pool.
+    as_mesh : bool, optional
+        True to build a mesh for each result, False to keep the vertex and face arrays.
+
+    Yields
+    ------
+    result : dict
+        The operator, the vertices and faces (or the mesh), the time in seconds,
+        the summary metrics and the error message if the operator failed.
+
+    """
+
+    if operators is None:
+        operators = sorted(CONWAY_NAMES.keys())
+
+    vertex_index = {vkey: i for i, vkey in enumerate(mesh.vertices())}
+    vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()]
+    faces = [[vertex_index[vkey] for vkey in mesh.face_vertices(fkey)] for fkey in mesh.faces()]
+
+    # the seed is bound to the jobs of this batch, except in worker processes that do not share memory with it
+    if processes == 0 or Pool is None:
+        job = partial(_batch_job, vertices, faces)
+        results = (job(operator) for operator in operators)
+        pool = None
+    elif threads:
+        pool = ThreadPool(processes)
+        results = pool.imap_unordered(partial(_batch_job, vertices, faces), operators)
+    else:
+        pool = Pool(processes, _init_batch_worker, (vertices, faces))
+        results = pool.imap_unordered(_batch_worker, operators)
+
+    try:
+        for result in results:
+            if as_mesh:
+                result['mesh'] = Mesh.from_vertices_and_faces(result['vertices'], result['faces']) if result['error'] is None else None
+                del result['vertices']
+                del result['faces']
+            yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
 # ==============================================================================
 # Main
 # ==============================================================================
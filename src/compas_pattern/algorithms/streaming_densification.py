@@ -0,0 +1,196 @@
+import shutil
+import struct
+import tempfile
+
+from compas_pattern.algorithms.densification import face_coons_patch
+from compas_pattern.algorithms.densification import patch_boundary_key
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'ObjWriter',
+    'PlyWriter',
+    'densify_quad_mesh_stream',
+]
+
+class ObjWriter(object):
+    """Write a mesh to an OBJ file vertex by vertex and face by face.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the OBJ file.
+    precision : int, optional
+        The number of decimals of the coordinates.
+
+    """
+
+    def __init__(self, filepath, precision = 6):
+        self.filepath = filepath
+        self.precision = precision
+        self.file = None
+
+    def begin(self, number_of_vertices, number_of_faces):
+        self.file = open(self.filepath, 'w')
+        self.file.write('# {} vertices, {} faces\n'.format(number_of_vertices, number_of_faces))
+
+    def write_vertex(self, xyz):
+        self.file.write('v {0:.{3}f} {1:.{3}f} {2:.{3}f}\n'.format(xyz[0], xyz[1], xyz[2], self.precision))
+
+    def write_face(self, vertices):
+        self.file.write('f {}\n'.format(' '.join([str(i + 1) for i in vertices])))
+
+    def end(self):
+        self.file.close()
+        self.file = None
+
+class PlyWriter(object):
+    """Write a mesh to an ASCII or a binary little-endian PLY file vertex by vertex and face by face.
+
+    The PLY format stores all the vertices before the faces,
+    so that the faces are spooled to a temporary file and appended at the end.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the PLY file.
+    binary : bool, optional
+        True for a binary little-endian file, with double coordinates and integer indices.
+        False for an ASCII file.
+    precision : int, optional
+        The number of decimals of the coordinates in an ASCII file.
+
+    """
+
+    def __init__(self, filepath, binary = False, precision = 6):
+        self.filepath = filepath
+        self.binary = binary
+        self.precision = precision
+        self.file = None
+        self.faces = None
+
+    def begin(self, number_of_vertices, number_of_faces):
+        self.file = open(self.filepath, 'wb')
+        self.faces = tempfile.TemporaryFile()
+        header = [
+            'ply',
+            'format {} 1.0'.format('binary_little_endian' if self.binary else 'ascii'),
+            'element vertex {}'.format(number_of_vertices),
+            'property double x',
+            'property double y',
+            'property double z',
+            'element face {}'.format(number_of_faces),
+            'property list uchar int vertex_indices',
+            'end_header',
+        ]
+        self.file.write(('\n'.join(header) + '\n').encode('ascii'))
+
+    def write_vertex(self, xyz):
+        if self.binary:
+            self.file.write(struct.pack('<ddd', xyz[0], xyz[1], xyz[2]))
+        else:
+            self.file.write('{0:.{3}f} {1:.{3}f} {2:.{3}f}\n'.format(xyz[0], xyz[1], xyz[2], self.precision).encode('ascii'))
+
+    def write_face(self, vertices):
+        if self.binary:
+            self.faces.write(struct.pack('<B{}i'.format(len(vertices)), len(vertices), *vertices))
+        else:
+            self.faces.write('{} {}\n'.format(len(vertices), ' '.join([str(i) for i in vertices])).encode('ascii'))
+
+    def end(self):
+        self.faces.seek(0)
+        shutil.copyfileobj(self.faces, self.file)
+        self.faces.close()
+        self.file.close()
+        self.faces = None
+        self.file = None
+
+def densify_quad_mesh_stream(mesh, writer):
+    """Densify a coarse quad mesh face by face and stream the dense mesh to a writer, without building it.
+
+    The points on the boundary of each face patch are indexed by their topological position on the coarse mesh,
+    a coarse vertex or a parameter along a coarse edge, to be written only once.
+    The entries are released as soon as all the faces around the coarse vertex or edge are densified,
+    so that the memory depends on the size of the coarse mesh and its density parameters, not on the size of the dense mesh.
+
+    Parameters
+    ----------
+    mesh : CoarseQuadMesh
+        A coarse quad mesh with density parameters stored as edge attributes.
+    writer : ObjWriter, PlyWriter
+        A writer with begin, write_vertex, write_face and end methods.
+
+    Returns
+    -------
+    size : dict
+        The number of 'vertices' and 'faces' written and the maximum number of indexed boundary points 'peak_index'.
+
+    """
+
+    size = mesh.dense_mesh_size()
+
+    # number of faces left to densify around each coarse vertex and edge
+    remaining = {}
+    for fkey in mesh.faces():
+        for u, v in mesh.face_halfedges(fkey):
+            remaining[u] = remaining.get(u, 0) + 1
+            edge = (u, v) if u < v else (v, u)
+            remaining[edge] = remaining.get(edge, 0) + 1
+
+    writer.begin(size['vertices'], size['faces'])
+
+    index = {}
+    number_of_vertices = 0
+    number_of_faces = 0
+    peak_index = 0
+
+    for fkey in mesh.faces_breadth_first():
+        face_vertices = mesh.face_vertices(fkey)
+        vertices, faces, (n, m) = face_coons_patch(mesh, fkey)
+
+        local_to_global = []
+        for k, xyz in enumerate(vertices):
+            i, j = k // (m + 1), k % (m + 1)
+            key = patch_boundary_key(face_vertices, n, m, i, j)
+            if key is not None and key in index:
+                local_to_global.append(index[key])
+                continue
+            writer.write_vertex(xyz)
+            if key is not None:
+                index[key] = number_of_vertices
+            local_to_global.append(number_of_vertices)
+            number_of_vertices += 1
+
+        for face in faces:
+            writer.write_face([local_to_global[k] for k in face])
+            number_of_faces += 1
+
+        peak_index = max(peak_index, len(index))
+
+        # release the entries of the coarse vertices and edges without faces left to densify
+        for u, v in mesh.face_halfedges(fkey):
+            edge = (u, v) if u < v else (v, u)
+            for key in [u, edge]:
+                remaining[key] -= 1
+                if remaining[key] == 0:
+                    del remaining[key]
+                    if key == u:
+                        index.pop(u, None)
+                    else:
+                        for k in range(1, mesh.get_edge_attribute(edge, 'density_parameter')):
+                            index.pop((edge[0], edge[1], k), None)
+
+    writer.end()
+
+    return {'vertices': number_of_vertices, 'faces': number_of_faces, 'peak_index': peak_index}
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
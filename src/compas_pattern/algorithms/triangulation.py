@@ -4,7 +4,7 @@ from compas.topology import delaunay_from_points
 
 from compas.utilities import geometric_key
 
-from compas_pattern.topology.joining_welding import unweld_mesh_along_edge_path
+from compas_pattern.topology.joining_welding import unweld_mesh_along_edge_paths
 
 from compas_pattern.datastructures.mesh import face_circle
 
@@ -91,8 +91,7 @@ def triangulation(boundary, holes = [], polyline_features = [], point_features =
                 edge_path.append([vertex_path[i], vertex_path[i + 1]])
         edge_paths.append(edge_path)
 
-    for edge_path in edge_paths:
-        unweld_mesh_along_edge_path(delaunay_mesh, edge_path)
+    unweld_mesh_along_edge_paths(delaunay_mesh, edge_paths)
 
     return delaunay_mesh
 
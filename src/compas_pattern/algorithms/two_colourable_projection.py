@@ -2,10 +2,11 @@ import itertools
 import copy
 
 from compas.datastructures.mesh import Mesh
-from compas_pattern.datastructures.mesh import mesh_euler
+from compas_pattern.datastructures.mesh import mesh_topology_invariants
+from compas_pattern.datastructures.pseudo_quad_arrays import PseudoQuadArrays
 
 from compas.datastructures.network import Network
-from compas_pattern.datastructures.network import graph_disjointed_parts
+from compas_pattern.topology.connected_components import connected_components_from_keys
 
 from compas_pattern.topology.polyline_extraction import mesh_boundaries
 
@@ -304,14 +305,8 @@ def mesh_multiple_strip_collapse(cls, mesh, strips_to_collapse):
 	edges_to_collapse = [edge for edge, strip in edges_to_strips.items() if strip in strips_to_collapse]
 	faces_to_collapse = [fkey for fkey, strips in faces_to_strips_dict(mesh).items() if strips[0] in strips_to_collapse or strips[1] in strips_to_collapse]
 
-	# get groups of vertices to merge via graph of edges to collapse
-	graph = Network()
-	for vkey in mesh.vertices():
-		x, y, z = mesh.vertex_coordinates(vkey)
-		graph.add_vertex(key = vkey, attr_dict = {'x': x, 'y': y, 'z': z})
-	for u, v in edges_to_collapse:
-		graph.add_edge(u, v)
-	parts = graph_disjointed_parts(graph)
+	# get groups of vertices to merge via connected components of edges to collapse
+	labels, parts = connected_components_from_keys(list(mesh.vertices()), edges_to_collapse)
 
 	# refine boundaries to avoid collapse
 	to_subdivide = []
@@ -324,11 +319,19 @@ def mesh_multiple_strip_collapse(cls, mesh, strips_to_collapse):
 					if edge not in to_subdivide and edge[::-1] not in to_subdivide:
 						to_subdivide.append(edge)
 	# refine pole points to avoid collapse
-	poles = {u: [] for u, v in mesh.edges() if u == v}
-	for u, v in edges_to_collapse:
-		for pole in poles:
-			if pole in mesh.halfedge[u] and pole in mesh.halfedge[v]:
-				poles[pole].append((u, v))
+	# the poles and the edges opposite to them come from the pole flags of the pseudo-quad faces, without scanning for self-loops
+	arrays = PseudoQuadArrays.from_mesh(mesh)
+	collapse = set(edges_to_collapse)
+	poles = {arrays.vertices[u]: [] for u in arrays.poles()}
+	for h in arrays.face_pole:
+		if h != -1:
+			pole = arrays.vertices[arrays.halfedge_vertex[h]]
+			h = arrays.halfedge_next[h]
+			u = arrays.vertices[arrays.halfedge_vertex[h]]
+			v = arrays.vertices[arrays.halfedge_vertex[arrays.halfedge_next[h]]]
+			for edge in [(u, v), (v, u)]:
+				if edge in collapse and edge not in poles[pole]:
+					poles[pole].append(edge)
 	for pole, pole_edges_to_collapse in poles.items():
 		vertex_faces = list(set(mesh.vertex_faces(pole)))
 		if not mesh.is_vertex_on_boundary(pole):
@@ -388,8 +391,11 @@ def mesh_multiple_strip_collapse(cls, mesh, strips_to_collapse):
 def have_meshes_same_euler(mesh_1, mesh_2):
 	# check if two meshes are manfiold and have the same Euler characteristic
 
-	if mesh_1.is_manifold_corrected() and mesh_2.is_manifold_corrected():
-		if mesh_euler(mesh_1) == mesh_euler(mesh_2):
+	invariants_1 = mesh_topology_invariants(mesh_1)
+	invariants_2 = mesh_topology_invariants(mesh_2)
+
+	if invariants_1['manifold'] and invariants_2['manifold']:
+		if invariants_1['X'] == invariants_2['X']:
 
 			return True
 
@@ -5,6 +5,8 @@ from compas_pattern.datastructures.quad_mesh import QuadMesh
 
 from compas.utilities import geometric_key
 
+from compas.geometry import angle_vectors
+
 __author__     = ['Robin Oval']
 __copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
 __license__    = 'MIT License'
@@ -14,6 +16,11 @@ __all__ = [
 
 ]
 
+# approximate memory per element of a dense QuadMesh in CPython, in bytes
+DENSE_VERTEX_BYTES = 350
+DENSE_EDGE_BYTES = 70
+DENSE_FACE_BYTES = 250
+
 class CoarseQuadMesh(QuadMesh):
 
 	def __init__(self):
@@ -39,24 +46,105 @@ class CoarseQuadMesh(QuadMesh):
 
 		self.set_edges_attribute('density_parameter', density_parameter, list(self.edges()))
 
-	def density_target_length(self, target_length):
+	def density_target_length(self, target_length, overrides = None):
 		"""Set the density parameters based on a target length and the average length of the strip edges.
 
 		Parameters
 		----------
 		target_length : float
 			A target length.
+		overrides : dict, optional
+			Density parameters per strip key that replace the computed ones.
 
 		Returns
 		-------
 
 		"""
 
-		for strip, edges in self.strips_to_edges_dict().items():
-			average_length = sum([self.edge_length(u, v) for u, v in edges]) / len(edges)
-			density_parameter = int(math.ceil(average_length / target_length))
+		self.set_strip_density_parameters(self.strip_density_parameters(target_length, overrides = overrides))
 
-			self.set_edges_attribute('density_parameter', density_parameter, list(self.edges()))
+	def density_curvature_adaptive(self, target_length, max_angle, normals = None, overrides = None):
+		"""Set the density parameters based on a target length and a maximum angle between the normals along the strip edges.
+
+		Parameters
+		----------
+		target_length : float
+			A target length.
+		max_angle : float
+			The maximum angle in radians between the normals at the ends of a subdivided edge.
+		normals : dict, optional
+			Normals per vertex key, for instance from the surface to pattern. The vertex normals of the mesh by default.
+		overrides : dict, optional
+			Density parameters per strip key that replace the computed ones.
+
+		Returns
+		-------
+
+		"""
+
+		self.set_strip_density_parameters(self.strip_density_parameters(target_length, max_angle, normals, overrides))
+
+	def strip_density_parameters(self, target_length, max_angle = None, normals = None, overrides = None):
+		"""Compute the density parameter of each strip in one grouped pass over the edges.
+
+		The density parameter of a strip is the number of subdivisions such that, on average over the strip edges,
+		the subdivided edges are not longer than the target length and, with a maximum angle,
+		the normals do not turn more than this angle along them.
+
+		Parameters
+		----------
+		target_length : float
+			A target length.
+		max_angle : float, optional
+			The maximum angle in radians between the normals at the ends of a subdivided edge.
+		normals : dict, optional
+			Normals per vertex key if a maximum angle is given. The vertex normals of the mesh by default.
+		overrides : dict, optional
+			Density parameters per strip key that replace the computed ones.
+
+		Returns
+		-------
+		density_parameters : dict
+			A dictionary {strip: density_parameter}.
+
+		"""
+
+		if max_angle is not None and normals is None:
+			normals = {vkey: self.vertex_normal(vkey) for vkey in self.vertices()}
+
+		sums = {}
+		counts = {}
+		for u, v, attr in self.edges(True):
+			strip = attr['strip']
+			ratio = self.edge_length(u, v) / target_length
+			if max_angle is not None:
+				ratio = max(ratio, angle_vectors(normals[u], normals[v]) / max_angle)
+			sums[strip] = sums.get(strip, 0.) + ratio
+			counts[strip] = counts.get(strip, 0) + 1
+
+		density_parameters = {strip: max(1, int(math.ceil(sums[strip] / counts[strip]))) for strip in sums}
+
+		if overrides is not None:
+			density_parameters.update(overrides)
+
+		return density_parameters
+
+	def set_strip_density_parameters(self, density_parameters):
+		"""Set the density parameters of several strips, only on the edges of these strips.
+
+		Parameters
+		----------
+		density_parameters : dict
+			A dictionary {strip: density_parameter}.
+
+		Returns
+		-------
+
+		"""
+
+		for u, v, attr in self.edges(True):
+			if attr['strip'] in density_parameters:
+				self.set_edge_attribute((u, v), 'density_parameter', density_parameters[attr['strip']])
 
 	def change_density_parameter(self, strip, new_density_parameter):
 		"""Change the density parameter in a strip.
@@ -77,8 +165,160 @@ class CoarseQuadMesh(QuadMesh):
 
 		self.set_edges_attribute('density_parameter', new_density_parameter, edges)
 
+	# --------------------------------------------------------------------------
+	# dense mesh prediction
+	# --------------------------------------------------------------------------
+
+	def face_density_parameters(self, fkey):
+		"""Return the density parameters of a face, along its first edge and along its second edge.
+
+		Parameters
+		----------
+		fkey : int
+			A face key.
+
+		Returns
+		-------
+		(n, m) : tuple
+			The density parameters.
+
+		"""
+
+		a, b, c, d = self.face_vertices(fkey)
+
+		return int(self.get_edge_attribute((a, b), 'density_parameter')), int(self.get_edge_attribute((b, c), 'density_parameter'))
+
+	def faces_breadth_first(self):
+		"""Return the faces in breadth-first order, so that consecutive faces stay close to each other.
+
+		Returns
+		-------
+		list
+			The face keys.
+
+		"""
+
+		order = []
+		visited = set()
+		for root in self.faces():
+			if root in visited:
+				continue
+			visited.add(root)
+			order.append(root)
+			i = len(order) - 1
+			while i < len(order):
+				for u, v in self.face_halfedges(order[i]):
+					nbr = self.halfedge[v].get(u)
+					if nbr is not None and nbr not in visited:
+						visited.add(nbr)
+						order.append(nbr)
+				i += 1
+
+		return order
+
+	def _face_dense_size(self, fkey, vertices, edges):
+		# the numbers of dense vertices, edges and faces added by a face patch,
+		# given the coarse vertices and edges that are already densified, and the new ones
+
+		n, m = self.face_density_parameters(fkey)
+		vertex_count = (n - 1) * (m - 1)
+		edge_count = n * (m - 1) + m * (n - 1)
+
+		new_vertices = [vkey for vkey in self.face_vertices(fkey) if vkey not in vertices]
+		new_edges = [(u, v) for u, v in self.face_halfedges(fkey) if (u, v) not in edges and (v, u) not in edges]
+
+		vertex_count += len(new_vertices)
+		for u, v in new_edges:
+			density_parameter = int(self.get_edge_attribute((u, v), 'density_parameter'))
+			vertex_count += density_parameter - 1
+			edge_count += density_parameter
+
+		return (vertex_count, edge_count, n * m), new_vertices, new_edges
+
+	def dense_mesh_size(self, fkeys = None):
+		"""Predict the size of the dense mesh from the density parameters, without building it.
+
+		The dense mesh has the vertices of the coarse mesh, the subdivision points of its edges and the inner points of its faces.
+		The counts are exact as long as the welding of the face patches does not merge distinct vertices.
+
+		Parameters
+		----------
+		fkeys : list, optional
+			The keys of the faces to densify. All the faces by default.
+
+		Returns
+		-------
+		size : dict
+			The number of 'vertices', 'edges' and 'faces' of the dense mesh and its approximate 'memory' in bytes.
+
+		"""
+
+		if fkeys is None:
+			fkeys = list(self.faces())
+
+		vertices = set()
+		edges = set()
+		vertex_count, edge_count, face_count = 0, 0, 0
+		for fkey in fkeys:
+			(face_vertex_count, face_edge_count, face_face_count), new_vertices, new_edges = self._face_dense_size(fkey, vertices, edges)
+			vertices.update(new_vertices)
+			edges.update(new_edges)
+			vertex_count += face_vertex_count
+			edge_count += face_edge_count
+			face_count += face_face_count
+
+		memory = vertex_count * DENSE_VERTEX_BYTES + edge_count * DENSE_EDGE_BYTES + face_count * DENSE_FACE_BYTES
+
+		return {'vertices': vertex_count, 'edges': edge_count, 'faces': face_count, 'memory': memory}
+
+	def dense_mesh_chunks(self, budget):
+		"""Group the faces in chunks of neighbouring faces whose dense meshes fit in a memory budget.
+
+		Parameters
+		----------
+		budget : int
+			The memory budget per chunk, in bytes.
+
+		Returns
+		-------
+		chunks : list
+			The lists of face keys per chunk.
+
+		Raises
+		------
+		ValueError
+			If the dense mesh of a single face exceeds the budget.
+
+		"""
+
+		# neighbouring faces for compact chunks
+		chunks = []
+		chunk = []
+		memory = 0
+		vertices, edges = set(), set()
+		for fkey in self.faces_breadth_first():
+			# try the face in the current chunk, sharing its boundary points, or start a new chunk
+			size, new_vertices, new_edges = self._face_dense_size(fkey, vertices, edges)
+			face_memory = size[0] * DENSE_VERTEX_BYTES + size[1] * DENSE_EDGE_BYTES + size[2] * DENSE_FACE_BYTES
+			if len(chunk) > 0 and memory + face_memory > budget:
+				chunks.append(chunk)
+				chunk, memory, vertices, edges = [], 0, set(), set()
+				size, new_vertices, new_edges = self._face_dense_size(fkey, vertices, edges)
+				face_memory = size[0] * DENSE_VERTEX_BYTES + size[1] * DENSE_EDGE_BYTES + size[2] * DENSE_FACE_BYTES
+
+			if face_memory > budget:
+				raise ValueError('The dense mesh of face {} exceeds the memory budget.'.format(fkey))
+
+			chunk.append(fkey)
+			memory += face_memory
+			vertices.update(new_vertices)
+			edges.update(new_edges)
+
+		if len(chunk) > 0:
+			chunks.append(chunk)
+
+		return chunks
 
-	
 # ==============================================================================
 # Main
 # ==============================================================================
@@ -0,0 +1,271 @@
+from compas.datastructures.mesh import Mesh
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'HalfEdgeArrays',
+]
+
+class HalfEdgeArrays(object):
+    """Flat half-edge arrays of a polygonal mesh, indexed by integers.
+
+    The half-edges of a face are stored contiguously, in the cycling order of the face.
+    Half-edge h of face f goes from face_vertices[f][j] to face_vertices[f][j + 1],
+    with h = face_offset[f] + j.
+
+    Attributes
+    ----------
+    vertices : list
+        The vertex keys of the original mesh, per vertex index.
+    key_index : dict
+        The vertex index per vertex key of the original mesh.
+    xyz : list, None
+        The vertex coordinates per vertex index.
+        None for connectivity-only arrays.
+    faces : list
+        The face keys of the original mesh, per face index.
+    face_vertices : list
+        The vertex indices of each face.
+    face_offset : list
+        The index of the first half-edge of each face, with a final entry equal to the number of half-edges.
+    halfedge_vertex : list
+        The start vertex of each half-edge.
+    halfedge_face : list
+        The face of each half-edge.
+    halfedge_next : list
+        The next half-edge in the face of each half-edge.
+    halfedge_prev : list
+        The previous half-edge in the face of each half-edge.
+    halfedge_twin : list
+        The opposite half-edge of each half-edge, -1 if it lies on the boundary.
+
+    """
+
+    def __init__(self, face_vertices, number_of_vertices, xyz = None):
+        self.vertices = list(range(number_of_vertices))
+        self.key_index = {i: i for i in range(number_of_vertices)}
+        self.xyz = xyz
+        self.faces = list(range(len(face_vertices)))
+        self.face_vertices = face_vertices
+
+        self.face_offset = []
+        self.halfedge_vertex = []
+        self.halfedge_face = []
+        self.halfedge_next = []
+        self.halfedge_prev = []
+
+        h = 0
+        for f, loop in enumerate(face_vertices):
+            n = len(loop)
+            self.face_offset.append(h)
+            for j in range(n):
+                self.halfedge_vertex.append(loop[j])
+                self.halfedge_face.append(f)
+                self.halfedge_next.append(h + (j + 1) % n)
+                self.halfedge_prev.append(h + (j - 1) % n)
+            h += n
+        self.face_offset.append(h)
+
+        index = {}
+        for h in range(len(self.halfedge_vertex)):
+            index[self.halfedge_vertex[h], self.halfedge_vertex[self.halfedge_next[h]]] = h
+
+        self.halfedge_twin = [index.get((self.halfedge_vertex[self.halfedge_next[h]], self.halfedge_vertex[h]), -1) for h in range(len(self.halfedge_vertex))]
+
+        # one outgoing half-edge per vertex, on the boundary if there is one, to start fan rotations
+        self.vertex_halfedge = [-1] * number_of_vertices
+        for h in range(len(self.halfedge_vertex)):
+            u = self.halfedge_vertex[h]
+            if self.vertex_halfedge[u] == -1 or self.halfedge_twin[h] == -1:
+                self.vertex_halfedge[u] = h
+
+    @classmethod
+    def from_vertices_and_faces(cls, vertices, faces):
+        """Construct the arrays from a list of vertex coordinates and a list of faces as vertex indices.
+
+        Parameters
+        ----------
+        vertices : list
+            The vertex coordinates.
+        faces : list
+            The faces as lists of vertex indices.
+
+        Returns
+        -------
+        HalfEdgeArrays
+            The half-edge arrays.
+
+        """
+
+        return cls([list(face) for face in faces], len(vertices), [list(xyz) for xyz in vertices])
+
+    @classmethod
+    def from_faces(cls, faces, number_of_vertices):
+        """Construct connectivity-only arrays, without vertex coordinates.
+
+        Parameters
+        ----------
+        faces : list
+            The faces as lists of vertex indices.
+        number_of_vertices : int
+            The number of vertices.
+
+        Returns
+        -------
+        HalfEdgeArrays
+            The half-edge arrays.
+
+        """
+
+        return cls(faces, number_of_vertices)
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Construct the arrays from a mesh, keeping track of its vertex and face keys.
+
+        Parameters
+        ----------
+        mesh : Mesh
+            A mesh.
+
+        Returns
+        -------
+        HalfEdgeArrays
+            The half-edge arrays.
+
+        """
+
+        vertices = list(mesh.vertices())
+        key_index = {vkey: i for i, vkey in enumerate(vertices)}
+        faces = list(mesh.faces())
+        face_vertices = [[key_index[vkey] for vkey in mesh.face_vertices(fkey)] for fkey in faces]
+
+        arrays = cls(face_vertices, len(vertices), [mesh.vertex_coordinates(vkey) for vkey in vertices])
+        arrays.vertices = vertices
+        arrays.key_index = key_index
+        arrays.faces = faces
+
+        return arrays
+
+    def to_mesh(self, cls = Mesh):
+        """Build a mesh from the arrays.
+
+        Parameters
+        ----------
+        cls : Mesh, optional
+            The mesh class to instantiate.
+
+        Returns
+        -------
+        mesh
+            The mesh, with vertex and face keys equal to the array indices.
+
+        """
+
+        return cls.from_vertices_and_faces(self.xyz, self.face_vertices)
+
+    # --------------------------------------------------------------------------
+    # queries
+    # --------------------------------------------------------------------------
+
+    def number_of_vertices(self):
+        return len(self.vertex_halfedge)
+
+    def number_of_faces(self):
+        return len(self.face_vertices)
+
+    def number_of_halfedges(self):
+        return len(self.halfedge_vertex)
+
+    def halfedge_target(self, h):
+        return self.halfedge_vertex[self.halfedge_next[h]]
+
+    def is_halfedge_on_boundary(self, h):
+        return self.halfedge_twin[h] == -1
+
+    def vertex_outgoing_halfedges(self, u):
+        """Rotate around a vertex through its outgoing half-edges.
+
+        Parameters
+        ----------
+        u : int
+            A vertex index.
+
+        Returns
+        -------
+        halfedges : list
+            The outgoing half-edges in rotation order, starting at the boundary if the vertex is on one.
+        closed : bool
+            True if the rotation closed on itself around an interior vertex.
+            False otherwise.
+
+        """
+
+        start = self.vertex_halfedge[u]
+        if start == -1:
+            return [], False
+
+        halfedges = [start]
+        count = self.number_of_halfedges()
+        while count > 0:
+            count -= 1
+            h = self.halfedge_twin[self.halfedge_prev[halfedges[-1]]]
+            if h == -1:
+                return halfedges, False
+            if h == start:
+                return halfedges, True
+            halfedges.append(h)
+
+        return halfedges, False
+
+    def vertex_boundary(self):
+        """Flag the vertices on a boundary.
+
+        Returns
+        -------
+        list
+            A boolean per vertex, True if one of the adjacent half-edges has no twin.
+
+        """
+
+        boundary = [False] * self.number_of_vertices()
+        for h, twin in enumerate(self.halfedge_twin):
+            if twin == -1:
+                boundary[self.halfedge_vertex[h]] = True
+                boundary[self.halfedge_target(h)] = True
+
+        return boundary
+
+    def face_centroids(self):
+        """Compute the centroids of all the faces in one pass.
+
+        Returns
+        -------
+        list
+            The face centroids, per face index.
+
+        """
+
+        xyz = self.xyz
+        centroids = []
+        for loop in self.face_vertices:
+            n = float(len(loop))
+            x, y, z = 0, 0, 0
+            for i in loop:
+                x += xyz[i][0]
+                y += xyz[i][1]
+                z += xyz[i][2]
+            centroids.append([x / n, y / n, z / n])
+
+        return centroids
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
@@ -5,7 +5,7 @@ from compas.geometry import circle_from_points
 from compas.topology import mesh_unify_cycles
 
 
-from compas_pattern.topology.polyline_extraction import mesh_boundaries
+from compas_pattern.topology.connected_components import connected_components
 
 __author__     = ['Robin Oval']
 __copyright__  = 'Copyright 2017, Block Research Group - ETH Zurich'
@@ -13,6 +13,7 @@ __license__    = 'MIT License'
 __email__      = 'oval@arch.ethz.ch'
 
 __all__ = [
+    'mesh_topology_invariants',
     'mesh_euler',
     'mesh_genus',
     'mesh_area',
@@ -35,25 +36,123 @@ def is_mesh_empty(mesh):
 
     return False
 
-def mesh_euler(mesh):
+def mesh_topology_invariants(mesh):
+    """Compute the topological invariants of a mesh in one pass over its half-edges.
 
-    V = len([vkey for vkey in mesh.vertices() if len(mesh.vertex_neighbours(vkey)) != 0])
-    E = mesh.number_of_edges()
-    F = mesh.number_of_faces()
-    X = V - E + F
-    
-    return X
+    The result is cached on the mesh and reused as long as the topology of the mesh does not change.
+    Meshes without cache, like compas meshes, are recomputed.
 
-def mesh_genus(mesh):
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+
+    Returns
+    -------
+    invariants : dict
+        The number of vertices with neighbours 'V', of edges 'E' including pole edges, of faces 'F'
+        and of boundary loops 'B', the Euler characteristic 'X', the genus 'G'
+        and whether the mesh is 'manifold', with each vertex in one closed or open fan of faces.
 
-    V = len([vkey for vkey in mesh.vertices() if len(mesh.vertex_neighbours(vkey)) != 0])
-    E = mesh.number_of_edges()
+    Raises
+    ------
+    -
+
+    """
+
+    if hasattr(mesh, 'cached'):
+        return dict(mesh.cached('topology_invariants', _mesh_topology_invariants, mesh))
+
+    return _mesh_topology_invariants(mesh)
+
+def _mesh_topology_invariants(mesh):
+
+    halfedge = mesh.halfedge
+
+    V = 0
+    pole_edges = 0
+    halfedges = 0
+    boundary_halfedges = {}
+    manifold = len(mesh.vertex) > 0
+    for u in mesh.vertex:
+        nbrs = halfedge[u]
+        if len(nbrs) == 0:
+            manifold = False
+            continue
+        V += 1
+
+        boundary = []
+        for v, fkey in nbrs.items():
+            if u == v:
+                pole_edges += 1
+                continue
+            halfedges += 1
+            if fkey is None:
+                boundary.append(v)
+        degree = len(nbrs) - (1 if u in nbrs else 0)
+        boundary_halfedges[u] = boundary
+
+        if not manifold:
+            continue
+
+        # one fan of faces around the vertex, open from the boundary or closed
+        if len(boundary) > 1:
+            manifold = False
+            continue
+        start = None
+        for v, fkey in nbrs.items():
+            if u != v and fkey is not None and (len(boundary) == 0 or halfedge[v][u] is None):
+                start = v
+                break
+        if start is None:
+            manifold = False
+            continue
+        count = 0
+        v = start
+        while count < degree:
+            fkey = nbrs[v]
+            if fkey is None:
+                break
+            count += 1
+            v = mesh.face_vertex_ancestor(fkey, u)
+            if v == start:
+                break
+        if count != degree - len(boundary):
+            manifold = False
+
+    E = halfedges // 2 + pole_edges
     F = mesh.number_of_faces()
-    B = len(mesh_boundaries(mesh))
+
+    # boundary loops as cycles of boundary half-edges
+    B = 0
+    visited = set()
+    for u, boundary in boundary_halfedges.items():
+        for v in boundary:
+            if (u, v) in visited:
+                continue
+            B += 1
+            a, b = u, v
+            while (a, b) not in visited:
+                visited.add((a, b))
+                nxt = [c for c in boundary_halfedges[b] if (b, c) not in visited]
+                if len(nxt) == 0:
+                    break
+                a, b = b, nxt[0]
+
     X = V - E + F
     G = (2 - X - B) / 2
 
-    return V, E, F, B, X, G
+    return {'V': V, 'E': E, 'F': F, 'B': B, 'X': X, 'G': G, 'manifold': manifold}
+
+def mesh_euler(mesh):
+
+    return mesh_topology_invariants(mesh)['X']
+
+def mesh_genus(mesh):
+
+    invariants = mesh_topology_invariants(mesh)
+
+    return tuple([invariants[key] for key in ['V', 'E', 'F', 'B', 'X', 'G']])
 
 
 def mesh_area(mesh):
@@ -108,7 +207,16 @@ def add_vertex_from_vertices(mesh, vertices, weights):
 def insert_vertices_in_halfedge(mesh, u, v, vertices):
     if v in mesh.halfedge[u] and mesh.halfedge[u][v] is not None:
         fkey = mesh.halfedge[u][v]
-        return insert_vertices_in_face(mesh, fkey, u, vertices)
+        # insert at the half-edge, not after the first occurrence of u, which may appear twice in a pseudo-quad face
+        face_vertices = mesh.face_vertices(fkey)[:]
+        n = len(face_vertices)
+        for i in range(n):
+            if face_vertices[i] == u and face_vertices[(i + 1) % n] == v:
+                face_vertices[i + 1 : i + 1] = vertices
+                break
+        mesh.delete_face(fkey)
+        mesh.add_face(face_vertices, fkey = fkey)
+        return face_vertices
     else:
         return 0
 
@@ -221,6 +329,8 @@ def insert_vertices_in_face(mesh, fkey, vkey, added_vkeys):
 def delete_face(mesh, fkey):
     """Delete a face from the mesh object.
 
+    The results cached on the mesh, if any, are invalidated.
+
     Parameters
     ----------
     fkey : hashable
@@ -252,28 +362,47 @@ def delete_face(mesh, fkey):
             del mesh.halfedge[v][u]
     del mesh.face[fkey]
 
-def mesh_disjointed_parts(mesh):
+    if hasattr(mesh, 'invalidate'):
+        mesh.invalidate()
+
+def mesh_disjointed_parts(mesh, return_labels = False):
+    """Group the mesh faces in disjointed parts, connected through their edges.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+    return_labels : bool, optional
+        True to also return the part index of each face.
+
+    Returns
+    -------
+    disjointed_parts : list
+        The list of sublists of disjointed parts of mesh faces.
+    labels : dict
+        The part index per face key, if return_labels is True.
+
+    """
     # cycles must be unified or mesh_unify_cycles(mesh) must be extended to disjointed meshes
 
     faces = list(mesh.faces())
+    face_index = {fkey: i for i, fkey in enumerate(faces)}
+
+    # pairs of adjacent faces through each edge
+    adjacency = []
+    for u in mesh.halfedge:
+        for v, fkey in mesh.halfedge[u].items():
+            if fkey is not None and u != v:
+                nbr = mesh.halfedge[v].get(u)
+                if nbr is not None:
+                    adjacency.append((face_index[fkey], face_index[nbr]))
+
+    labels, parts = connected_components(len(faces), adjacency)
+
+    disjointed_parts = [[faces[i] for i in part] for part in parts]
 
-    disjointed_parts = []
-
-    count = len(faces)
-    while len(faces) > 0 and count > 0:
-        count -= 1
-        part = [faces.pop()]
-        next_neighbours = [part[-1]]
-        count_2  = count
-        while len(next_neighbours) > 0 and count_2 > 0:
-            count_2 -= 1
-            for fkey in mesh.face_neighbours(next_neighbours.pop()):
-                if fkey not in part:
-                    part.append(fkey)
-                    faces.remove(fkey)
-                    if fkey not in next_neighbours:
-                        next_neighbours.append(fkey)
-        disjointed_parts.append(part)
+    if return_labels:
+        return disjointed_parts, {fkey: labels[i] for i, fkey in enumerate(faces)}
 
     return disjointed_parts
 
@@ -292,33 +421,8 @@ def is_mesh_manifold(mesh):
         False, otherwise.
 
     """
-    if not mesh.vertex:
-        return False
-
-    for key in mesh.vertices():
-        nbrs = mesh.vertex_neighbours(key, ordered=True)
-
-        if not nbrs:
-            return False
-
-        if mesh.halfedge[nbrs[0]][key] is None:
-            for nbr in nbrs[1:-1]:
-                if mesh.halfedge[key][nbr] is None:
-                    return False
-
-            if mesh.halfedge[key][nbrs[-1]] is not None:
-                return False
-        else:
-            for nbr in nbrs[1:]:
-                if mesh.halfedge[key][nbr] is None:
-                    return False
-
-        # additional check for multiple fans
-        nbr_faces = list(mesh.halfedge[key].values())
-        if nbr_faces.count(None) > 1:
-            return False
 
-    return True
+    return mesh_topology_invariants(mesh)['manifold']
 
 # ==============================================================================
 # Main
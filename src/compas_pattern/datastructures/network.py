@@ -10,6 +10,7 @@ from compas.datastructures.mesh import Mesh
 from compas.datastructures.network import Network
 
 from compas_pattern.topology.polyline_extraction import dual_edge_polylines
+from compas_pattern.topology.connected_components import connected_components_from_keys
 
 from compas.geometry import bounding_box
 from compas.geometry import distance_point_point
@@ -35,40 +36,29 @@ __all__ = [
 	'graph_colourability',
 ]
 
-def graph_disjointed_parts(graph):
+def graph_disjointed_parts(graph, return_labels = False):
 	"""Group the graph vertices in sub-lists of disjointed parts.
 
 	Parameters
 	----------
 	graph : Network
 		A graph.
+	return_labels : bool, optional
+		True to also return the part index of each vertex.
 
 	Returns
 	-------
 	disjointed_parts : list
 		The list of sublists of disjointed parts of graph vertices.
+	labels : dict
+		The part index per vertex key, if return_labels is True.
 
 	"""
 
-	vertices = list(graph.vertices())
-
-	disjointed_parts = []
-
-	count = len(vertices)
-	while len(vertices) > 0 and count > 0:
-		count -= 1
-		part = [vertices.pop()]
-		next_neighbours = [part[-1]]
-		count_2  = count
-		while len(next_neighbours) > 0 and count_2 > 0:
-			count_2 -= 1
-			for vkey in graph.vertex_neighbors(next_neighbours.pop()):
-				if vkey not in part:
-					part.append(vkey)
-					vertices.remove(vkey)
-					if vkey not in next_neighbours:
-						next_neighbours.append(vkey)
-		disjointed_parts.append(part)
+	labels, disjointed_parts = connected_components_from_keys(list(graph.vertices()), graph.edges())
+
+	if return_labels:
+		return disjointed_parts, labels
 
 	return disjointed_parts
 
@@ -0,0 +1,262 @@
+from compas.datastructures.mesh import Mesh
+
+from compas_pattern.datastructures.halfedge_arrays import HalfEdgeArrays
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'PseudoQuadArrays',
+]
+
+def _trim_pseudo_quad(loop):
+    # remove the repeated pole of a [a, a, b, c] face and return the index of the pole in the trimmed face
+
+    if len(loop) != 4:
+        return list(loop), -1
+
+    for i in range(4):
+        if loop[i - 1] == loop[i]:
+            trimmed = [vkey for j, vkey in enumerate(loop) if j != i]
+            return trimmed, trimmed.index(loop[i])
+
+    return list(loop), -1
+
+class PseudoQuadArrays(HalfEdgeArrays):
+    """Flat half-edge arrays of a pseudo-quad mesh, with the poles stored as face-corner flags.
+
+    A pseudo-quad face [a, a, b, c] is stored as the triangle [a, b, c] with a pole at its corner a,
+    so that no half-edge connects a vertex to itself and pole queries do not need to look for self-loops.
+
+    Attributes
+    ----------
+    face_pole : list
+        The half-edge starting at the pole of each face, -1 if the face has no pole.
+    vertex_pole : list
+        The number of faces with a pole at each vertex.
+
+    """
+
+    def __init__(self, face_vertices, number_of_vertices, xyz = None):
+        loops = []
+        corners = []
+        for loop in face_vertices:
+            trimmed, corner = _trim_pseudo_quad(loop)
+            loops.append(trimmed)
+            corners.append(corner)
+
+        super(PseudoQuadArrays, self).__init__(loops, number_of_vertices, xyz)
+
+        self.face_pole = [-1 if corner == -1 else self.face_offset[f] + corner for f, corner in enumerate(corners)]
+
+        self.vertex_pole = [0] * number_of_vertices
+        for h in self.face_pole:
+            if h != -1:
+                self.vertex_pole[self.halfedge_vertex[h]] += 1
+
+    def to_mesh(self, cls = Mesh):
+        """Build a mesh from the arrays, with the poles as repeated vertices in [a, a, b, c] faces.
+
+        Parameters
+        ----------
+        cls : Mesh, optional
+            The mesh class to instantiate, like PseudoQuadMesh to keep the poles.
+
+        Returns
+        -------
+        mesh
+            The mesh, with vertex and face keys equal to the array indices.
+
+        """
+
+        return cls.from_vertices_and_faces(self.xyz, [self.face_pseudo_quad_vertices(f) for f in range(self.number_of_faces())])
+
+    # --------------------------------------------------------------------------
+    # pole queries
+    # --------------------------------------------------------------------------
+
+    def is_vertex_pole(self, u):
+        return self.vertex_pole[u] > 0
+
+    def is_face_pseudo_quad(self, f):
+        return self.face_pole[f] != -1
+
+    def face_pole_vertex(self, f):
+        h = self.face_pole[f]
+        return None if h == -1 else self.halfedge_vertex[h]
+
+    def poles(self):
+        return [u for u, count in enumerate(self.vertex_pole) if count > 0]
+
+    def face_pseudo_quad_vertices(self, f):
+        """The vertices of a face, with the pole repeated for a pseudo-quad face.
+
+        Parameters
+        ----------
+        f : int
+            A face index.
+
+        Returns
+        -------
+        list
+            The vertex indices as [a, a, b, c] if a is the pole of the face, as stored in a pseudo-quad mesh.
+
+        """
+
+        loop = list(self.face_vertices[f])
+        h = self.face_pole[f]
+        if h != -1:
+            i = h - self.face_offset[f]
+            loop.insert(i, loop[i])
+
+        return loop
+
+    def is_pseudo_quad_mesh(self):
+        """Check if all faces are quads or pseudo-quads.
+
+        Returns
+        -------
+        bool
+            True if all faces are quads or pseudo-quads.
+
+        """
+
+        face_offset = self.face_offset
+        for f in range(self.number_of_faces()):
+            if face_offset[f + 1] - face_offset[f] != 4 and self.face_pole[f] == -1:
+                return False
+
+        return True
+
+    # --------------------------------------------------------------------------
+    # singularities
+    # --------------------------------------------------------------------------
+
+    def vertex_classification(self):
+        """Classify all vertices in one pass over the half-edges, for singularity maps.
+
+        The index of a vertex is 1 for a pole, 1/2 for a pole on the boundary,
+        (4 - valence) / 4 for a vertex and (3 - valence) / 4 for a vertex on the boundary.
+
+        Returns
+        -------
+        valence : list
+            The number of neighbours of each vertex, not counting the vertex itself at a pole.
+        boundary : list
+            Whether each vertex is on the boundary.
+        pole : list
+            Whether each vertex is a pole.
+        index : list
+            The index of each vertex, None for isolated vertices or if the mesh is not a pseudo-quad mesh.
+
+        """
+
+        n = self.number_of_vertices()
+        halfedge_vertex = self.halfedge_vertex
+        halfedge_next = self.halfedge_next
+        halfedge_twin = self.halfedge_twin
+
+        # one edge per outgoing half-edge, plus one per incoming boundary half-edge
+        valence = [0] * n
+        boundary = [False] * n
+        for h in range(self.number_of_halfedges()):
+            u = halfedge_vertex[h]
+            valence[u] += 1
+            if halfedge_twin[h] == -1:
+                v = halfedge_vertex[halfedge_next[h]]
+                valence[v] += 1
+                boundary[u] = True
+                boundary[v] = True
+
+        pole = [count > 0 for count in self.vertex_pole]
+
+        index = [None] * n
+        if self.is_pseudo_quad_mesh():
+            for u in range(n):
+                if valence[u] == 0:
+                    continue
+                if pole[u]:
+                    index[u] = 1. / 2. if boundary[u] else 1.
+                elif boundary[u]:
+                    index[u] = 1. / 4. * (3. - valence[u])
+                else:
+                    index[u] = 1. / 4. * (4. - valence[u])
+
+        return valence, boundary, pole, index
+
+    def singularities(self):
+        """The vertices with a non-zero index.
+
+        Returns
+        -------
+        list
+            The vertex indices of the singularities, including the poles.
+
+        """
+
+        return [u for u, index in enumerate(self.vertex_classification()[3]) if index]
+
+    # --------------------------------------------------------------------------
+    # strip queries
+    # --------------------------------------------------------------------------
+
+    def halfedge_opposite(self, h):
+        """The opposite half-edge in a quad or a pseudo-quad face.
+
+        Parameters
+        ----------
+        h : int
+            A half-edge index.
+
+        Returns
+        -------
+        int
+            The opposite half-edge in the face.
+            -1 if the half-edge is opposite to a pole or if the face is neither a quad nor a pseudo-quad.
+
+        """
+
+        f = self.halfedge_face[h]
+        p = self.face_pole[f]
+        if p == -1:
+            if self.face_offset[f + 1] - self.face_offset[f] != 4:
+                return -1
+            return self.halfedge_next[self.halfedge_next[h]]
+        if h == p:
+            return self.halfedge_prev[p]
+        if h == self.halfedge_prev[p]:
+            return p
+
+        return -1
+
+    def halfedge_strip_next(self, h):
+        """The next half-edge in the strip, across the face of the half-edge and into its neighbour.
+
+        Parameters
+        ----------
+        h : int
+            A half-edge index.
+
+        Returns
+        -------
+        int
+            The twin of the opposite half-edge, pointing inside the next face of the strip.
+            -1 if the strip ends, on a boundary or at a pole.
+
+        """
+
+        h = self.halfedge_opposite(h)
+        if h == -1:
+            return -1
+
+        return self.halfedge_twin[h]
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
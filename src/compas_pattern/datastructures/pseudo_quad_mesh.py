@@ -1,5 +1,6 @@
 from compas.datastructures.mesh import Mesh
 from compas_pattern.datastructures.quad_mesh import QuadMesh
+from compas_pattern.datastructures.pseudo_quad_arrays import PseudoQuadArrays
 
 from compas.utilities import geometric_key
 
@@ -66,6 +67,8 @@ class PseudoQuadMesh(QuadMesh):
         >>>
 
         """
+        self.topology_version += 1
+
         attr = self._compile_fattr(attr_dict, kwattr)
 
         # remove clean vertices to allow [a, b, c, c] faces
@@ -120,6 +123,8 @@ class PseudoQuadMesh(QuadMesh):
 
         """
 
+        self.topology_version += 1
+
         for u, v in self.face_halfedges(fkey):
             if u != v:
                 self.halfedge[u][v] = None
@@ -182,12 +187,23 @@ class PseudoQuadMesh(QuadMesh):
             plotter.show()
 
         """
+        for u, v in self.cached('edges', self._edge_table):
+            if data:
+                yield u, v, self.edgedata[u, v]
+            else:
+                yield u, v
+
+    def _edge_table(self):
+        # edges computed once per version of the topology of the mesh, including the pole edges (a, a) of [a, a, b, c] faces,
+        # with the same data dictionary for both directions
+
+        table = []
         edges = set()
 
         for u in self.halfedge:
             for v in self.halfedge[u]:
 
-                if (u, v) in edges or (v, u) in edges:
+                if (u, v) in edges:
                     continue
 
                 edges.add((u, v))
@@ -195,21 +211,52 @@ class PseudoQuadMesh(QuadMesh):
 
                 if (u, v) not in self.edgedata:
                     self.edgedata[u, v] = self.default_edge_attributes.copy()
-
                     if u != v:
                         if (v, u) in self.edgedata:
                             self.edgedata[u, v].update(self.edgedata[v, u])
                             del self.edgedata[v, u]
-
                         self.edgedata[v, u] = self.edgedata[u, v]
 
-                if data:
-                    yield u, v, self.edgedata[u, v]
-                else:
-                    yield u, v
+                table.append((u, v))
+
+        return table
+
+    def pseudo_quad_arrays(self):
+        """The half-edge arrays of the mesh with its poles as face-corner flags, computed once per version of the topology of the mesh.
+
+        Returns
+        -------
+        PseudoQuadArrays
+            The arrays, to read but not to modify.
+            Their vertex coordinates are those of the last change of topology, the current ones are in the mesh.
+
+        """
+
+        return self.cached('pseudo_quad_arrays', PseudoQuadArrays.from_mesh, self)
+
+    def is_vertex_pole(self, vkey):
+        arrays = self.pseudo_quad_arrays()
+        return arrays.is_vertex_pole(arrays.key_index[vkey])
+
+    def poles(self):
+        arrays = self.pseudo_quad_arrays()
+        return [arrays.vertices[u] for u in arrays.poles()]
+
+    def vertex_classification(self):
+        """The valence, boundary flag, pole flag and index of all vertices, computed once per version of the topology of the mesh.
+
+        Returns
+        -------
+        valence, boundary, pole, index : list
+            The classification per vertex index of the pseudo-quad arrays, to read but not to modify.
+
+        """
+
+        return self.cached('vertex_classification', self.pseudo_quad_arrays().vertex_classification)
 
     def to_mesh_2(self):
         vertices = [self.vertex_coordinates(vkey) for vkey in self.vertices()]
+        key_index = {vkey: i for i, vkey in enumerate(self.vertices())}
         face_vertices = []
         # remove consecutive duplicates in pseudo quad faces
         for fkey in self.faces():
@@ -217,7 +264,7 @@ class PseudoQuadMesh(QuadMesh):
             pseudo_face = self.face_vertices(fkey)
             for i, vkey in enumerate(pseudo_face):
                 if vkey != pseudo_face[i - 1]:
-                    non_pseudo_face.append(vkey)
+                    non_pseudo_face.append(key_index[vkey])
             face_vertices.append(non_pseudo_face)
         mesh = Mesh.from_vertices_and_faces(vertices, face_vertices)
         return mesh
@@ -225,12 +272,12 @@ class PseudoQuadMesh(QuadMesh):
     def to_mesh(self):
 
         vertices = [self.vertex_coordinates(vkey) for vkey in self.vertices()]
-        vertex_remap = list(self.vertices())
+        key_index = {vkey: i for i, vkey in enumerate(self.vertices())}
         faces = []
         for fkey in self.faces():
             face_vertices = []
             for vkey in self.face_vertices(fkey):
-                vkey_idx = vertex_remap.index(vkey)
+                vkey_idx = key_index[vkey]
                 if vkey_idx not in face_vertices:
                     face_vertices.append(vkey_idx)
             faces.append(face_vertices)
@@ -297,6 +344,34 @@ def is_face_pseudo_quad(mesh, fkey):
 
     return False
 
+def vertex_indices(mesh):
+    """Return the indices of all the vertices in a coarse quad mesh with potential poles stored in pseudo-quad faces.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+
+    Returns
+    -------
+    indices: dict
+        The index of each vertex key, None for isolated vertices or if the mesh is not a (pseudo-)quad mesh.
+
+    Raises
+    ------
+    -
+
+    """
+
+    if hasattr(mesh, 'vertex_classification'):
+        arrays = mesh.pseudo_quad_arrays()
+        valence, boundary, pole, index = mesh.vertex_classification()
+    else:
+        arrays = PseudoQuadArrays.from_mesh(mesh)
+        valence, boundary, pole, index = arrays.vertex_classification()
+
+    return {vkey: index[u] for u, vkey in enumerate(arrays.vertices)}
+
 def vertex_index(mesh, vkey):
     """Return the index of a vertex in a coarse quad mesh with potential poles stored in pseudo-quad faces.
 
@@ -318,54 +393,11 @@ def vertex_index(mesh, vkey):
 
     """
 
-    if not mesh.is_quadmesh():
-        return None
-    if len(mesh.vertex_neighbors(vkey)) == 0:
-        return None
-        
-    valency = float(len(mesh.vertex_neighbors(vkey)))
-    boundary = mesh.is_vertex_on_boundary(vkey)
-    if vkey in mesh.vertex_neighbors(vkey):
-        pole = True
-    else:
-        pole = False
-    #pole = True if vkey in mesh.vertex_neighbors(vkey) else False
-    partial_pole = False
-    #print valency, mesh.vertex_neighbors(vkey), boundary, pole, partial_pole
-    #return 0
-    # if pole:
-    #     vertex_faces = mesh.vertex_faces(vkey)
-    #     for fkey in vertex_faces:
-    #         if fkey is not None and not is_face_pseudo_quad(mesh, fkey):
-    #             partial_pole = True
-    #             break
-    #     if partial_pole:
-    #         pseudo_valency = sum([1 - is_face_pseudo_quad(mesh, fkey) for fkey in vertex_faces])
-    #         if boundary:
-    #             pseudo_valency += 1
-
-    if pole:
-        if partial_pole:
-            if not boundary:
-                #print 'partial pole', 1. / 4. * (4. - pseudo_valency)
-                return 1. / 4. * (4. - pseudo_valency)
-            else:
-                #print 'boundary partial pole', 1. / 4. * (3. - pseudo_valency)
-                return 1. / 4. * (3. - pseudo_valency)
-        else:
-            if not boundary:
-                #print 'pole', 1.
-                return 1.
-            else:
-                #print 'boundary pole', 1. / 2.
-                return 1. / 2.
-    else:
-        if not boundary:
-            #print 'classic', 1. / 4. * (4. - valency)
-            return 1. / 4. * (4. - valency)
-        else:
-            #print 'boundary classic', 1. / 4. * (3. - valency)
-            return 1. / 4. * (3. - valency)
+    if hasattr(mesh, 'vertex_classification'):
+        arrays = mesh.pseudo_quad_arrays()
+        return mesh.vertex_classification()[3][arrays.key_index[vkey]]
+
+    return vertex_indices(mesh)[vkey]
 
 # ==============================================================================
 # Main
@@ -18,6 +18,167 @@ class QuadMesh(Mesh):
 		self.default_edge_attributes.update({
 			'strip': None
 			})
+		# mutation counters to invalidate derived data:
+		# of the vertices and faces, of the vertex attributes and of the edge and face attributes
+		self.topology_version = 0
+		self.geometry_version = 0
+		self.attribute_version = 0
+		self._cache = {}
+		self._cache_version = 0
+		self._cache_statistics = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+	# --------------------------------------------------------------------------
+	# versioning
+	# --------------------------------------------------------------------------
+
+	def add_vertex(self, key=None, attr_dict=None, **kwattr):
+		self.topology_version += 1
+		return super(QuadMesh, self).add_vertex(key, attr_dict, **kwattr)
+
+	def add_face(self, vertices, fkey=None, attr_dict=None, **kwattr):
+		self.topology_version += 1
+		return super(QuadMesh, self).add_face(vertices, fkey, attr_dict, **kwattr)
+
+	def delete_vertex(self, key):
+		self.topology_version += 1
+		return super(QuadMesh, self).delete_vertex(key)
+
+	def delete_face(self, fkey):
+		self.topology_version += 1
+		return super(QuadMesh, self).delete_face(fkey)
+
+	def set_vertex_attribute(self, *args, **kwargs):
+		self.geometry_version += 1
+		return super(QuadMesh, self).set_vertex_attribute(*args, **kwargs)
+
+	def set_vertex_attributes(self, *args, **kwargs):
+		self.geometry_version += 1
+		return super(QuadMesh, self).set_vertex_attributes(*args, **kwargs)
+
+	def set_vertices_attribute(self, *args, **kwargs):
+		self.geometry_version += 1
+		return super(QuadMesh, self).set_vertices_attribute(*args, **kwargs)
+
+	def set_vertices_attributes(self, *args, **kwargs):
+		self.geometry_version += 1
+		return super(QuadMesh, self).set_vertices_attributes(*args, **kwargs)
+
+	def set_edge_attribute(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_edge_attribute(*args, **kwargs)
+
+	def set_edge_attributes(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_edge_attributes(*args, **kwargs)
+
+	def set_edges_attribute(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_edges_attribute(*args, **kwargs)
+
+	def set_edges_attributes(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_edges_attributes(*args, **kwargs)
+
+	def set_face_attribute(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_face_attribute(*args, **kwargs)
+
+	def set_face_attributes(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_face_attributes(*args, **kwargs)
+
+	def set_faces_attribute(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_faces_attribute(*args, **kwargs)
+
+	def set_faces_attributes(self, *args, **kwargs):
+		self.attribute_version += 1
+		return super(QuadMesh, self).set_faces_attributes(*args, **kwargs)
+
+	# --------------------------------------------------------------------------
+	# cache of derived data
+	# --------------------------------------------------------------------------
+
+	def cached(self, name, function, *args, **kwargs):
+		"""Returns a derived result, computed once per version of the topology of the mesh.
+
+		Parameters
+		----------
+		name : str
+			The name of the result.
+		function : callable
+			The function computing the result from the arguments.
+		args
+			The hashable arguments of the function.
+		depends : tuple, optional
+			The other data the result depends on, 'geometry' for the vertex attributes and 'attribute' for the edge and face attributes.
+			Only the topology by default.
+
+		Returns
+		-------
+		result
+			The result of function(*args), shared between calls. It must not be modified.
+
+		"""
+
+		if self._cache_version != self.topology_version:
+			if len(self._cache) > 0:
+				self._cache_statistics['invalidations'] += 1
+			self._cache = {}
+			self._cache_version = self.topology_version
+
+		key = (name, ) + args
+		versions = tuple([getattr(self, '{}_version'.format(data)) for data in kwargs.get('depends', ())])
+		if key in self._cache and self._cache[key][0] == versions:
+			self._cache_statistics['hits'] += 1
+			return self._cache[key][1]
+
+		self._cache_statistics['misses'] += 1
+		result = function(*args)
+		self._cache[key] = (versions, result)
+
+		return result
+
+	def invalidate(self, name = None):
+		"""Invalidates the cached results, for instance after modifying the vertex, face or edge dictionaries directly.
+
+		Parameters
+		----------
+		name : str, optional
+			The name of the results to invalidate. All the results by default.
+
+		"""
+
+		if name is None:
+			self.topology_version += 1
+			self.geometry_version += 1
+			self.attribute_version += 1
+		else:
+			for key in [key for key in self._cache if key[0] == name]:
+				del self._cache[key]
+			self._cache_statistics['invalidations'] += 1
+
+	def cache_statistics(self):
+		"""Returns the statistics of the cache of derived data.
+
+		Returns
+		-------
+		dict
+			The number of 'hits', 'misses' and 'invalidations', the number of results in cache 'size'
+			and the 'topology_version', 'geometry_version' and 'attribute_version' of the mesh.
+
+		"""
+
+		statistics = dict(self._cache_statistics)
+		statistics['size'] = len(self._cache) if self._cache_version == self.topology_version else 0
+		statistics['topology_version'] = self.topology_version
+		statistics['geometry_version'] = self.geometry_version
+		statistics['attribute_version'] = self.attribute_version
+
+		return statistics
+
+	def vertices_on_boundary(self, ordered=False):
+		return list(self.cached('vertices_on_boundary', super(QuadMesh, self).vertices_on_boundary, ordered))
 
 	def not_none_edges(self):
 		"""Returns the edges oriented inwards.
@@ -159,6 +320,12 @@ class QuadMesh(Mesh):
 
 		"""
 
+		strips_to_edges = self.cached('strips_to_edges_dict', self._strips_to_edges_dict, depends = ('attribute', ))
+
+		return {strip: list(edges) for strip, edges in strips_to_edges.items()}
+
+	def _strips_to_edges_dict(self):
+
 		strips_to_edges = {}
 
 		for edge in self.edges():
@@ -0,0 +1,102 @@
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'connected_components',
+    'connected_components_from_keys',
+]
+
+def connected_components(number_of_nodes, edges):
+    """Label the connected components of a graph on integer nodes with a union-find, in linear time.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        The number of nodes, indexed from 0.
+    edges : iterable
+        The edges as pairs of node indices.
+
+    Returns
+    -------
+    labels : list
+        The component index of each node.
+    parts : list
+        The node indices of each component, ordered by their lowest node index.
+
+    Raises
+    ------
+    -
+
+    """
+
+    parent = list(range(number_of_nodes))
+    size = [1] * number_of_nodes
+
+    for u, v in edges:
+        # find with path halving
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u == v:
+            continue
+        # union by size
+        if size[u] < size[v]:
+            u, v = v, u
+        parent[v] = u
+        size[u] += size[v]
+
+    labels = [-1] * number_of_nodes
+    parts = []
+    for i in range(number_of_nodes):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        if labels[root] == -1:
+            labels[root] = len(parts)
+            parts.append([])
+        labels[i] = labels[root]
+        parts[labels[i]].append(i)
+
+    return labels, parts
+
+def connected_components_from_keys(keys, edges):
+    """Label the connected components of a graph on hashable keys.
+
+    Parameters
+    ----------
+    keys : list
+        The node keys.
+    edges : iterable
+        The edges as pairs of node keys.
+
+    Returns
+    -------
+    labels : dict
+        The component index of each node key.
+    parts : list
+        The node keys of each component.
+
+    Raises
+    ------
+    -
+
+    """
+
+    key_index = {key: i for i, key in enumerate(keys)}
+
+    labels, parts = connected_components(len(keys), ((key_index[u], key_index[v]) for u, v in edges))
+
+    return {key: labels[i] for i, key in enumerate(keys)}, [[keys[i] for i in part] for part in parts]
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
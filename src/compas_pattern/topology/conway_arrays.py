@@ -0,0 +1,280 @@
+from compas.datastructures.mesh import Mesh
+
+from compas_pattern.datastructures.halfedge_arrays import HalfEdgeArrays
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'conway_notation',
+    'conway_arrays',
+    'conway_operator',
+]
+
+# operators as sequences of primitive operators, applied from right to left
+CONWAY_PRIMITIVES = {
+    'd': 'd',
+    'j': 'j',
+    'k': 'k',
+    'g': 'g',
+    'a': 'dj',
+    'n': 'kd',
+    'z': 'dk',
+    't': 'dkd',
+    'o': 'jj',
+    'e': 'djdj',
+    's': 'dgd',
+    'm': 'kj',
+    'b': 'dkddj',
+}
+
+CONWAY_NAMES = {
+    'conway_dual': 'd',
+    'conway_join': 'j',
+    'conway_ambo': 'a',
+    'conway_kis': 'k',
+    'conway_needle': 'n',
+    'conway_zip': 'z',
+    'conway_truncate': 't',
+    'conway_ortho': 'o',
+    'conway_expand': 'e',
+    'conway_gyro': 'g',
+    'conway_snub': 's',
+    'conway_meta': 'm',
+    'conway_bevel': 'b',
+}
+
+def conway_notation(operator):
+    """Compile an operator or a chain of operators into its sequence of primitive operators (dual, join, kis and gyro).
+
+    Parameters
+    ----------
+    operator : str
+        An operator name, like 'conway_ambo', or a chain of letters in Conway notation, like 'dajk'.
+        Chains apply from right to left: 'dajk' is the dual of the ambo of the join of the kis of the seed.
+
+    Returns
+    -------
+    str
+        The primitive operators, to apply from right to left.
+
+    Raises
+    ------
+    KeyError
+        If the operator or one of the letters is unknown.
+
+    """
+
+    if operator in CONWAY_NAMES:
+        operator = CONWAY_NAMES[operator]
+
+    return ''.join([CONWAY_PRIMITIVES[letter] for letter in operator])
+
+# ==============================================================================
+# Primitive kernels on connectivity arrays
+# ==============================================================================
+
+# A kernel maps the half-edge arrays of a mesh to the faces of the transformed mesh,
+# and to one recipe per new vertex: (parent vertex indices, weights or None for the average).
+
+def _dual_kernel(arrays):
+
+    recipes = [(loop, None) for loop in arrays.face_vertices]
+
+    boundary = arrays.vertex_boundary()
+    faces = []
+    for u in range(arrays.number_of_vertices()):
+        if boundary[u]:
+            continue
+        halfedges, closed = arrays.vertex_outgoing_halfedges(u)
+        if closed:
+            faces.append([arrays.halfedge_face[h] for h in halfedges])
+
+    return faces, recipes
+
+def _join_kernel(arrays):
+
+    n = arrays.number_of_vertices()
+    halfedge_vertex = arrays.halfedge_vertex
+    halfedge_face = arrays.halfedge_face
+
+    faces = []
+    for h, t in enumerate(arrays.halfedge_twin):
+        if t > h:
+            faces.append([halfedge_vertex[h], n + halfedge_face[t], halfedge_vertex[t], n + halfedge_face[h]])
+
+    # cull the vertices without faces
+    used = [False] * (n + arrays.number_of_faces())
+    for face in faces:
+        for i in face:
+            used[i] = True
+
+    remap = {}
+    recipes = []
+    for i in range(n + arrays.number_of_faces()):
+        if used[i]:
+            remap[i] = len(recipes)
+            recipes.append(((i, ), None) if i < n else (arrays.face_vertices[i - n], None))
+
+    faces = [[remap[i] for i in face] for face in faces]
+
+    return faces, recipes
+
+def _kis_kernel(arrays):
+
+    n = arrays.number_of_vertices()
+    halfedge_vertex = arrays.halfedge_vertex
+    halfedge_next = arrays.halfedge_next
+
+    recipes = [((i, ), None) for i in range(n)] + [(loop, None) for loop in arrays.face_vertices]
+
+    faces = [[halfedge_vertex[h], halfedge_vertex[halfedge_next[h]], n + arrays.halfedge_face[h]] for h in range(arrays.number_of_halfedges())]
+
+    return faces, recipes
+
+def _gyro_kernel(arrays, t = .33):
+
+    n = arrays.number_of_vertices()
+    m = arrays.number_of_faces()
+    halfedge_vertex = arrays.halfedge_vertex
+    halfedge_next = arrays.halfedge_next
+    halfedge_twin = arrays.halfedge_twin
+    weights = (1. - t, t)
+
+    recipes = [((i, ), None) for i in range(n)] + [(loop, None) for loop in arrays.face_vertices]
+
+    # one point per half-edge, including the outer half-edges along the boundaries
+    point = [n + m + h for h in range(arrays.number_of_halfedges())]
+    outer_point = {}
+    for h in range(arrays.number_of_halfedges()):
+        u, v = halfedge_vertex[h], halfedge_vertex[halfedge_next[h]]
+        recipes.append(((u, v), weights))
+    for h in range(arrays.number_of_halfedges()):
+        if halfedge_twin[h] == -1:
+            u, v = halfedge_vertex[h], halfedge_vertex[halfedge_next[h]]
+            outer_point[h] = len(recipes)
+            recipes.append(((v, u), weights))
+
+    faces = []
+    for h in range(arrays.number_of_halfedges()):
+        twin = halfedge_twin[h]
+        nxt = halfedge_next[h]
+        faces.append([point[h], point[twin] if twin != -1 else outer_point[h], halfedge_vertex[nxt], point[nxt], n + arrays.halfedge_face[h]])
+
+    return faces, recipes
+
+CONWAY_KERNELS = {
+    'd': _dual_kernel,
+    'j': _join_kernel,
+    'k': _kis_kernel,
+    'g': _gyro_kernel,
+}
+
+def _evaluate_recipe(vertices, recipe):
+
+    indices, weights = recipe
+    x, y, z = 0, 0, 0
+    if weights is None:
+        w = 1. / len(indices)
+        for i in indices:
+            xyz = vertices[i]
+            x += xyz[0]
+            y += xyz[1]
+            z += xyz[2]
+        return [x * w, y * w, z * w]
+
+    for i, w in zip(indices, weights):
+        xyz = vertices[i]
+        x += w * xyz[0]
+        y += w * xyz[1]
+        z += w * xyz[2]
+    return [x, y, z]
+
+# ==============================================================================
+# Operators
+# ==============================================================================
+
+def conway_arrays(vertices, faces, operator):
+    """Apply a Conway operator or a chain of operators on vertex and face arrays.
+
+    The chain is compiled into primitive operators (dual, join, kis and gyro), applied one after the other on half-edge arrays.
+    Each primitive computes the new faces and a recipe per new vertex from the vertices of the previous stage,
+    evaluated right away so that only one stage is kept in memory, whatever the length of the chain.
+
+    Parameters
+    ----------
+    vertices : list
+        The vertex coordinates of the seed.
+    faces : list
+        The faces of the seed as lists of vertex indices.
+    operator : str
+        An operator name, like 'conway_ambo', or a chain of letters in Conway notation, like 'dajk'.
+
+    Returns
+    -------
+    vertices : list
+        The vertex coordinates of the transformed mesh.
+    faces : list
+        The faces of the transformed mesh as lists of vertex indices.
+
+    References
+    ----------
+    .. [1] Wikipedia. *Conway polyhedron notation*.
+           Available at: https://en.wikipedia.org/wiki/Conway_polyhedron_notation.
+    .. [2] Hart, George. *Conway Notation for Polyhedron*.
+           Available at: http://www.georgehart.com/virtual-polyhedra/conway_notation.html.
+
+    """
+
+    primitives = conway_notation(operator)
+    if len(primitives) == 0:
+        return [list(xyz) for xyz in vertices], [list(face) for face in faces]
+
+    for primitive in reversed(primitives):
+        arrays = HalfEdgeArrays.from_faces(faces, len(vertices))
+        faces, recipes = CONWAY_KERNELS[primitive](arrays)
+        # evaluate the stage right away, so that the previous stage and its recipes can be released
+        vertices = [_evaluate_recipe(vertices, recipe) for recipe in recipes]
+
+    return vertices, faces
+
+def conway_operator(mesh, operator, as_mesh = True, cls = Mesh):
+    """Apply a Conway operator on a mesh through its half-edge arrays.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A seed mesh.
+    operator : str
+        An operator name, like 'conway_ambo', or a chain of letters in Conway notation, like 'dajk'.
+    as_mesh : bool, optional
+        True to return a mesh, False to return the vertex and face arrays.
+    cls : Mesh, optional
+        The class of the returned mesh.
+
+    Returns
+    -------
+    mesh
+        The transformed mesh, if as_mesh is True.
+    (vertices, faces) : tuple
+        The vertex coordinates and the faces of the transformed mesh, if as_mesh is False.
+
+    """
+
+    arrays = HalfEdgeArrays.from_mesh(mesh)
+    vertices, faces = conway_arrays(arrays.xyz, arrays.face_vertices, operator)
+
+    if not as_mesh:
+        return vertices, faces
+
+    return cls.from_vertices_and_faces(vertices, faces)
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
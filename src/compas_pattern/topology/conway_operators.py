@@ -1,4 +1,4 @@
-from compas.datastructures.mesh import Mesh
+from compas_pattern.topology.conway_arrays import conway_operator
 
 __author__     = ['Robin Oval']
 __copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
@@ -43,13 +43,7 @@ def conway_dual(mesh):
 
 	"""
 
-	vertices = [mesh.face_centroid(fkey) for fkey in mesh.faces()]
-
-	old_faces_to_new_vertices = {fkey: i for i, fkey in enumerate(mesh.faces())}
-	
-	faces = [[old_faces_to_new_vertices[fkey] for fkey in reversed(mesh.vertex_faces(vkey, ordered = True))] for vkey in mesh.vertices() if not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) != 0]
-
-	return Mesh.from_vertices_and_faces(vertices, faces)
+	return conway_operator(mesh, 'conway_dual')
 
 def conway_join(mesh):
 	"""Generates the join mesh from a seed mesh.
@@ -73,19 +67,7 @@ def conway_join(mesh):
 
 	"""
 
-	vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()]
-	
-	old_vertices_to_new_vertices = {vkey: i for i, vkey in enumerate(mesh.vertices())}
-	old_faces_to_new_vertices = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
-	
-	faces = [[
-		old_vertices_to_new_vertices[u], old_faces_to_new_vertices[mesh.halfedge[v][u]], old_vertices_to_new_vertices[v], old_faces_to_new_vertices[mesh.halfedge[u][v]]
-		] for u, v in mesh.edges() if not mesh.is_edge_on_boundary(u, v)]
-
-	join_mesh =  Mesh.from_vertices_and_faces(vertices, faces)
-	join_mesh.cull_vertices()
-
-	return join_mesh
+	return conway_operator(mesh, 'conway_join')
 
 def conway_ambo(mesh):
 	"""Generates the ambo mesh from a seed mesh.
@@ -109,7 +91,7 @@ def conway_ambo(mesh):
 
 	"""
 
-	return conway_dual(conway_join(mesh))
+	return conway_operator(mesh, 'conway_ambo')
 
 def conway_kis(mesh):
 	"""Generates the kis mesh from a seed mesh.
@@ -133,16 +115,7 @@ def conway_kis(mesh):
 
 	"""
 
-	vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()]
-	
-	old_vertices_to_new_vertices = {vkey: i for i, vkey in enumerate(mesh.vertices())}
-	old_faces_to_new_vertices = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
-	
-	faces = [[
-		old_vertices_to_new_vertices[u], old_vertices_to_new_vertices[v], old_faces_to_new_vertices[mesh.halfedge[u][v]]
-		] for fkey in mesh.faces() for u, v in mesh.face_halfedges(fkey)]
-
-	return Mesh.from_vertices_and_faces(vertices, faces)
+	return conway_operator(mesh, 'conway_kis')
 
 def conway_needle(mesh):
 	"""Generates the needle mesh from a seed mesh.
@@ -166,7 +139,7 @@ def conway_needle(mesh):
 
 	"""
 
-	return conway_kis(conway_dual(mesh))
+	return conway_operator(mesh, 'conway_needle')
 
 def conway_zip(mesh):
 	"""Generates the zip mesh from a seed mesh.
@@ -190,7 +163,7 @@ def conway_zip(mesh):
 
 	"""
 
-	return conway_dual(conway_kis(mesh))
+	return conway_operator(mesh, 'conway_zip')
 
 def conway_truncate(mesh):
 	"""Generates the truncate mesh from a seed mesh.
@@ -214,7 +187,7 @@ def conway_truncate(mesh):
 
 	"""
 
-	return conway_dual(conway_kis(conway_dual(mesh)))
+	return conway_operator(mesh, 'conway_truncate')
 
 def conway_ortho(mesh):
 	"""Generates the ortho mesh from a seed mesh.
@@ -238,7 +211,7 @@ def conway_ortho(mesh):
 
 	"""
 
-	return conway_join(conway_join(mesh))
+	return conway_operator(mesh, 'conway_ortho')
 
 def conway_expand(mesh):
 	"""Generates the expand mesh from a seed mesh.
@@ -262,7 +235,7 @@ def conway_expand(mesh):
 
 	"""
 
-	return conway_ambo(conway_ambo(mesh))
+	return conway_operator(mesh, 'conway_expand')
 
 def conway_gyro(mesh):
 	"""Generates the gyro mesh from a seed mesh.
@@ -286,17 +259,7 @@ def conway_gyro(mesh):
 
 	"""
 
-	vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()] + [mesh.edge_point(u, v, t = .33) for u in mesh.vertices() for v in mesh.halfedge[u]]
-	
-	old_vertices_to_new_vertices = {vkey: i for i, vkey in enumerate(mesh.vertices())}
-	old_faces_to_new_vertices = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
-	old_halfedges_to_new_vertices = {halfedge: i + mesh.number_of_vertices() + mesh.number_of_faces() for i, halfedge in enumerate([(u, v) for u in mesh.vertices() for v in mesh.halfedge[u]])}
-	
-	faces = [[
-		old_halfedges_to_new_vertices[(u, v)], old_halfedges_to_new_vertices[(v, u)], old_vertices_to_new_vertices[v], old_halfedges_to_new_vertices[(v, mesh.face_vertex_descendant(fkey, v))], old_faces_to_new_vertices[mesh.halfedge[u][v]]
-		] for fkey in mesh.faces() for u, v in mesh.face_halfedges(fkey)]
-
-	return Mesh.from_vertices_and_faces(vertices, faces)
+	return conway_operator(mesh, 'conway_gyro')
 
 def conway_snub(mesh):
 	"""Generates the snub mesh from a seed mesh.
@@ -320,7 +283,7 @@ def conway_snub(mesh):
 
 	"""
 
-	return conway_dual(conway_gyro(conway_dual(mesh)))
+	return conway_operator(mesh, 'conway_snub')
 
 def conway_meta(mesh):
 	"""Generates the meta mesh from a seed mesh.
@@ -344,7 +307,7 @@ def conway_meta(mesh):
 
 	"""
 
-	return conway_kis(conway_join(mesh))
+	return conway_operator(mesh, 'conway_meta')
 
 def conway_bevel(mesh):
 	"""Generates the bevel mesh from a seed mesh.
@@ -368,7 +331,7 @@ def conway_bevel(mesh):
 
 	"""
 
-	return conway_truncate(conway_ambo(mesh))
+	return conway_operator(mesh, 'conway_bevel')
 
 # ==============================================================================
 # Main
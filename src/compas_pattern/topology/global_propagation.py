@@ -1,6 +1,8 @@
 from compas.datastructures.mesh import Mesh
 from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
 
+from collections import deque
+
 from compas.utilities import geometric_key
 
 from compas.geometry.algorithms.interpolation import discrete_coons_patch
@@ -21,11 +23,40 @@ __license__    = 'MIT License'
 __email__      = 'oval@arch.ethz.ch'
 
 __all__ = [
+    'coons_patch_side_indices',
     'face_propagation',
     'mesh_propagation',
 ]
 
-def face_propagation(mesh, fkey, regular_vertices):
+def coons_patch_side_indices(m, n):
+    """Indices of the vertices along the sides of a discrete Coons patch with m points along ab and cd and n points along bc and da.
+
+    Parameters
+    ----------
+    m : int
+        Number of points along the sides ab and cd.
+    n : int
+        Number of points along the sides bc and da.
+
+    Returns
+    -------
+    side_indices : dict
+        The vertex indices in the patch grid along each side 'ab', 'bc', 'cd' and 'da', in this direction.
+
+    Raises
+    ------
+    -
+
+    """
+
+    return {
+        'ab': [i * n for i in range(m)],
+        'bc': [(m - 1) * n + j for j in range(n)],
+        'cd': [i * n + n - 1 for i in reversed(range(m))],
+        'da': [j for j in reversed(range(n))],
+    }
+
+def face_propagation(mesh, fkey, regular_vertices, verify = False):
     """Subdivide a polygon face into quads which used to be a quad with four original vertices.
     Subdivision is valid only if opposite edges have the same number of points or if one only has two.
     "len(ab) = len(cd) or len(ab) = 2 or len(cd) = 2"
@@ -38,12 +69,15 @@ def face_propagation(mesh, fkey, regular_vertices):
         Key of face to subdivide.
     regular_vertices: list
         List of four face vertex indices.
+    verify: bool, optional
+        If True, check that the existing vertices matched to the Coons patch vertices have the same geometric key.
 
     Returns
     -------
     new_faces : list, None
         The keys of the new faces that replace the old face.
         None if face was an original quad face with four original vertices or if subdivision if not valid.
+        None if the verification is requested and fails.
 
     Raises
     ------
@@ -53,15 +87,13 @@ def face_propagation(mesh, fkey, regular_vertices):
 
     face_vertices = mesh.face_vertices(fkey)
 
-    face_vertex_map = {geometric_key(mesh.vertex_coordinates(vkey)): vkey for vkey in face_vertices}
-
     # need four original vertices of initial face
     if len(regular_vertices) != 4:
         #exception if previous cross propagation: temporarily add vertices to the original vertices if is four-valent or if is three-valent and adjacent to only one four-valent face
         if len(regular_vertices) == 2:
             for vkey in face_vertices:
                 four_valent_adjacent_faces = [fkey2 for fkey2 in mesh.vertex_faces(vkey) if len(mesh.face_vertices(fkey2)) == 4]
-                if (not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbours(vkey)) == 4) or (not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbours(vkey)) == 3 and len(four_valent_adjacent_faces) == 1) or (mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbours(vkey)) == 3):
+                if (not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) == 4) or (not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) == 3 and len(four_valent_adjacent_faces) == 1) or (mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) == 3):
                     if vkey not in regular_vertices:
                         regular_vertices.append(vkey)
     if len(regular_vertices) != 4:
@@ -110,53 +142,71 @@ def face_propagation(mesh, fkey, regular_vertices):
     if len(bc) != len(da) and len(bc) != 2 and len(da) != 2:
         return None
 
-    # store information to update potential adjacent faces for further propagation
+    # store information to update potential adjacent faces for further propagation:
+    # the indices in the coons patch grid of the new points along the edge
     update = {}
 
+    m = max(len(ab), len(cd))
+    n = max(len(bc), len(da))
+    side_indices = coons_patch_side_indices(m, n)
+
+    # correspondence from the indices of the coons patch grid to the existing vertices along the sides
+    vertex_correspondence = {}
+    for side, vkeys in zip(['ab', 'bc', 'cd', 'da'], [ab, bc, cd, da]):
+        indices = side_indices[side]
+        # collapsed side at a pole
+        if vkeys[0] == vkeys[-1]:
+            for i in indices:
+                vertex_correspondence[i] = vkeys[0]
+        elif len(vkeys) == len(indices):
+            for i, vkey in zip(indices, vkeys):
+                vertex_correspondence[i] = vkey
+        else:
+            vertex_correspondence[indices[0]] = vkeys[0]
+            vertex_correspondence[indices[-1]] = vkeys[-1]
+
     # for each pair of opposite edges, get valid input for coons patching with point lists
     if len(ab) == len(cd):
-        m = len(ab)
         ab = [mesh.vertex_coordinates(vkey) for vkey in ab]
         dc = list(reversed([mesh.vertex_coordinates(vkey) for vkey in cd]))
     elif len(ab) == 2:
-        m = len(cd)
         a, b = ab
         ab = [mesh.edge_point(a, b, t / (float(m) - 1)) for t in range(m)]
         dc = list(reversed([mesh.vertex_coordinates(vkey) for vkey in cd]))
-        update[(a, b)] = ab
+        update[(a, b)] = side_indices['ab']
     else:
-        m = len(ab)
         c, d = cd
         dc = [mesh.edge_point(d, c, t / (float(m) - 1)) for t in range(m)]
         ab = [mesh.vertex_coordinates(vkey) for vkey in ab]
-        update[(c, d)] = list(reversed(dc))
+        update[(c, d)] = side_indices['cd']
 
 
     if len(bc) == len(da):
-        n = len(bc)
         bc = [mesh.vertex_coordinates(vkey) for vkey in bc]
         ad = list(reversed([mesh.vertex_coordinates(vkey) for vkey in da]))
     elif len(da) == 2:
-        n = len(bc)
         d, a = da
         ad = [mesh.edge_point(a, d, t / (float(n) - 1)) for t in range(n)]
         bc = [mesh.vertex_coordinates(vkey) for vkey in bc]
-        update[(d, a)] = list(reversed(ad))
+        update[(d, a)] = side_indices['da']
     else:
-        n = len(da)
         b, c = bc
         bc = [mesh.edge_point(b, c, t / (float(n) - 1)) for t in range(n)]
         ad = list(reversed([mesh.vertex_coordinates(vkey) for vkey in da]))
-        update[(b, c)] = bc
+        update[(b, c)] = side_indices['bc']
 
     # vertices and faces from coons patching of face
     new_vertices, new_face_vertices = discrete_coons_patch(ab, bc, dc, ad)
-    # add new vertices only if does not match an existing face
+    if verify:
+        for i, vkey in vertex_correspondence.items():
+            if geometric_key(new_vertices[i]) != geometric_key(mesh.vertex_coordinates(vkey)):
+                return None
+
+    # add new vertices only if does not match an existing vertex along the sides
     vertex_remap = []
-    for vertex in new_vertices:
-        geom_key = geometric_key(vertex)
-        if geom_key in face_vertex_map:
-            vertex_remap.append(face_vertex_map[geom_key])
+    for i, vertex in enumerate(new_vertices):
+        if i in vertex_correspondence:
+            vertex_remap.append(vertex_correspondence[i])
         else:
             x, y, z = vertex
             vkey = mesh.add_vertex(attr_dict = {'x': x, 'y': y, 'z': z})
@@ -168,19 +218,18 @@ def face_propagation(mesh, fkey, regular_vertices):
     for face in new_face_vertices:
         new_faces.append(mesh.add_face(list(reversed([vertex_remap[vkey] for vkey in face]))))
     
-    # update adjacent faces by inserting new vertices
-    vertex_map = {geometric_key(mesh.vertex_coordinates(vkey)): vkey for vkey in mesh.vertices()}
-    for edge, points in update.items():
+    # update adjacent faces by inserting new vertices, retrieved from their position along the edge
+    for edge, indices in update.items():
         u, v = edge
         if u == v:
             continue
         if u in mesh.halfedge[v] and mesh.halfedge[v][u] is not None:
-            vertices = [vertex_map[geometric_key(point)] for point in points]
+            vertices = [vertex_remap[i] for i in indices]
             insert_vertices_in_halfedge(mesh, v, u, list(reversed(vertices[1 : -1])))
 
     return new_faces
 
-def mesh_propagation(mesh, regular_vertices):
+def mesh_propagation(mesh, regular_vertices, verify = False):
     """Global mesh propagation of local rule/operation that would break the quad constraint.
 
     Parameters
@@ -189,6 +238,8 @@ def mesh_propagation(mesh, regular_vertices):
         A quad mesh.
     regular_vertices: list
         List of original vertices of the quad mesh before editing.
+    verify: bool, optional
+        If True, check the vertex correspondences of each face propagation with geometric keys.
 
     Returns
     -------
@@ -201,31 +252,36 @@ def mesh_propagation(mesh, regular_vertices):
 
     """
 
-    count = mesh.number_of_faces()
-
-    # loop over faces and try to propagate
-    while count > 0:
-        count -= 1
-        propagated = False
-        faces = list(mesh.faces())
-        for fkey in faces:
-            face_vertices = mesh.face_vertices(fkey)
-            # if valency higher than 4
-            if len(face_vertices) > 4:
-                # retrieve original vertices
-                face_original_vertices = [vkey for vkey in face_vertices if vkey in regular_vertices]
-                # propagate
-                new_faces = face_propagation(mesh, fkey, face_original_vertices)
-                faces += new_faces
-                count += len(new_faces)
-                propagated = True
-                break
-        # if propagation, then try again
-        if propagated:
+    regular_vertices = set(regular_vertices)
+
+    # worklist of the faces with a valency higher than 4
+    worklist = deque([fkey for fkey in mesh.faces() if len(mesh.face_vertices(fkey)) > 4])
+    queued = set(worklist)
+
+    while len(worklist) > 0:
+        fkey = worklist.popleft()
+        queued.discard(fkey)
+        if fkey not in mesh.face:
             continue
-        # if no propagation, then stop
-        else:
-            break
+        face_vertices = mesh.face_vertices(fkey)
+        if len(face_vertices) <= 4:
+            continue
+        # retrieve original vertices
+        face_original_vertices = [vkey for vkey in face_vertices if vkey in regular_vertices]
+        # propagate
+        new_faces = face_propagation(mesh, fkey, face_original_vertices, verify)
+        # if no propagation, the face waits for a modification from a neighbour
+        if new_faces is None:
+            continue
+        # the faces along the new faces may have received new vertices
+        for new_fkey in new_faces:
+            for u, v in mesh.face_halfedges(new_fkey):
+                if u == v:
+                    continue
+                nbr = mesh.halfedge[v].get(u)
+                if nbr is not None and nbr not in queued and len(mesh.face_vertices(nbr)) > 4:
+                    worklist.append(nbr)
+                    queued.add(nbr)
 
     return mesh
 
@@ -15,7 +15,7 @@ from compas.geometry import distance_point_point
 from compas.geometry import subtract_vectors
 from compas.geometry import dot_vectors
 
-from compas_pattern.topology.joining_welding import unweld_mesh_along_edge_path
+from compas_pattern.topology.joining_welding import unweld_mesh_along_edge_paths
 from compas_pattern.topology.joining_welding import unjoin_mesh_parts
 
 from compas_pattern.datastructures.mesh import mesh_disjointed_parts
@@ -740,7 +740,7 @@ def remove_tri(mesh, fkey_tri, fkey_quad, pole, t = .5):
     if len(mesh.face_vertices(fkey_tri)) != 3 or len(mesh.face_vertices(fkey_quad)) != 4:
         return None
 
-    if fkey_tri not in mesh.face_neighbours(fkey_quad):
+    if fkey_tri not in mesh.face_neighbors(fkey_quad):
         return None
 
     if pole not in mesh.face_vertices(fkey_tri) or pole not in mesh.face_vertices(fkey_quad):
@@ -792,15 +792,17 @@ def rotate_vertex(mesh, vkey):
         return None
 
     face_vertices = {}
-    for nbr in mesh.vertex_neighbours(vkey, True):
+    for nbr in mesh.vertex_neighbors(vkey, True):
         fkey_0 = mesh.halfedge[vkey][nbr]
         fkey_1 = mesh.halfedge[nbr][vkey]
         ukey = mesh.face_vertex_descendant(fkey_0, nbr)
         wkey = mesh.face_vertex_ancestor(fkey_1, nbr)
         face_vertices[fkey_0] = [ukey, vkey, wkey, nbr]
 
-    for fkey, vertices in face_vertices.items():
+    # delete all the faces before adding the rotated ones, which share half-edges with the initial ones
+    for fkey in face_vertices:
         mesh.delete_face(fkey)
+    for fkey, vertices in face_vertices.items():
         mesh.add_face(vertices, fkey = fkey)
 
     return list(face_vertices.keys())
@@ -927,8 +929,7 @@ def close_handle_2(mesh, edge_path_1, edge_path_2):
     # two closed edge paths
 
     # unweld
-    unweld_mesh_along_edge_path(mesh, edge_path_1)
-    unweld_mesh_along_edge_path(mesh, edge_path_2)
+    unweld_mesh_along_edge_paths(mesh, [edge_path_1, edge_path_2])
 
     # explode
     parts = mesh_disjointed_parts(mesh)
@@ -0,0 +1,566 @@
+import random
+
+from compas_pattern.topology.grammar import vertex_pole
+from compas_pattern.topology.grammar import face_pole
+from compas_pattern.topology.grammar import edge_pole
+from compas_pattern.topology.grammar import add_opening
+from compas_pattern.topology.grammar import close_opening
+from compas_pattern.topology.grammar import flat_corner_2
+from compas_pattern.topology.grammar import flat_corner_3
+from compas_pattern.topology.grammar import flat_corner_33
+from compas_pattern.topology.grammar import split_35
+from compas_pattern.topology.grammar import split_35_diag
+from compas_pattern.topology.grammar import split_26
+from compas_pattern.topology.grammar import simple_split
+from compas_pattern.topology.grammar import double_split
+from compas_pattern.topology.grammar import insert_pole
+from compas_pattern.topology.grammar import insert_partial_pole
+from compas_pattern.topology.grammar import pseudo_quad_split
+from compas_pattern.topology.grammar import singular_boundary_1
+from compas_pattern.topology.grammar import singular_boundary_2
+from compas_pattern.topology.grammar import singular_boundary_minus_1
+from compas_pattern.topology.grammar import remove_tri
+from compas_pattern.topology.grammar import rotate_vertex
+from compas_pattern.topology.grammar import clear_faces
+from compas_pattern.topology.grammar import add_handle
+from compas_pattern.topology.grammar import close_handle
+from compas_pattern.topology.grammar import close_handle_2
+
+from compas_pattern.topology.global_propagation import mesh_propagation
+
+from compas_pattern.topology.polyline_extraction import mesh_boundaries
+
+from compas.geometry import subtract_vectors
+from compas.geometry import dot_vectors
+from compas.geometry import length_vector
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'GrammarRule',
+    'RULES',
+    'register_rule',
+    'apply_rule',
+    'apply_rule_sequence',
+    'random_rule_sequence',
+    'random_rule_sequences',
+]
+
+class GrammarRule(object):
+    """A grammar rule with its argument schema and its precondition.
+
+    Attributes
+    ----------
+    name : str
+        The name of the rule.
+    function : callable
+        The rule, as function(mesh, *arguments).
+    arguments : list
+        The argument schema as a list of (name, kind) tuples.
+        Kinds referring to a previous argument refer to the first one:
+        'face', 'face_edge' (a half-edge of the face), 'face_vertex' (a vertex of the face),
+        'adjacent_face' (a face adjacent to the face), 'edge', 'edge_vertex' (a vertex of the edge),
+        'vertex', 'boundary' (a boundary polyline), 'face_strip' (a closed strip of faces),
+        and the non-samplable 'faces', 'vertices' and 'edge_path'.
+    precondition : callable
+        The check that the arguments are valid for the rule, as precondition(mesh, *arguments).
+
+    """
+
+    def __init__(self, name, function, arguments, precondition):
+        self.name = name
+        self.function = function
+        self.arguments = arguments
+        self.precondition = precondition
+
+    def is_samplable(self):
+        return all([kind in SAMPLERS for name, kind in self.arguments])
+
+    def is_applicable(self, mesh, *args):
+        try:
+            return bool(self.precondition(mesh, *args))
+        except (KeyError, ValueError, TypeError):
+            return False
+
+    def apply(self, mesh, *args):
+        # apply the rule on arguments already known to be valid
+        # some rules modify their list arguments in place
+        return self.function(mesh, *[list(arg) if isinstance(arg, list) else arg for arg in args])
+
+    def __call__(self, mesh, *args):
+        if not self.is_applicable(mesh, *args):
+            return None
+        return self.apply(mesh, *args)
+
+RULES = {}
+
+def register_rule(name, function, arguments, precondition):
+    """Register a grammar rule in the rule registry.
+
+    Parameters
+    ----------
+    name : str
+        The name of the rule.
+    function : callable
+        The rule, as function(mesh, *arguments).
+    arguments : list
+        The argument schema as a list of (name, kind) tuples.
+    precondition : callable
+        The check that the arguments are valid for the rule, as precondition(mesh, *arguments).
+
+    Returns
+    -------
+    GrammarRule
+        The registered rule.
+
+    """
+
+    rule = GrammarRule(name, function, arguments, precondition)
+    RULES[name] = rule
+
+    return rule
+
+# ==============================================================================
+# Preconditions
+# ==============================================================================
+
+def _is_quad(mesh, fkey):
+
+    return fkey in mesh.face and len(mesh.face_vertices(fkey)) == 4 and len(set(mesh.face_vertices(fkey))) == 4
+
+def _is_pseudo_quad(mesh, fkey):
+
+    if fkey not in mesh.face:
+        return False
+    face_vertices = mesh.face_vertices(fkey)
+
+    return len(face_vertices) == 4 and any([face_vertices[i - 1] == face_vertices[i] for i in range(3)])
+
+def _is_face_edge(mesh, fkey, edge):
+
+    u, v = edge
+
+    return u != v and ((u, v) in mesh.face_halfedges(fkey) or (v, u) in mesh.face_halfedges(fkey))
+
+def _face_edge_start(mesh, fkey, edge):
+
+    u, v = edge
+    if v in mesh.halfedge[u] and mesh.halfedge[u][v] == fkey:
+        return u, v
+
+    return v, u
+
+def _is_interior_edge(mesh, edge):
+
+    u, v = edge
+
+    return u != v and u in mesh.halfedge and v in mesh.halfedge[u] and mesh.halfedge[u][v] is not None and mesh.halfedge[v][u] is not None
+
+def _has_simple_neighbours(mesh, fkey):
+    # the rules insert vertices in the faces adjacent to their faces after a vertex,
+    # which fails halfway through the modification if the vertex appears twice in the adjacent face
+
+    for u, v in mesh.face_halfedges(fkey):
+        nbr = mesh.halfedge[v].get(u)
+        if nbr is not None and len(set(mesh.face_vertices(nbr))) != len(mesh.face_vertices(nbr)):
+            return False
+
+    return True
+
+def _has_normal(mesh, fkey):
+
+    return length_vector(mesh.face_normal(fkey, unitized = False)) > 0
+
+def _precondition_face(mesh, fkey):
+
+    return _is_quad(mesh, fkey) and _has_simple_neighbours(mesh, fkey)
+
+def _precondition_face_vertex(mesh, fkey, vkey):
+
+    return _precondition_face(mesh, fkey) and vkey in mesh.face_vertices(fkey)
+
+def _precondition_face_edge(mesh, fkey, edge):
+
+    return _precondition_face(mesh, fkey) and _is_face_edge(mesh, fkey, edge)
+
+def _precondition_simple_split(mesh, fkey, edge):
+
+    return fkey in mesh.face and len(mesh.face_vertices(fkey)) == 4 and _is_face_edge(mesh, fkey, edge) and _has_simple_neighbours(mesh, fkey)
+
+def _precondition_pseudo_quad_split(mesh, fkey):
+
+    return _is_pseudo_quad(mesh, fkey) and _has_simple_neighbours(mesh, fkey)
+
+def _precondition_insert_partial_pole(mesh, fkey, pole, edge):
+
+    if not _precondition_face_vertex(mesh, fkey, pole) or not _is_face_edge(mesh, fkey, edge):
+        return False
+    u, v = _face_edge_start(mesh, fkey, edge)
+    b = mesh.face_vertex_descendant(fkey, pole)
+    c = mesh.face_vertex_descendant(fkey, b)
+
+    return u == b or u == c
+
+def _precondition_singular_boundary(mesh, edge, vkey):
+
+    u, v = edge
+
+    return vkey in edge and _is_interior_edge(mesh, edge) and _precondition_face(mesh, mesh.halfedge[u][v]) and _precondition_face(mesh, mesh.halfedge[v][u])
+
+def _precondition_singular_boundary_minus_1(mesh, fkey, vkey):
+
+    if not _precondition_face_vertex(mesh, fkey, vkey):
+        return False
+    b = mesh.face_vertex_descendant(fkey, vkey)
+    c = mesh.face_vertex_descendant(fkey, b)
+    d = mesh.face_vertex_descendant(fkey, c)
+    fkey_1 = mesh.halfedge[c].get(b)
+    fkey_2 = mesh.halfedge[d].get(c)
+
+    return fkey_1 is not None and fkey_2 is not None and len(set([fkey, fkey_1, fkey_2])) == 3 and _precondition_face(mesh, fkey_1) and _precondition_face(mesh, fkey_2)
+
+def _precondition_remove_tri(mesh, fkey_tri, fkey_quad, pole):
+
+    if fkey_tri not in mesh.face or len(set(mesh.face_vertices(fkey_tri))) != 3 or not _precondition_face(mesh, fkey_quad):
+        return False
+    if not _has_simple_neighbours(mesh, fkey_tri):
+        return False
+    if pole not in mesh.face_vertices(fkey_tri) or pole not in mesh.face_vertices(fkey_quad):
+        return False
+
+    return any([mesh.halfedge[v].get(u) == fkey_quad for u, v in mesh.face_halfedges(fkey_tri)])
+
+def _precondition_rotate_vertex(mesh, vkey):
+
+    if vkey not in mesh.vertex or len(mesh.halfedge[vkey]) == 0 or mesh.is_vertex_on_boundary(vkey):
+        return False
+
+    return all([_is_quad(mesh, fkey) for fkey in mesh.vertex_faces(vkey)])
+
+def _precondition_add_handle(mesh, fkey_1, fkey_2):
+
+    if fkey_1 == fkey_2 or not _is_quad(mesh, fkey_1) or not _is_quad(mesh, fkey_2):
+        return False
+    if len(set(mesh.face_vertices(fkey_1)) & set(mesh.face_vertices(fkey_2))) > 0:
+        return False
+    if not _has_normal(mesh, fkey_1) or not _has_normal(mesh, fkey_2):
+        return False
+    orientation_1 = dot_vectors(subtract_vectors(mesh.face_centroid(fkey_2), mesh.face_centroid(fkey_1)), mesh.face_normal(fkey_1))
+    orientation_2 = dot_vectors(subtract_vectors(mesh.face_centroid(fkey_1), mesh.face_centroid(fkey_2)), mesh.face_normal(fkey_2))
+
+    return orientation_1 * orientation_2 >= 0
+
+def _precondition_close_opening(mesh, vkeys):
+
+    if vkeys[0] == vkeys[-1]:
+        vkeys = vkeys[:-1]
+    if len(vkeys) < 3:
+        return False
+
+    return all([vkeys[i] in mesh.halfedge[vkeys[i - 1]] and mesh.halfedge[vkeys[i - 1]][vkeys[i]] is None for i in range(len(vkeys))])
+
+def _precondition_close_handle(mesh, fkeys):
+
+    if fkeys[0] == fkeys[-1]:
+        fkeys = fkeys[:-1]
+    if len(fkeys) < 2 or not all([_is_quad(mesh, fkey) for fkey in fkeys]):
+        return False
+
+    return all([fkeys[i - 1] in mesh.face_neighbors(fkeys[i]) for i in range(len(fkeys))])
+
+def _precondition_clear_faces(mesh, fkeys, vkeys):
+
+    return len(vkeys) == 4 and all([fkey in mesh.face for fkey in fkeys]) and all([vkey in mesh.vertex for vkey in vkeys])
+
+def _precondition_close_handle_2(mesh, edge_path_1, edge_path_2):
+
+    return all([v in mesh.halfedge[u] for edge_path in [edge_path_1, edge_path_2] for u, v in edge_path])
+
+# ==============================================================================
+# Registry
+# ==============================================================================
+
+register_rule('vertex_pole', vertex_pole, [('fkey', 'face'), ('pole', 'face_vertex')], _precondition_face_vertex)
+register_rule('face_pole', face_pole, [('fkey', 'face')], _precondition_face)
+register_rule('edge_pole', edge_pole, [('fkey', 'face'), ('edge', 'face_edge')], _precondition_face_edge)
+register_rule('add_opening', add_opening, [('fkey', 'face')], _precondition_face)
+register_rule('close_opening', close_opening, [('vkeys', 'boundary')], _precondition_close_opening)
+register_rule('flat_corner_2', flat_corner_2, [('fkey', 'face'), ('corner', 'face_vertex')], _precondition_face_vertex)
+register_rule('flat_corner_3', flat_corner_3, [('fkey', 'face'), ('corner', 'face_vertex')], _precondition_face_vertex)
+register_rule('flat_corner_33', flat_corner_33, [('fkey', 'face'), ('corner', 'face_vertex')], _precondition_face_vertex)
+register_rule('split_35', split_35, [('fkey', 'face'), ('edge', 'face_edge')], _precondition_face_edge)
+register_rule('split_35_diag', split_35_diag, [('fkey', 'face'), ('corner', 'face_vertex')], _precondition_face_vertex)
+register_rule('split_26', split_26, [('fkey', 'face'), ('edge', 'face_edge')], _precondition_face_edge)
+register_rule('simple_split', simple_split, [('fkey', 'face'), ('edge', 'face_edge')], _precondition_simple_split)
+register_rule('double_split', double_split, [('fkey', 'face')], _precondition_face)
+register_rule('insert_pole', insert_pole, [('fkey', 'face'), ('pole', 'face_vertex')], _precondition_face_vertex)
+register_rule('insert_partial_pole', insert_partial_pole, [('fkey', 'face'), ('pole', 'face_vertex'), ('edge', 'face_edge')], _precondition_insert_partial_pole)
+register_rule('pseudo_quad_split', pseudo_quad_split, [('fkey', 'face')], _precondition_pseudo_quad_split)
+register_rule('singular_boundary_1', singular_boundary_1, [('edge', 'edge'), ('vkey', 'edge_vertex')], _precondition_singular_boundary)
+register_rule('singular_boundary_2', singular_boundary_2, [('edge', 'edge'), ('vkey', 'edge_vertex')], _precondition_singular_boundary)
+register_rule('singular_boundary_minus_1', singular_boundary_minus_1, [('fkey', 'face'), ('vkey', 'face_vertex')], _precondition_singular_boundary_minus_1)
+register_rule('remove_tri', remove_tri, [('fkey_tri', 'face'), ('fkey_quad', 'adjacent_face'), ('pole', 'face_vertex')], _precondition_remove_tri)
+register_rule('rotate_vertex', rotate_vertex, [('vkey', 'vertex')], _precondition_rotate_vertex)
+register_rule('clear_faces', clear_faces, [('fkeys', 'faces'), ('vkeys', 'vertices')], _precondition_clear_faces)
+register_rule('add_handle', add_handle, [('fkey_1', 'face'), ('fkey_2', 'face')], _precondition_add_handle)
+register_rule('close_handle', close_handle, [('fkeys', 'face_strip')], _precondition_close_handle)
+register_rule('close_handle_2', close_handle_2, [('edge_path_1', 'edge_path'), ('edge_path_2', 'edge_path')], _precondition_close_handle_2)
+
+# ==============================================================================
+# Argument samplers
+# ==============================================================================
+
+def _sample_face(mesh, args, rng):
+
+    return rng.choice(list(mesh.faces()))
+
+def _sample_face_edge(mesh, args, rng):
+
+    return rng.choice(mesh.face_halfedges(args[0]))
+
+def _sample_face_vertex(mesh, args, rng):
+
+    return rng.choice(mesh.face_vertices(args[0]))
+
+def _sample_adjacent_face(mesh, args, rng):
+
+    nbrs = [mesh.halfedge[v][u] for u, v in mesh.face_halfedges(args[0]) if mesh.halfedge[v].get(u) is not None]
+
+    return rng.choice(nbrs) if len(nbrs) > 0 else None
+
+def _sample_edge(mesh, args, rng):
+
+    u = rng.choice(list(mesh.vertices()))
+    nbrs = list(mesh.halfedge[u])
+
+    return (u, rng.choice(nbrs)) if len(nbrs) > 0 else None
+
+def _sample_edge_vertex(mesh, args, rng):
+
+    return rng.choice(args[0])
+
+def _sample_vertex(mesh, args, rng):
+
+    return rng.choice(list(mesh.vertices()))
+
+def _sample_boundary(mesh, args, rng):
+
+    boundaries = mesh_boundaries(mesh)
+
+    return rng.choice(boundaries) if len(boundaries) > 0 else None
+
+def _sample_face_strip(mesh, args, rng):
+
+    fkey = _sample_face(mesh, args, rng)
+    if not _is_quad(mesh, fkey):
+        return None
+
+    # walk across opposite edges until the strip closes
+    u, v = rng.choice(mesh.face_halfedges(fkey))
+    fkeys = [fkey]
+    count = mesh.number_of_faces()
+    while count > 0:
+        count -= 1
+        w = mesh.face_vertex_descendant(fkeys[-1], v)
+        x = mesh.face_vertex_descendant(fkeys[-1], w)
+        nxt = mesh.halfedge[w].get(x)
+        if nxt is None or not _is_quad(mesh, nxt):
+            return None
+        if nxt == fkeys[0]:
+            return fkeys
+        if nxt in fkeys:
+            return None
+        fkeys.append(nxt)
+        v = w
+
+    return None
+
+SAMPLERS = {
+    'face': _sample_face,
+    'face_edge': _sample_face_edge,
+    'face_vertex': _sample_face_vertex,
+    'adjacent_face': _sample_adjacent_face,
+    'edge': _sample_edge,
+    'edge_vertex': _sample_edge_vertex,
+    'vertex': _sample_vertex,
+    'boundary': _sample_boundary,
+    'face_strip': _sample_face_strip,
+}
+
+def _sample_arguments(mesh, rule, rng):
+
+    args = []
+    for name, kind in rule.arguments:
+        arg = SAMPLERS[kind](mesh, args, rng)
+        if arg is None:
+            return None
+        args.append(arg)
+
+    return args
+
+# ==============================================================================
+# Engine
+# ==============================================================================
+
+def _update_regular_vertices(mesh, regular_vertices):
+
+    for vkey in mesh.vertices():
+        if vkey not in regular_vertices and all([len(mesh.face_vertices(fkey)) == 4 for fkey in mesh.vertex_faces(vkey)]):
+            regular_vertices.add(vkey)
+
+def apply_rule(mesh, rule, *args):
+    """Apply a grammar rule without user interaction.
+
+    Parameters
+    ----------
+    mesh : PseudoQuadMesh
+        A pseudo-quad mesh to modify in place.
+    rule : str
+        The name of the rule.
+    args
+        The rule arguments, following its schema in the registry.
+
+    Returns
+    -------
+    result
+        The output of the rule, usually the new face keys.
+        None if the rule does not apply to the arguments.
+
+    Raises
+    ------
+    KeyError
+        If the rule is not in the registry.
+
+    """
+
+    return RULES[rule](mesh, *args)
+
+def apply_rule_sequence(mesh, sequence, propagate = False):
+    """Apply a scripted sequence of grammar rules.
+
+    Parameters
+    ----------
+    mesh : PseudoQuadMesh
+        A pseudo-quad mesh to modify in place.
+    sequence : list
+        The rules to apply as (rule, args) tuples.
+    propagate : bool, optional
+        True to propagate the modifications after each rule to recover a pseudo-quad mesh.
+
+    Returns
+    -------
+    results : list
+        The output of each rule, None for the rules that did not apply.
+
+    """
+
+    regular_vertices = set(mesh.vertices())
+
+    results = []
+    for rule, args in sequence:
+        results.append(apply_rule(mesh, rule, *args))
+        if propagate:
+            mesh_propagation(mesh, regular_vertices)
+            _update_regular_vertices(mesh, regular_vertices)
+
+    return results
+
+def random_rule_sequence(mesh, number_of_rules, rules = None, propagate = False, max_trials = 100, seed = None):
+    """Apply a random sequence of valid grammar rules, for design-space sampling.
+
+    Rules and arguments are drawn at random and rejected until the precondition is fulfilled.
+
+    Parameters
+    ----------
+    mesh : PseudoQuadMesh
+        A pseudo-quad mesh to modify in place.
+    number_of_rules : int
+        The number of rules to apply.
+    rules : list, optional
+        The names of the rules to draw from. All the samplable rules by default.
+    propagate : bool, optional
+        True to propagate the modifications after each rule to recover a pseudo-quad mesh.
+    max_trials : int, optional
+        The maximum number of rejected draws per rule before stopping.
+    seed : int, optional
+        A seed for the random number generator, for reproducible sequences.
+
+    Returns
+    -------
+    sequence : list
+        The applied rules as (rule, args) tuples, that can be replayed with apply_rule_sequence.
+
+    """
+
+    rng = random.Random(seed)
+
+    if rules is None:
+        rules = sorted([name for name, rule in RULES.items() if rule.is_samplable()])
+
+    regular_vertices = set(mesh.vertices())
+
+    sequence = []
+    for k in range(number_of_rules):
+        applied = False
+        for trial in range(max_trials):
+            if mesh.number_of_faces() == 0:
+                break
+            rule = RULES[rng.choice(rules)]
+            args = _sample_arguments(mesh, rule, rng)
+            if args is None or not rule.is_applicable(mesh, *args):
+                continue
+            if rule.apply(mesh, *args) is None:
+                continue
+            sequence.append((rule.name, args))
+            applied = True
+            break
+        if not applied:
+            break
+        if propagate:
+            mesh_propagation(mesh, regular_vertices)
+            _update_regular_vertices(mesh, regular_vertices)
+
+    return sequence
+
+def random_rule_sequences(mesh, number_of_sequences, number_of_rules, rules = None, propagate = False, seed = None):
+    """Generate random valid rule sequences, each applied on a copy of the mesh.
+
+    Parameters
+    ----------
+    mesh : PseudoQuadMesh
+        A pseudo-quad mesh, left unchanged.
+    number_of_sequences : int
+        The number of sequences.
+    number_of_rules : int
+        The number of rules per sequence.
+    rules : list, optional
+        The names of the rules to draw from. All the samplable rules by default.
+    propagate : bool, optional
+        True to propagate the modifications after each rule to recover a pseudo-quad mesh.
+    seed : int, optional
+        A seed for the random number generator, for reproducible sequences.
+
+    Yields
+    ------
+    (mesh, sequence) : tuple
+        The modified copy of the mesh and the applied rules as (rule, args) tuples.
+
+    """
+
+    rng = random.Random(seed)
+
+    for i in range(number_of_sequences):
+        copy = mesh.copy()
+        sequence = random_rule_sequence(copy, number_of_rules, rules, propagate, seed = rng.random())
+        yield copy, sequence
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
@@ -0,0 +1,439 @@
+import random
+
+from compas_pattern.topology.grammar_engine import RULES
+
+from compas_pattern.topology.global_propagation import mesh_propagation
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+    'ApplicabilityIndex',
+]
+
+# argument kinds that can be enumerated from the anchor, i.e. the first argument of a rule
+LOCAL_KINDS = ['face_edge', 'face_vertex', 'adjacent_face', 'edge_vertex']
+ANCHOR_KINDS = ['face', 'edge', 'vertex']
+
+class _IndexedSet(object):
+    """Set with constant-time insertion, removal and random choice."""
+
+    def __init__(self):
+        self.items = []
+        self.position = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        if item not in self.position:
+            self.position[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item):
+        i = self.position.pop(item, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.position[last] = i
+
+    def choice(self, rng = random):
+        return self.items[int(rng.random() * len(self.items))]
+
+def _is_local_rule(rule):
+
+    kinds = [kind for name, kind in rule.arguments]
+
+    return kinds[0] in ANCHOR_KINDS and all([kind in LOCAL_KINDS for kind in kinds[1:]])
+
+def _as_key(args):
+
+    return tuple([tuple(arg) if isinstance(arg, (list, tuple)) else arg for arg in args])
+
+class ApplicabilityIndex(object):
+    """Index of the targets where each local grammar rule applies on a pseudo-quad mesh.
+
+    Local rules are the rules whose arguments all derive from one anchor element, a face, an edge or a vertex.
+    The valid argument tuples of each rule are stored per anchor and refreshed only around the modified elements,
+    so that the targets of a rule are available without scanning the mesh.
+
+    Parameters
+    ----------
+    mesh : PseudoQuadMesh
+        A pseudo-quad mesh.
+    rules : list, optional
+        The names of the rules to index. All the local rules of the registry by default.
+
+    Attributes
+    ----------
+    mesh : PseudoQuadMesh
+        The indexed mesh.
+    rules : list
+        The names of the indexed rules.
+    regular_vertices : set
+        The vertices used for propagation after the rules applied through the index.
+
+    """
+
+    def __init__(self, mesh, rules = None):
+        self.mesh = mesh
+        if rules is None:
+            rules = sorted([name for name, rule in RULES.items() if _is_local_rule(RULES[name])])
+        self.rules = [name for name in rules if _is_local_rule(RULES[name])]
+        self.regular_vertices = set(mesh.vertices())
+        self._targets = {}
+        self._anchor_targets = {}
+        self.rebuild()
+
+    # --------------------------------------------------------------------------
+    # construction
+    # --------------------------------------------------------------------------
+
+    def rebuild(self):
+        """Rebuild the index from scratch."""
+
+        self._targets = {name: _IndexedSet() for name in self.rules}
+        self._anchor_targets = {name: {} for name in self.rules}
+
+        mesh = self.mesh
+        edges = set()
+        for fkey in mesh.faces():
+            edges.update(self._face_edges(fkey))
+        self._refresh(set(mesh.faces()), edges, set(mesh.vertices()))
+
+    def _face_edges(self, fkey):
+
+        halfedge = self.mesh.halfedge
+        edges = []
+        for u, v in self.mesh.face_halfedges(fkey):
+            if u == v:
+                continue
+            if halfedge[v].get(u) is not None and v < u:
+                edges.append((v, u))
+            else:
+                edges.append((u, v))
+
+        return edges
+
+    def _is_edge_anchor(self, u, v):
+        # whether (u, v) is an edge of the mesh in the orientation of _face_edges
+
+        halfedge = self.mesh.halfedge
+        if u == v or u not in halfedge or halfedge[u].get(v) is None:
+            return False
+
+        return not (halfedge[v].get(u) is not None and v < u)
+
+    def _candidates(self, rule, anchor):
+
+        mesh = self.mesh
+        candidates = [[anchor]]
+        for name, kind in rule.arguments[1:]:
+            if kind == 'face_edge':
+                options = [(u, v) for u, v in mesh.face_halfedges(anchor) if u != v]
+            elif kind == 'face_vertex':
+                options = list(set(mesh.face_vertices(anchor)))
+            elif kind == 'adjacent_face':
+                options = list(set([mesh.halfedge[v][u] for u, v in mesh.face_halfedges(anchor) if u != v and mesh.halfedge[v].get(u) is not None]))
+            else:
+                options = list(anchor)
+            candidates = [args + [option] for args in candidates for option in options]
+
+        return candidates
+
+    def _refresh_anchor(self, name, anchor, exists):
+
+        rule = RULES[name]
+        targets = self._targets[name]
+        anchor_targets = self._anchor_targets[name]
+
+        for key in anchor_targets.pop(anchor, []):
+            targets.remove(key)
+
+        if not exists:
+            return
+
+        valid = []
+        for args in self._candidates(rule, anchor):
+            if rule.is_applicable(self.mesh, *args):
+                key = _as_key(args)
+                targets.add(key)
+                valid.append(key)
+        if len(valid) > 0:
+            anchor_targets[anchor] = valid
+
+    def _refresh(self, fkeys, edges, vkeys):
+
+        mesh = self.mesh
+        for name in self.rules:
+            kind = RULES[name].arguments[0][1]
+            if kind == 'face':
+                for fkey in fkeys:
+                    self._refresh_anchor(name, fkey, fkey in mesh.face)
+            elif kind == 'edge':
+                for u, v in edges:
+                    self._refresh_anchor(name, (u, v), self._is_edge_anchor(u, v))
+            elif kind == 'vertex':
+                for vkey in vkeys:
+                    self._refresh_anchor(name, vkey, vkey in mesh.vertex)
+
+    def update(self, vkeys, fkeys = None, removed_edges = None):
+        """Update the index around modified vertices.
+
+        The faces around the vertices are refreshed, with their edges, their vertices and their neighbouring faces,
+        since the preconditions of the rules look up to the faces adjacent to a target.
+
+        Parameters
+        ----------
+        vkeys : list
+            The keys of the vertices of the modified elements.
+        fkeys : list, optional
+            The keys of faces that were deleted or modified.
+        removed_edges : list, optional
+            The edges of the faces before modification, some of which may not exist anymore.
+
+        """
+
+        mesh = self.mesh
+
+        faces = set()
+        if fkeys is not None:
+            faces.update(fkeys)
+        for vkey in vkeys:
+            if vkey in mesh.vertex:
+                faces.update([fkey for fkey in mesh.vertex_faces(vkey) if fkey is not None])
+
+        edges = set()
+        vertices = set([vkey for vkey in vkeys])
+        neighbours = set()
+        for fkey in faces:
+            if fkey not in mesh.face:
+                continue
+            edges.update(self._face_edges(fkey))
+            vertices.update(mesh.face_vertices(fkey))
+            for u, v in mesh.face_halfedges(fkey):
+                if u != v and mesh.halfedge[v].get(u) is not None:
+                    neighbours.add(mesh.halfedge[v][u])
+
+        if removed_edges is not None:
+            edges.update(removed_edges)
+
+        self._refresh(faces | neighbours, edges, vertices)
+
+    # --------------------------------------------------------------------------
+    # queries
+    # --------------------------------------------------------------------------
+
+    def targets(self, rule):
+        """The valid argument tuples of a rule.
+
+        Parameters
+        ----------
+        rule : str
+            The name of an indexed rule.
+
+        Returns
+        -------
+        list
+            The argument tuples.
+
+        """
+
+        return self._targets[rule].items
+
+    def number_of_targets(self, rule):
+        return len(self._targets[rule])
+
+    def anchor_targets(self, rule, anchor):
+        """The valid argument tuples of a rule at a face, an edge or a vertex.
+
+        Parameters
+        ----------
+        rule : str
+            The name of an indexed rule.
+        anchor : hashable
+            A face key, an edge as a tuple of vertex keys or a vertex key, depending on the rule.
+
+        Returns
+        -------
+        list
+            The argument tuples, empty if the rule does not apply at the anchor.
+
+        """
+
+        return self._anchor_targets[rule].get(anchor, [])
+
+    def is_applicable(self, rule, *args):
+        return _as_key(args) in self._targets[rule]
+
+    def applicable_rules(self):
+        """The indexed rules with at least one valid target.
+
+        Returns
+        -------
+        list
+            The names of the rules.
+
+        """
+
+        return [name for name in self.rules if len(self._targets[name]) > 0]
+
+    def random_target(self, rule, rng = random):
+        """Pick a random valid argument tuple of a rule.
+
+        Parameters
+        ----------
+        rule : str
+            The name of an indexed rule.
+        rng : Random, optional
+            A random number generator.
+
+        Returns
+        -------
+        tuple, None
+            The arguments, None if the rule applies nowhere.
+
+        """
+
+        targets = self._targets[rule]
+        if len(targets) == 0:
+            return None
+
+        return targets.choice(rng)
+
+    # --------------------------------------------------------------------------
+    # modification
+    # --------------------------------------------------------------------------
+
+    def apply(self, rule, *args, **kwargs):
+        """Apply a grammar rule on the mesh and update the index around the modification.
+
+        Parameters
+        ----------
+        rule : str
+            The name of a rule of the registry, indexed or not.
+        args
+            The rule arguments, following its schema in the registry.
+        propagate : bool, optional
+            True to propagate the modification to recover a pseudo-quad mesh.
+
+        Returns
+        -------
+        result
+            The output of the rule, None if it did not apply.
+
+        """
+
+        mesh = self.mesh
+        propagate = kwargs.get('propagate', False)
+
+        # the vertices and faces around which the rule operates
+        vkeys = set()
+        fkeys = set()
+        for (name, kind), arg in zip(RULES[rule].arguments, args):
+            if kind in ['face', 'adjacent_face']:
+                fkeys.add(arg)
+            elif kind in ['faces', 'face_strip']:
+                fkeys.update(arg)
+            elif kind in ['edge', 'face_edge', 'boundary', 'vertices']:
+                vkeys.update(arg)
+            elif kind == 'edge_path':
+                vkeys.update([vkey for edge in arg for vkey in edge])
+            else:
+                vkeys.add(arg)
+        for fkey in fkeys:
+            if fkey in mesh.face:
+                vkeys.update(mesh.face_vertices(fkey))
+        for vkey in list(vkeys):
+            if vkey in mesh.vertex:
+                fkeys.update([fkey for fkey in mesh.vertex_faces(vkey) if fkey is not None])
+
+        edges = set()
+        for fkey in fkeys:
+            if fkey in mesh.face:
+                edges.update(self._face_edges(fkey))
+
+        max_int_key = mesh._max_int_key
+        # the indexed targets are valid, the other arguments are checked by the rule
+        if rule in self._targets and self.is_applicable(rule, *args):
+            result = RULES[rule].apply(mesh, *args)
+        else:
+            result = RULES[rule](mesh, *args)
+        if result is None:
+            return None
+
+        if propagate:
+            # the propagation modifies faces away from the rule, found by comparison with the faces before it
+            before = {fkey: (tuple(mesh.face_vertices(fkey)), self._face_edges(fkey)) for fkey in mesh.faces()}
+            mesh_propagation(mesh, self.regular_vertices)
+            for fkey, (face_vertices, face_edges) in before.items():
+                if fkey not in mesh.face or tuple(mesh.face_vertices(fkey)) != face_vertices:
+                    fkeys.add(fkey)
+                    vkeys.update(face_vertices)
+                    edges.update(face_edges)
+            fkeys.update([fkey for fkey in mesh.faces() if fkey not in before])
+            for vkey in mesh.vertices():
+                if vkey not in self.regular_vertices and all([len(mesh.face_vertices(fkey)) == 4 for fkey in mesh.vertex_faces(vkey)]):
+                    self.regular_vertices.add(vkey)
+
+        # the new vertices, including the ones from propagation, mark the rest of the modified area
+        vkeys.update([vkey for vkey in range(max_int_key + 1, mesh._max_int_key + 1) if vkey in mesh.vertex])
+        self.update(vkeys, fkeys, edges)
+
+        return result
+
+    def random_rule_sequence(self, number_of_rules, rules = None, propagate = False, seed = None):
+        """Apply a random sequence of valid rules drawn from the index, without rejection sampling.
+
+        Parameters
+        ----------
+        number_of_rules : int
+            The number of rules to apply.
+        rules : list, optional
+            The names of the indexed rules to draw from. All the indexed rules by default.
+        propagate : bool, optional
+            True to propagate the modifications after each rule to recover a pseudo-quad mesh.
+        seed : int, optional
+            A seed for the random number generator, for reproducible sequences.
+
+        Returns
+        -------
+        sequence : list
+            The applied rules as (rule, args) tuples, that can be replayed with apply_rule_sequence.
+
+        """
+
+        rng = random.Random(seed)
+
+        if rules is None:
+            rules = self.rules
+
+        sequence = []
+        for k in range(number_of_rules):
+            applicable = [name for name in rules if len(self._targets[name]) > 0]
+            if len(applicable) == 0:
+                break
+            rule = rng.choice(applicable)
+            args = [list(arg) if isinstance(arg, tuple) else arg for arg in self.random_target(rule, rng)]
+            if self.apply(rule, *args, propagate = propagate) is not None:
+                sequence.append((rule, args))
+
+        return sequence
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    import compas
@@ -15,6 +15,7 @@ __all__ = [
     'join_meshes',
     'join_and_weld_meshes',
     'unweld_mesh_along_edge_path',
+    'unweld_mesh_along_edge_paths',
     'unjoin_mesh_parts',
 ]
 
@@ -127,76 +128,110 @@ def unweld_mesh_along_edge_path(mesh, edge_path):
 
     Returns
     -------
-    mesh : Mesh
-        The unwelded mesh.
+    duplicates : list
+        The pairs of vertex keys [original vertex, duplicate vertex] along the path.
 
     """
-    
-    duplicates = []
 
-    # convert edge path in vertex path
-    vertex_path = [edge[0] for edge in edge_path]
-    # add last vertex of edge path only if not closed loop
-    if edge_path[0][0] != edge_path[-1][-1]:
-        vertex_path.append(edge_path[-1][-1])
+    return unweld_mesh_along_edge_paths(mesh, [edge_path])
+
+def unweld_mesh_along_edge_paths(mesh, edge_paths):
+    """Unwelds a mesh along a set of edge paths in one pass.
+
+    The faces around each vertex of the paths are grouped in fans that are connected through the edges that are not cut.
+    The fan on the right of the first cut edge through the vertex, in the direction of its path, keeps the vertex,
+    and each other fan receives a duplicate, starting with the fan on the left, and each affected face is modified once.
+    The extremities of open paths inside the mesh stay welded as they are in a single fan.
+
+    Parameters
+    ----------
+    mesh : Mesh
+    edge_paths: list
+        Edge paths for unwelding, as lists of edges.
 
-    # store changes to make in the faces along the vertex path in the following format {face to change = [old vertex, new vertex]}
+    Returns
+    -------
+    duplicates : list
+        The pairs of vertex keys [original vertex, duplicate vertex], in the order of the paths.
+        The duplicate is on the left of the path.
+        A vertex split in n fans appears in n - 1 pairs.
+
+    """
+
+    cut_edges = set()
+    vertices = []
+    # the faces on the left and on the right of the first cut half-edge through each vertex, along its path
+    sides = {}
+    for edge_path in edge_paths:
+        for u, v in edge_path:
+            if (u, v) not in cut_edges:
+                cut_edges.add((u, v))
+                cut_edges.add((v, u))
+                vertices += [u, v]
+            for vkey in [u, v]:
+                if vkey not in sides:
+                    sides[vkey] = (mesh.halfedge[u].get(v), mesh.halfedge[v].get(u))
+
+    # store changes to make in the faces in the following format {face to change: {old vertex: new vertex}}
     to_change = {}
+    duplicates = []
 
-    # iterate along path
-    for i, vkey in enumerate(vertex_path):
-        # vertices before and after current
-        last_vkey = vertex_path[i - 1]
-        next_vkey = vertex_path[i + 1 - len(vertex_path)]
-
-        # skip the extremities of the vertex path, except if the path is a loop or if vertex is on boundary
-        if (edge_path[0][0] == edge_path[-1][-1]) or (i != 0 and i != len(vertex_path) - 1) or mesh.is_vertex_on_boundary(vkey):
-            # duplicate vertex and its attributes
-            attr = mesh.vertex[vkey]
-            new_vkey = mesh.add_vertex(attr_dict = attr)
+    seen = set()
+    for vkey in vertices:
+        if vkey in seen:
+            continue
+        seen.add(vkey)
+
+        # group the faces around the vertex in fans connected through edges that are not cut
+        faces = sorted(set([fkey for fkey in mesh.halfedge[vkey].values() if fkey is not None]))
+        fan = {fkey: fkey for fkey in faces}
+        for fkey in faces:
+            nbr = mesh.face_vertex_ancestor(fkey, vkey)
+            if (vkey, nbr) in cut_edges:
+                continue
+            fkey_2 = mesh.halfedge[vkey].get(nbr)
+            if fkey_2 is None:
+                continue
+            # union
+            while fan[fkey] != fkey:
+                fkey = fan[fkey]
+            while fan[fkey_2] != fkey_2:
+                fkey_2 = fan[fkey_2]
+            if fkey != fkey_2:
+                fan[fkey_2] = fkey
+
+        def find(fkey):
+            while fan[fkey] != fkey:
+                fkey = fan[fkey]
+            return fkey
+
+        fans = {}
+        for fkey in faces:
+            fans.setdefault(find(fkey), []).append(fkey)
+        if len(fans) < 2:
+            continue
+
+        # the fan on the right keeps the vertex, the fan on the left gets the first duplicate, then the other fans
+        left, right = sides[vkey]
+        roots = sorted(fans.keys(), key = lambda root: min(fans[root]))
+        if left is not None and find(left) in fans:
+            roots.remove(find(left))
+            roots.insert(0, find(left))
+        if right is not None and find(right) in fans and find(right) != roots[0]:
+            roots.remove(find(right))
+        else:
+            del roots[-1]
+
+        # duplicate vertex and its attributes for each fan that does not keep it
+        for root in roots:
+            new_vkey = mesh.add_vertex(attr_dict = mesh.vertex[vkey])
             duplicates.append([vkey, new_vkey])
-            # split neighbours in two groups depending on the side of the path
-            vertex_nbrs = mesh.vertex_neighbors(vkey, True)
-            
-            # two exceptions on last_vkey or next_vkey if the vertex is on the boundary or a non-manifold vertex in case of the last vertex of a closed edge path
-            if edge_path[0][0] == edge_path[-1][-1] and i == len(vertex_path) - 1:
-                next_vkey = vertex_path[0]
-            if mesh.is_vertex_on_boundary(vkey):
-                for j in range(len(vertex_nbrs)):
-                    if mesh.is_vertex_on_boundary(vertex_nbrs[j - 1]) and mesh.is_vertex_on_boundary(vertex_nbrs[j]):
-                        before, after = vertex_nbrs[j - 1], vertex_nbrs[j]
-                if i == 0:
-                    last_vkey = before
-                elif i == len(vertex_path) - 1:
-                    next_vkey = after
-
-            idxa = vertex_nbrs.index(last_vkey)
-            idxb = vertex_nbrs.index(next_vkey)
-            if idxa < idxb:
-                half_nbrs = vertex_nbrs[idxa : idxb]
-            else:
-                half_nbrs = vertex_nbrs[idxa :] + vertex_nbrs[: idxb]
-            
-            # get faces corresponding to vertex neighbours
-            faces = [mesh.halfedge[nbr][vkey] for nbr in half_nbrs]
-            # store change per face with index of duplicate vertex
-            for fkey in faces:
-                if fkey in to_change:
-                    # add to other changes
-                    to_change[fkey] += [[vkey, new_vkey]]
-                else: 
-                    to_change[fkey] = [[vkey, new_vkey]]
+            for fkey in fans[root]:
+                to_change.setdefault(fkey, {})[vkey] = new_vkey
 
     # apply stored changes
     for fkey, changes in to_change.items():
-        if fkey is None:
-            continue
-        face_vertices = mesh.face_vertices(fkey)[:]
-        for change in changes:
-            old_vertex, new_vertex = change
-            # replace in list of face vertices
-            idx = face_vertices.index(old_vertex)
-            face_vertices[idx] = new_vertex
+        face_vertices = [changes.get(vkey, vkey) for vkey in mesh.face_vertices(fkey)]
         # modify face by removing it and adding the new one
         attr = mesh.facedata[fkey]
         mesh.delete_face(fkey)
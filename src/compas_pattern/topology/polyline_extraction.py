@@ -1,6 +1,6 @@
 from compas.datastructures.mesh import Mesh
 
-from compas.topology.duality import mesh_dual
+from compas_pattern.datastructures.pseudo_quad_arrays import PseudoQuadArrays
 
 __author__     = ['Robin Oval']
 __copyright__  = 'Copyright 2017, Block Research Group - ETH Zurich'
@@ -9,10 +9,12 @@ __email__      = 'oval@arch.ethz.ch'
 
 __all__ = [
     'mesh_boundaries',
+    'boundary_successors',
     'quad_mesh_polylines',
     'dual_edge_polylines',
     'singularity_polylines',
     'strip_polylines',
+    'strip_polyline_arrays',
 ]
 
 def mesh_boundaries(mesh, vertex_splits = []):
@@ -29,44 +31,80 @@ def mesh_boundaries(mesh, vertex_splits = []):
     -------
     split_boundaries: list
         List of boundaries as lists of vertex keys.
+        A boundary without splits is closed, with its first vertex repeated at the end.
 
     """
 
-    boundary_vertices = [vkey for vkey in mesh.vertices_on_boundary() if len(mesh.vertex_neighbors(vkey)) != 0]
+    # reuse the boundaries without splits as long as the mesh does not change
+    if len(vertex_splits) == 0 and hasattr(mesh, 'cached'):
+        return [list(boundary) for boundary in mesh.cached('mesh_boundaries', _mesh_boundaries, mesh, ())]
 
-    vertex_splits = [vkey for vkey in vertex_splits if vkey in boundary_vertices]
+    return _mesh_boundaries(mesh, vertex_splits)
+
+def boundary_successors(mesh):
+    """Map each boundary vertex to the next one along the boundary, following the half-edges without face.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        Mesh.
+
+    Returns
+    -------
+    dict
+        The next boundary vertex per boundary vertex.
+
+    """
+
+    # computed once per version of the mesh
+    if hasattr(mesh, 'cached'):
+        return mesh.cached('boundary_successors', _boundary_successors, mesh)
+
+    return _boundary_successors(mesh)
+
+def _boundary_successors(mesh):
+
+    successor = {}
+    for u, nbrs in iter(mesh.halfedge.items()):
+        for v, fkey in iter(nbrs.items()):
+            if fkey is None:
+                successor[u] = v
+                break
+
+    return successor
+
+def _mesh_boundaries(mesh, vertex_splits):
+    # walk the successors from the splits first, then from the remaining boundary vertices, in O(boundary length)
+
+    successor = boundary_successors(mesh)
+    splits = set([vkey for vkey in vertex_splits if vkey in successor])
+
+    starts = [vkey for vkey in vertex_splits if vkey in splits] + list(successor)
 
-    # collect boundary polylines with splits
     split_boundaries = []
-    count = len(boundary_vertices) * 2
-    while len(boundary_vertices) > 0 and count > 0:
-        count -= 1
-        if len(vertex_splits) > 0:
-            start = vertex_splits.pop()
-            boundary_vertices.remove(start)
-        else:
-            start = boundary_vertices.pop()
+    visited = set()
+    for start in starts:
+        if start in visited:
+            continue
+        visited.add(start)
         polyline = [start]
-        count_2 = len(boundary_vertices) * 2
-        while count_2 > 0:
-            count_2 -= 1
-            for nbr, fkey in iter(mesh.halfedge[polyline[-1]].items()):
-                if fkey is None:
-                    if nbr in boundary_vertices:
-                        boundary_vertices.remove(nbr)
-                    polyline.append(nbr)
-                    break
-
+        count = len(successor)
+        while count > 0:
+            count -= 1
+            vkey = successor.get(polyline[-1])
+            if vkey is None:
+                break
+            visited.add(vkey)
+            polyline.append(vkey)
             # end of boundary element
-            if start == polyline[-1]:
+            if vkey == start:
                 split_boundaries.append(polyline)
                 break
             # end of boundary subelement
-            elif polyline[-1] in vertex_splits:
+            elif vkey in splits:
                 split_boundaries.append(polyline)
-                vertex_splits.remove(polyline[-1])
-                polyline = polyline[-1 :]
-                
+                polyline = [vkey]
+
     return split_boundaries
 
 def quad_mesh_polylines(mesh, dual = False):
@@ -82,75 +120,206 @@ def quad_mesh_polylines(mesh, dual = False):
 
     Returns
     -------
-    list or None
+    list
         If on the primal:
-        The list of polylines as lists of vertex keys.
+        The list of polylines as lists of vertex keys, stopping at singularities and poles,
+        with a polyline [p, p] for the edge of each pole p of [p, p, a, b] faces.
         If on the dual:
         The list of dual polylines as list of face keys.
-        None if not a quad mesh.
 
     """
-    
-    # switch to dual
+
+    arrays, classification = _mesh_arrays(mesh)
+
     if dual:
-        mesh = mesh_dual(mesh)
+        return [[arrays.faces[f] for f in polyline] for polyline in _dual_polylines(arrays, classification)]
 
-    # store edges to keep track of which one are visited
-    edges = list(mesh.edges())
+    polylines = [[arrays.vertices[u] for u in polyline] for polyline in _primal_polylines(arrays, classification)]
 
-    nb_edges = mesh.number_of_edges()
+    # the pole edges, removed from the faces of the arrays
+    for u in arrays.poles():
+        vkey = arrays.vertices[u]
+        if vkey in mesh.halfedge[vkey]:
+            polylines.append([vkey, vkey])
+
+    return polylines
+
+# ==============================================================================
+# Tracing on half-edge arrays
+# ==============================================================================
+
+# A polyline is traced with darts (h, reverse): the half-edge h travelled from its start to its end,
+# or from its end to its start if reverse is True, since boundary edges only have one half-edge.
+
+def _mesh_arrays(mesh):
+    # cached on pseudo-quad meshes, built for other meshes
+
+    if hasattr(mesh, 'pseudo_quad_arrays'):
+        return mesh.pseudo_quad_arrays(), mesh.vertex_classification()
+
+    arrays = PseudoQuadArrays.from_mesh(mesh)
+
+    return arrays, arrays.vertex_classification()
+
+def _dart_target(arrays, h, reverse):
+
+    return arrays.halfedge_vertex[h] if reverse else arrays.halfedge_vertex[arrays.halfedge_next[h]]
+
+def _straight_dart(arrays, h, reverse):
+    # the dart continuing straight through the target of a dart, at a regular vertex, -1 at a boundary
+
+    if not reverse:
+        t = arrays.halfedge_twin[arrays.halfedge_next[h]]
+        return (-1, reverse) if t == -1 else (arrays.halfedge_next[t], False)
+
+    t = arrays.halfedge_twin[arrays.halfedge_prev[h]]
+    return (-1, reverse) if t == -1 else (arrays.halfedge_prev[t], True)
+
+def _mark(visited, twin, h):
+
+    visited[h] = True
+    if twin[h] != -1:
+        visited[twin[h]] = True
+
+def _primal_polylines(arrays, classification):
+    # each edge is visited once, through a bitmap on the half-edges
+
+    valence, boundary, pole, index = classification
+    twin = arrays.halfedge_twin
+    visited = [False] * arrays.number_of_halfedges()
 
-    # store polylines
     polylines = []
+    for h0 in range(arrays.number_of_halfedges()):
+        if visited[h0]:
+            continue
+        _mark(visited, twin, h0)
+        is_boundary_polyline = twin[h0] == -1
+        polyline = [arrays.halfedge_vertex[h0], _dart_target(arrays, h0, False)]
 
-    # pop edges from the stack to start polylines until the stack is empty
-    while nb_edges > 0:
-        u0, v0 = edges.pop()
-        nb_edges -= 1
-        # is polyline on the boundary
-        if mesh.is_edge_on_boundary(u0, v0):
-            is_boundary_polyline = True
-        else:
-            is_boundary_polyline = False
-        polyline = [u0, v0]
         # search next polyline edges in both directions
-        for i in range(2):
-            count = nb_edges
-            while count > 0:
-                # start from last edge
-                u, v = polyline[-2], polyline[-1]
-                count -= 1
-                # for not boundary polyline: stop if the last vertex is on the boundary or if it is a singularity or if the polyline is closed "without kink"
-                if not is_boundary_polyline and (mesh.is_vertex_on_boundary(v) or len(mesh.vertex_neighbors(v)) != 4 or polyline[0] == polyline[-1]):
+        for reverse in [False, True]:
+            h, r = h0, reverse
+            while polyline[0] != polyline[-1]:
+                v = polyline[-1]
+                # stop at singularities, poles and the boundary for interior polylines
+                if pole[v]:
                     break
-                # for boundary polyline: stop if the last vertex is on the boundary or if it is a singularity or if the polyline is closed "without kink"
-                elif is_boundary_polyline and (len(mesh.vertex_neighbors(v)) != 3 or polyline[0] == polyline[-1]):
-                    break             
-                # get next vertex of polyline
-                # dichotomy if halfedge u v points outside in case of boundary polylines
-                if mesh.halfedge[u][v] is not None:
-                    x = mesh.face_vertex_descendant(mesh.halfedge[u][v], v)
-                    w = mesh.face_vertex_descendant(mesh.halfedge[x][v], v)
-                else:
-                    x = mesh.face_vertex_ancestor(mesh.halfedge[v][u], v)
-                    w = mesh.face_vertex_ancestor(mesh.halfedge[v][x], v)
-                # remove next edge of polyline from the stack
-                if (v, w) in edges:
-                    edges.remove((v, w))
-                else:
-                    edges.remove((w, v))
-                nb_edges -= 1
-                polyline.append(w)
-                
-            # before starting searching in the other direction
-            polyline.reverse()
+                if not is_boundary_polyline and (boundary[v] or valence[v] != 4):
+                    break
+                if is_boundary_polyline and valence[v] != 3:
+                    break
+                h, r = _straight_dart(arrays, h, r)
+                if h == -1 or visited[h]:
+                    break
+                _mark(visited, twin, h)
+                polyline.append(_dart_target(arrays, h, r))
+
             # do not do second search if the polyline is already closed
             if polyline[0] == polyline[-1]:
                 break
+            polyline.reverse()
+
         polylines.append(polyline)
 
     return polylines
 
+def _dual_polylines(arrays, classification):
+    # the dual polylines as in the dual mesh, with one dual vertex per face
+    # and one dual edge per edge with at least one vertex not on the boundary
+
+    valence, boundary, pole, index = classification
+    vertex = arrays.halfedge_vertex
+    twin = arrays.halfedge_twin
+    face = arrays.halfedge_face
+    n = arrays.number_of_halfedges()
+
+    is_dual = [False] * n
+    is_dual_boundary = [False] * n
+    dual_valence = [0] * arrays.number_of_faces()
+    dual_boundary = [False] * arrays.number_of_faces()
+    for h in range(n):
+        u, v = vertex[h], _dart_target(arrays, h, False)
+        if twin[h] != -1 and not (boundary[u] and boundary[v]):
+            is_dual[h] = True
+            dual_valence[face[h]] += 1
+            if boundary[u] or boundary[v]:
+                is_dual_boundary[h] = True
+                dual_boundary[face[h]] = True
+
+    visited = [False] * n
+    polylines = []
+    for h0 in range(n):
+        if not is_dual[h0] or visited[h0]:
+            continue
+        _mark(visited, twin, h0)
+        is_boundary_polyline = is_dual_boundary[h0]
+        polyline = [face[h0], face[twin[h0]]]
+
+        for h in [h0, twin[h0]]:
+            while polyline[0] != polyline[-1]:
+                f = polyline[-1]
+                if not is_boundary_polyline and (dual_boundary[f] or dual_valence[f] != 4):
+                    break
+                if is_boundary_polyline and dual_valence[f] != 3:
+                    break
+                # cross the face to the opposite edge
+                h = arrays.halfedge_opposite(twin[h])
+                if h == -1 or not is_dual[h] or visited[h]:
+                    break
+                _mark(visited, twin, h)
+                polyline.append(face[twin[h]])
+
+            if polyline[0] == polyline[-1]:
+                break
+            polyline.reverse()
+
+        polylines.append(polyline)
+
+    return polylines
+
+def _singularity_polylines(arrays, classification):
+
+    valence, boundary, pole, index = classification
+    twin = arrays.halfedge_twin
+    singularities = set([u for u in range(arrays.number_of_vertices()) if index[u]])
+
+    # the darts leaving each singularity
+    darts = {u: [] for u in singularities}
+    for h in range(arrays.number_of_halfedges()):
+        u = arrays.halfedge_vertex[h]
+        if u in singularities:
+            darts[u].append((h, False))
+        if twin[h] == -1:
+            v = _dart_target(arrays, h, False)
+            if v in singularities:
+                darts[v].append((h, True))
+
+    polylines = []
+    for sing in singularities:
+        for h, r in darts[sing]:
+            polyline = [sing, _dart_target(arrays, h, r)]
+            count = arrays.number_of_vertices()
+
+            # continue until next singularity
+            while polyline[-1] not in singularities and count > 0:
+                if not boundary[polyline[1]] and boundary[polyline[-1]]:
+                    break
+                count -= 1
+                v = polyline[-1]
+                if boundary[v] and twin[h] != -1:
+                    # from an edge inside to a regular vertex on the boundary, turn along the boundary edge with a face
+                    outgoing, closed = arrays.vertex_outgoing_halfedges(v)
+                    h, r = arrays.halfedge_prev[outgoing[-1]], True
+                else:
+                    h, r = _straight_dart(arrays, h, r)
+                if h == -1:
+                    break
+                polyline.append(_dart_target(arrays, h, r))
+
+            polylines.append(polyline)
+
+    return polylines
+
 def dual_edge_polylines(mesh):
     """Groups edges that are opposite to each other in a quad face.
 
@@ -171,6 +340,18 @@ def dual_edge_polylines(mesh):
 
     """
 
+    # reuse the edge groups as long as the mesh does not change
+    if hasattr(mesh, 'cached'):
+        result = mesh.cached('dual_edge_polylines', _dual_edge_polylines, mesh)
+        if result is None:
+            return None
+        edge_groups, max_group = result
+        return dict(edge_groups), max_group
+
+    return _dual_edge_polylines(mesh)
+
+def _dual_edge_polylines(mesh):
+
     # check if is a quad mesh
     if not mesh.is_quadmesh():
         return None
@@ -250,95 +431,118 @@ def singularity_polylines(mesh):
     if not mesh.is_quadmesh():
         return None
 
-    singularities = [vkey for vkey in mesh.vertices() if (mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) != 3) or (not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) != 4)]
+    arrays, classification = _mesh_arrays(mesh)
+    singularities = set([arrays.vertices[u] for u, index in enumerate(classification[3]) if index])
+
     polylines = []
-    
-    # start from singularuty
-    for sing in singularities:
+    for polyline in _singularity_polylines(arrays, classification):
+        polyline = [arrays.vertices[u] for u in polyline]
+        # avoid duplicate polylines (additional criteria for loops)
+        if polyline[-1] not in singularities or polyline[0] < polyline[-1] or (polyline[0] == polyline[-1] and polyline[1] < polyline[-2]):
+            polylines.append(polyline)
 
-        # propagate in each direction
-        for nbr in mesh.vertex_neighbors(sing):
-            # initiate
-            u = sing
-            v = nbr
-            polyline = [u, v]
-            is_polyline_on_boundary = mesh.is_vertex_on_boundary(polyline[1])
-            count = mesh.number_of_vertices()
+    return polylines
 
-            # continue until next singularity
-            while polyline[-1] not in singularities and count > 0:
-                if not mesh.is_vertex_on_boundary(polyline[1]) and mesh.is_vertex_on_boundary(polyline[-1]):
-                    break
-                count -= 1
-                u = polyline[-2]
-                v = polyline[-1]
-                nbrs = mesh.vertex_neighbors(v, True)
-                idx = nbrs.index(u)
-                # if not on boundary
-                if not mesh.is_vertex_on_boundary(v):
-                    w = nbrs[idx - 2]
-                # if on boundary
-                else:
-                    if mesh.is_vertex_on_boundary(nbrs[idx - 1]):
-                        w = nbrs[idx - 1]
-                    else:
-                        w = nbrs[idx - 2]
-                polyline.append(w)
+def strip_polylines(mesh):
+    """Collect the polylines along the strips of a quad mesh, through the midpoints of the edges they cross.
 
-            # avoid duplicate polylines (additional criteria for loops)
-            if polyline[-1] not in singularities or polyline[0] < polyline[-1] or (polyline[0] == polyline[-1] and polyline[1] < polyline[-2]):
-                polylines.append(polyline)
+    Parameters
+    ----------
+    mesh : Mesh
+        A quad mesh, with potential poles stored in pseudo-quad faces.
 
-    return polylines
+    Returns
+    -------
+    list or None
+        The list of polylines as lists of point coordinates.
+        None if not a quad mesh.
 
-def strip_polylines(mesh):
+    """
 
-    edge_groups, max_group = dual_edge_polylines(mesh)
+    result = strip_polyline_arrays(mesh)
+    if result is None:
+        return None
 
-    strip_polylines = {}
-    for fkey in mesh.faces():
-        a, b, c, d = mesh.face_vertices(fkey)
-        group_0 = edge_groups[(a, b)]
-        line_0 = [mesh.edge_midpoint(a, b), mesh.edge_midpoint(c, d)]
-        if group_0 in strip_polylines:
-            strip_polylines[group_0].append(line_0)
-        else:
-            strip_polylines[group_0] = [line_0]
-            
-        group_1 = edge_groups[(b, c)]
-        line_1 = [mesh.edge_midpoint(b, c), mesh.edge_midpoint(d, a)]
-        if group_1 in strip_polylines:
-            strip_polylines[group_1].append(line_1)
-        else:
-            strip_polylines[group_1] = [line_1]
+    points, offsets = result
+
+    return [points[offsets[i]: offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def _walk_strip(arrays, xyz, midpoints, h, visited):
+    # the points of a strip beyond the edge of half-edge h, through the face of h, and whether the strip is closed
+
+    twin = arrays.halfedge_twin
+    h0 = h
+    points = []
+    while True:
+        f = arrays.halfedge_face[h]
+        opposite = arrays.halfedge_opposite(h)
+        if opposite == -1:
+            # end at the pole of a pseudo-quad face
+            if arrays.face_pole[f] != -1:
+                points.append(list(xyz[arrays.face_pole_vertex(f)]))
+            return points, False
+        points.append(list(midpoints[opposite]))
+        if opposite == twin[h0]:
+            return points, True
+        _mark(visited, twin, opposite)
+        h = twin[opposite]
+        if h == -1:
+            return points, False
+
+def strip_polyline_arrays(mesh):
+    """Collect the strip polylines of a quad mesh as one array of points with the offsets of each strip.
+
+    The strips are chained topologically, from face to face across opposite edges, without comparing coordinates.
+    A strip ends on the boundary, at a pole of a pseudo-quad face, or closes on itself with its first point repeated.
 
-    polylines = []
-    for key, item in strip_polylines.items():
-        lines = item
-        polyline = lines.pop()
-        count = len(lines)
-        while len(lines) > 0 and count > 0:
-            count -= 1
-            to_remove = None
-            for u, v in lines:
-                if u == polyline[0]:
-                    polyline.insert(0, v)
-                    to_remove = [u, v]
-                elif u == polyline[-1]:
-                    polyline.append(v)
-                    to_remove = [u, v]
-                elif v == polyline[0]:
-                    polyline.insert(0, u)
-                    to_remove = [u, v]
-                elif v == polyline[-1]:
-                    polyline.append(u)
-                    to_remove = [u, v]
-                if to_remove is not None:
-                    break
-            lines.remove(to_remove)
-        polylines.append(polyline)
+    Parameters
+    ----------
+    mesh : Mesh
+        A quad mesh, with potential poles stored in pseudo-quad faces.
+
+    Returns
+    -------
+    points : list
+        The points of all the polylines, one polyline after the other.
+    offsets : list
+        The index of the first point of each polyline in the points, with a final entry equal to the number of points.
+    None
+        If not a quad mesh.
+
+    """
+
+    arrays, classification = _mesh_arrays(mesh)
+    if not arrays.is_pseudo_quad_mesh():
+        return None
+
+    # current coordinates, since the cached arrays only follow the topology
+    xyz = [mesh.vertex_coordinates(vkey) for vkey in arrays.vertices]
+    vertex = arrays.halfedge_vertex
+    twin = arrays.halfedge_twin
+    n = arrays.number_of_halfedges()
+
+    # all the edge midpoints at once
+    midpoints = []
+    for h in range(n):
+        a, b = xyz[vertex[h]], xyz[_dart_target(arrays, h, False)]
+        midpoints.append([(a[0] + b[0]) * .5, (a[1] + b[1]) * .5, (a[2] + b[2]) * .5])
+
+    visited = [False] * n
+    points = []
+    offsets = [0]
+    for h0 in range(n):
+        if visited[h0]:
+            continue
+        _mark(visited, twin, h0)
+        forward, closed = _walk_strip(arrays, xyz, midpoints, h0, visited)
+        backward = []
+        if not closed and twin[h0] != -1:
+            backward, closed = _walk_strip(arrays, xyz, midpoints, twin[h0], visited)
+        points += backward[::-1] + [list(midpoints[h0])] + forward
+        offsets.append(len(points))
+
+    return points, offsets
 
-    return polylines
 # ==============================================================================
 # Main
 # ==============================================================================
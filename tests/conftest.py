@@ -0,0 +1,74 @@
+import pytest
+
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+from compas_pattern.datastructures.coarse_quad_mesh import CoarseQuadMesh
+
+
+def _grid(n, cls = None):
+    vertices = [[j, i, 0] for i in range(n + 1) for j in range(n + 1)]
+    faces = [[i * (n + 1) + j, i * (n + 1) + j + 1, (i + 1) * (n + 1) + j + 1, (i + 1) * (n + 1) + j] for i in range(n) for j in range(n)]
+    if cls is None:
+        return vertices, faces
+    return cls.from_vertices_and_faces(vertices, faces)
+
+
+@pytest.fixture
+def grid():
+    """A factory of grids of n x n unit quads in the xy-plane, as a mesh of a class or as vertex and face arrays."""
+    return _grid
+
+
+def _coarse_mesh():
+    mesh = _grid(3, CoarseQuadMesh)
+    mesh.vertex[5]['z'] = 1.
+    mesh.vertex[10]['x'] += .2
+    mesh.collect_strip_edge_attribute()
+    mesh.density_global_parameter(3)
+    mesh.change_density_parameter(0, 5)
+    return mesh
+
+
+@pytest.fixture
+def coarse_mesh():
+    """A factory of coarse quad meshes of 3 x 3 faces with moved vertices and density parameters of 3 and 5 in one strip."""
+    return _coarse_mesh
+
+
+def _face_set(vertices, faces, precision = 6):
+    # the faces as cycles of rounded coordinates, independent of the vertex indices and of the first vertex
+    result = set()
+    for face in faces:
+        points = [tuple([round(x, precision) + 0. for x in vertices[i]]) for i in face]
+        k = points.index(min(points))
+        result.add(tuple(points[k:] + points[:k]))
+    return result
+
+
+def _mesh_face_set(mesh, precision = 6):
+    index = {vkey: i for i, vkey in enumerate(mesh.vertices())}
+    return _face_set([mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()], [[index[vkey] for vkey in mesh.face_vertices(fkey)] for fkey in mesh.faces()], precision)
+
+
+@pytest.fixture
+def face_set():
+    """The faces of vertex and face arrays as a set of cycles of rounded coordinates, to compare meshes regardless of their keys."""
+    return _face_set
+
+
+@pytest.fixture
+def mesh_face_set():
+    """The faces of a mesh as a set of cycles of rounded coordinates, to compare meshes regardless of their keys."""
+    return _mesh_face_set
+
+
+def _pole_mesh():
+    vertices, faces = _grid(3)
+    # collapse the corner face on a pole at vertex 0
+    faces[0] = [0, 0, 5, 4]
+    return PseudoQuadMesh.from_vertices_and_faces(vertices, faces)
+
+
+@pytest.fixture
+def pole_mesh():
+    """A factory of pseudo-quad grids of 3 x 3 faces with a pseudo-quad face [0, 0, 5, 4] at a corner, with a pole on the boundary."""
+    return _pole_mesh
@@ -0,0 +1,70 @@
+import math
+
+from compas_pattern.datastructures.coarse_quad_mesh import CoarseQuadMesh
+
+
+def stretched_grid(grid):
+    # a grid of 2 x 2 faces with columns of widths 1 and 3 and rows of height 1
+    mesh = grid(2, CoarseQuadMesh)
+    for vkey in mesh.vertices():
+        if mesh.vertex[vkey]['x'] == 2:
+            mesh.vertex[vkey]['x'] = 4.
+    mesh.collect_strip_edge_attribute()
+    return mesh
+
+
+def strip_parameters(mesh):
+    # the density parameters of the edges of each strip
+    return {strip: set([mesh.get_edge_attribute(edge, 'density_parameter') for edge in edges]) for strip, edges in mesh.strips_to_edges_dict().items()}
+
+
+def strip_lengths(mesh):
+    return {strip: sorted(set([mesh.edge_length(u, v) for u, v in edges])) for strip, edges in mesh.strips_to_edges_dict().items()}
+
+
+def test_density_target_length(grid):
+    mesh = stretched_grid(grid)
+    mesh.density_target_length(.5)
+
+    # each strip has its own parameter, from the mean length of its edges
+    lengths = strip_lengths(mesh)
+    assert strip_parameters(mesh) == {strip: set([int(math.ceil(lengths[strip][0] / .5))]) for strip in lengths}
+    assert sorted([parameters.pop() for parameters in strip_parameters(mesh).values()]) == [2, 2, 2, 6]
+
+
+def test_density_overrides(grid):
+    mesh = stretched_grid(grid)
+    strips = list(mesh.strips_to_edges_dict())
+    density_parameters = mesh.strip_density_parameters(.5)
+
+    mesh.density_target_length(.5, overrides = {strips[0]: 10})
+
+    density_parameters[strips[0]] = 10
+    assert strip_parameters(mesh) == {strip: set([density_parameter]) for strip, density_parameter in density_parameters.items()}
+
+
+def test_density_curvature_adaptive(grid):
+    mesh = stretched_grid(grid)
+    # normals turning by a right angle from one column of vertices to the next one
+    normals = {vkey: [math.cos(math.pi / 2 * i), 0., math.sin(math.pi / 2 * i)] for vkey, i in [(vkey, [0., 1., 4.].index(mesh.vertex[vkey]['x'])) for vkey in mesh.vertices()]}
+
+    mesh.density_curvature_adaptive(2., math.pi / 8, normals)
+
+    edges = mesh.strips_to_edges_dict()
+    for strip, parameters in strip_parameters(mesh).items():
+        u, v = edges[strip][0]
+        if mesh.vertex[u]['x'] != mesh.vertex[v]['x']:
+            # across the columns, the normals turn by a right angle, more than the lengths require
+            assert parameters == set([4])
+        else:
+            assert parameters == set([1])
+
+
+def test_change_density_parameter(grid):
+    mesh = stretched_grid(grid)
+    mesh.density_global_parameter(3)
+    strip = list(mesh.strips_to_edges_dict())[0]
+
+    mesh.change_density_parameter(strip, 5)
+
+    assert all([parameters == set([5 if key == strip else 3]) for key, parameters in strip_parameters(mesh).items()])
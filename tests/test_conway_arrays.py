@@ -0,0 +1,65 @@
+from compas.datastructures.mesh import Mesh
+
+from compas_pattern.topology.conway_arrays import CONWAY_NAMES
+from compas_pattern.topology.conway_arrays import conway_arrays
+from compas_pattern.topology.conway_arrays import conway_notation
+from compas_pattern.topology import conway_operators
+
+
+# reference primitive operators, traversing the mesh
+
+
+def dual(mesh):
+    vertices = [mesh.face_centroid(fkey) for fkey in mesh.faces()]
+    index = {fkey: i for i, fkey in enumerate(mesh.faces())}
+    faces = [[index[fkey] for fkey in reversed(mesh.vertex_faces(vkey, ordered = True))] for vkey in mesh.vertices() if not mesh.is_vertex_on_boundary(vkey) and len(mesh.vertex_neighbors(vkey)) != 0]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def join(mesh):
+    vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()]
+    index = {vkey: i for i, vkey in enumerate(mesh.vertices())}
+    face_index = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
+    faces = [[index[u], face_index[mesh.halfedge[v][u]], index[v], face_index[mesh.halfedge[u][v]]] for u, v in mesh.edges() if not mesh.is_edge_on_boundary(u, v)]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def kis(mesh):
+    vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()]
+    index = {vkey: i for i, vkey in enumerate(mesh.vertices())}
+    face_index = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
+    faces = [[index[u], index[v], face_index[fkey]] for fkey in mesh.faces() for u, v in mesh.face_halfedges(fkey)]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def gyro(mesh):
+    halfedges = [(u, v) for u in mesh.vertices() for v in mesh.halfedge[u]]
+    vertices = [mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] + [mesh.face_centroid(fkey) for fkey in mesh.faces()] + [mesh.edge_point(u, v, t = .33) for u, v in halfedges]
+    index = {vkey: i for i, vkey in enumerate(mesh.vertices())}
+    face_index = {fkey: i + mesh.number_of_vertices() for i, fkey in enumerate(mesh.faces())}
+    halfedge_index = {halfedge: i + mesh.number_of_vertices() + mesh.number_of_faces() for i, halfedge in enumerate(halfedges)}
+    faces = [[halfedge_index[(u, v)], halfedge_index[(v, u)], index[v], halfedge_index[(v, mesh.face_vertex_descendant(fkey, v))], face_index[fkey]] for fkey in mesh.faces() for u, v in mesh.face_halfedges(fkey)]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+REFERENCES = {'d': dual, 'j': join, 'k': kis, 'g': gyro}
+
+
+def reference(mesh, chain):
+    for letter in reversed(conway_notation(chain)):
+        mesh = REFERENCES[letter](mesh)
+    return mesh
+
+
+def test_chains_against_reference_operators(grid, face_set, mesh_face_set):
+    vertices, faces = grid(3)
+    for chain in ['dajk', 'kkd', 'gd', 'tj']:
+        expected = reference(Mesh.from_vertices_and_faces(vertices, faces), chain)
+        assert face_set(*conway_arrays(vertices, faces, chain)) == mesh_face_set(expected), chain
+
+
+def test_conway_operators(grid, mesh_face_set):
+    mesh = grid(3, Mesh)
+    for name, letters in CONWAY_NAMES.items():
+        result = getattr(conway_operators, name)(mesh)
+        assert mesh_face_set(result) == mesh_face_set(reference(mesh, letters)), name
@@ -0,0 +1,46 @@
+import pytest
+
+from compas_pattern.algorithms.densification import densify_quad_mesh
+from compas_pattern.algorithms.densification import densify_quad_mesh_chunks
+
+
+def test_dense_mesh_size(coarse_mesh):
+    mesh = coarse_mesh()
+    size = mesh.dense_mesh_size()
+    dense = densify_quad_mesh(mesh)
+
+    assert size['vertices'] == dense.number_of_vertices()
+    assert size['edges'] == dense.number_of_edges()
+    assert size['faces'] == dense.number_of_faces()
+
+
+def test_dense_mesh_chunks(coarse_mesh):
+    mesh = coarse_mesh()
+    budget = mesh.dense_mesh_size()['memory'] // 3
+    chunks = mesh.dense_mesh_chunks(budget)
+
+    assert len(chunks) > 1
+    assert sorted([fkey for chunk in chunks for fkey in chunk]) == sorted(mesh.faces())
+    assert all([mesh.dense_mesh_size(chunk)['memory'] <= budget for chunk in chunks])
+
+    # the predicted size of each chunk against its dense mesh
+    for chunk, dense in zip(chunks, densify_quad_mesh_chunks(mesh, budget)):
+        size = mesh.dense_mesh_size(chunk)
+        assert (size['vertices'], size['faces']) == (dense.number_of_vertices(), dense.number_of_faces())
+
+
+def test_dense_mesh_chunks_budget(coarse_mesh):
+    mesh = coarse_mesh()
+    face_memory = min([mesh.dense_mesh_size([fkey])['memory'] for fkey in mesh.faces()])
+
+    with pytest.raises(ValueError):
+        mesh.dense_mesh_chunks(face_memory - 1)
+
+
+def test_densify_quad_mesh_budget(coarse_mesh):
+    mesh = coarse_mesh()
+    memory = mesh.dense_mesh_size()['memory']
+
+    assert densify_quad_mesh(mesh, budget = memory).number_of_faces() == mesh.dense_mesh_size()['faces']
+    with pytest.raises(ValueError):
+        densify_quad_mesh(mesh, budget = memory - 1)
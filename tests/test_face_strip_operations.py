@@ -0,0 +1,33 @@
+from compas.datastructures.mesh import Mesh
+
+from compas_pattern.topology.face_strip_operations import face_strip_insert_2
+from compas_pattern.topology.joining_welding import unweld_mesh_along_edge_path
+
+
+def signed_area(mesh, fkey):
+    points = [mesh.vertex_coordinates(vkey) for vkey in mesh.face_vertices(fkey)]
+    return 0.5 * sum([a[0] * b[1] - b[0] * a[1] for a, b in zip(points, points[1:] + points[:1])])
+
+
+def test_unweld_duplicates_on_left_of_path(grid):
+    mesh = grid(4, Mesh)
+    path = [1, 6, 11, 16, 21]
+    duplicates = unweld_mesh_along_edge_path(mesh, [[u, v] for u, v in zip(path[:-1], path[1:])])
+
+    assert [u for u, v in duplicates] == path
+    for u, v in duplicates:
+        # the faces on the left of the path, towards x = 0
+        assert all([mesh.face_centroid(fkey)[0] < 1 for fkey in mesh.vertex_faces(v)])
+        assert all([mesh.face_centroid(fkey)[0] > 1 for fkey in mesh.vertex_faces(u)])
+
+
+def test_face_strip_insert_2_on_grid(grid):
+    for path in [[1, 6, 11, 16, 21], [21, 16, 11, 6, 1], [5, 6, 7, 8, 9], [2, 7, 12, 17, 22]]:
+        mesh = grid(4, Mesh)
+        face_strip_insert_2(Mesh, mesh, path)
+        areas = [signed_area(mesh, fkey) for fkey in mesh.faces()]
+
+        assert mesh.number_of_faces() == 20
+        # no twisted face and no overlap
+        assert min(areas) > 0
+        assert abs(sum(areas) - 16) < 1e-9
@@ -0,0 +1,43 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+
+from compas_pattern.topology.grammar_engine import RULES
+from compas_pattern.topology.grammar_engine import random_rule_sequence
+
+
+def test_random_rule_sequences(grid):
+    for seed in range(200):
+        mesh = grid(4, PseudoQuadMesh)
+        sequence = random_rule_sequence(mesh, 20, seed = seed)
+        assert all([name in RULES for name, args in sequence])
+        assert all([vkey in mesh.vertex for fkey in mesh.faces() for vkey in mesh.face_vertices(fkey)])
+
+
+def test_random_rule_sequences_propagate(grid):
+    for seed in range(50):
+        random_rule_sequence(grid(4, PseudoQuadMesh), 10, propagate = True, seed = seed)
+
+
+def test_precondition_evaluated_once(grid):
+    rule = RULES['simple_split']
+    precondition, function = rule.precondition, rule.function
+    events = []
+
+    def counted_precondition(*args):
+        events.append(('precondition', args[1:]))
+        return precondition(*args)
+
+    def counted_function(*args):
+        events.append(('function', args[1:]))
+        return function(*args)
+
+    rule.precondition, rule.function = counted_precondition, counted_function
+    try:
+        sequence = random_rule_sequence(grid(4, PseudoQuadMesh), 5, rules = ['simple_split'], seed = 0)
+    finally:
+        rule.precondition, rule.function = precondition, function
+
+    applications = [k for k, (event, args) in enumerate(events) if event == 'function']
+    assert len(applications) == len(sequence) == 5
+    for k in applications:
+        assert events[k - 1] == ('precondition', events[k][1])
+        assert k < 2 or events[k - 2] != events[k - 1]
@@ -0,0 +1,41 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+
+from compas_pattern.topology.grammar import rotate_vertex
+from compas_pattern.topology.grammar_index import ApplicabilityIndex
+
+
+def test_repeated_rotate_vertex(grid):
+    mesh = grid(4, PseudoQuadMesh)
+    initial = sorted([sorted(mesh.face_vertices(fkey)) for fkey in mesh.faces()])
+
+    faces = []
+    for k in range(4):
+        fkeys = rotate_vertex(mesh, 12)
+        assert fkeys is not None and len(fkeys) == 4
+        faces.append(sorted([sorted(mesh.face_vertices(fkey)) for fkey in mesh.faces()]))
+        # consistent half-edges
+        assert all([mesh.halfedge[u][v] == fkey for fkey in mesh.faces() for u, v in mesh.face_halfedges(fkey)])
+        assert mesh.number_of_faces() == 16
+        assert len(mesh.vertex_neighbors(12)) == 4
+
+    assert faces[0] != initial
+    assert faces[-1] == initial
+
+
+def test_index_random_rule_sequences(grid):
+    for seed in range(100):
+        index = ApplicabilityIndex(grid(4, PseudoQuadMesh))
+        index.random_rule_sequence(10, seed = seed)
+
+
+def index_targets(index):
+    return {rule: set(index.targets(rule)) for rule in index.rules}
+
+
+def test_index_propagate_matches_rebuild(grid):
+    for seed in range(40):
+        index = ApplicabilityIndex(grid(4, PseudoQuadMesh))
+        index.random_rule_sequence(10, propagate = True, seed = seed)
+        targets = index_targets(index)
+        index.rebuild()
+        assert targets == index_targets(index), seed
@@ -0,0 +1,46 @@
+from compas_pattern.algorithms.densification import densify_quad_mesh
+from compas_pattern.algorithms.incremental_densification import DensificationCache
+
+
+def test_cache_against_dense_mesh(coarse_mesh, mesh_face_set):
+    mesh = coarse_mesh()
+    dense = densify_quad_mesh(mesh)
+    cache = DensificationCache(mesh)
+
+    assert (cache.dense.number_of_vertices(), cache.dense.number_of_faces()) == (dense.number_of_vertices(), dense.number_of_faces())
+    assert mesh_face_set(cache.dense, 3) == mesh_face_set(dense, 3)
+    assert cache.stale_faces() == []
+
+
+def test_splice_against_full_densification(coarse_mesh, mesh_face_set):
+    mesh = coarse_mesh()
+    cache = DensificationCache(mesh)
+    before = {vkey: cache.dense.vertex_coordinates(vkey) for vkey in cache.dense.vertices()}
+
+    changes = cache.change_density_parameter(1, 2)
+
+    expected = coarse_mesh()
+    expected.change_density_parameter(1, 2)
+    expected = DensificationCache(expected).dense
+
+    assert (cache.dense.number_of_vertices(), cache.dense.number_of_faces()) == (expected.number_of_vertices(), expected.number_of_faces())
+    assert mesh_face_set(cache.dense) == mesh_face_set(expected)
+    assert cache.stale_faces() == []
+
+    # only the faces crossed by the strip are densified again, and the other vertices keep their keys and positions
+    assert 0 < len(changes['faces']) < mesh.number_of_faces()
+    assert all([vkey in cache.dense.vertex for vkey in before if vkey not in changes['removed']])
+    assert all([cache.dense.vertex_coordinates(vkey) == xyz for vkey, xyz in before.items() if vkey not in changes['removed']])
+    assert set(cache.dense.vertices()) == (set(before) - set(changes['removed'])) | set(changes['added'])
+
+
+def test_prolongation(coarse_mesh):
+    mesh = coarse_mesh()
+    cache = DensificationCache(mesh)
+    weights = cache.prolongation()
+
+    assert set(weights) == set(cache.dense.vertices())
+    for vkey, vertex_weights in weights.items():
+        assert abs(sum(vertex_weights.values()) - 1.) < 1e-9
+        xyz = [sum([weight * mesh.vertex_coordinates(corner)[i] for corner, weight in vertex_weights.items()]) for i in range(3)]
+        assert all([abs(a - b) < 1e-9 for a, b in zip(xyz, cache.dense.vertex_coordinates(vkey))])
@@ -0,0 +1,59 @@
+from compas_pattern.algorithms.densification import densify_quad_mesh
+from compas_pattern.algorithms.lod_densification import DenseMeshView
+
+
+def test_view_against_dense_mesh(coarse_mesh, mesh_face_set):
+    mesh = coarse_mesh()
+    dense = densify_quad_mesh(mesh)
+    view = DenseMeshView(mesh).to_mesh()
+
+    assert (view.number_of_vertices(), view.number_of_faces()) == (dense.number_of_vertices(), dense.number_of_faces())
+    assert mesh_face_set(view, 3) == mesh_face_set(dense, 3)
+
+
+def test_view_levels_of_detail(coarse_mesh):
+    mesh = coarse_mesh()
+    view = DenseMeshView(mesh)
+
+    coarse = view.to_mesh(resolution = 1.)
+    fine = view.to_mesh(resolution = 2.)
+
+    assert fine.number_of_faces() == 4 * coarse.number_of_faces()
+    assert view.statistics()['patches'] == 2 * mesh.number_of_faces()
+
+
+def test_view_cache(coarse_mesh):
+    mesh = coarse_mesh()
+    view = DenseMeshView(mesh)
+    view.to_mesh()
+    view.to_mesh()
+
+    statistics = view.statistics()
+    assert statistics['misses'] == mesh.number_of_faces()
+    assert statistics['hits'] == mesh.number_of_faces()
+    assert statistics['faces'] == mesh.dense_mesh_size()['faces']
+
+    # the patches of the faces crossed by a strip are stale after a change of its density parameter
+    strip_faces = view.strip_faces(0)
+    mesh.change_density_parameter(0, 4)
+    view.to_mesh()
+
+    statistics = view.statistics()
+    assert statistics['misses'] == mesh.number_of_faces() + len(strip_faces)
+    assert statistics['hits'] == 2 * mesh.number_of_faces() - len(strip_faces)
+    assert statistics['faces'] == mesh.dense_mesh_size()['faces']
+
+
+def test_view_eviction(coarse_mesh):
+    mesh = coarse_mesh()
+    view = DenseMeshView(mesh, capacity = 40)
+    dense = view.to_mesh()
+
+    statistics = view.statistics()
+    assert statistics['evictions'] == mesh.number_of_faces() - statistics['patches']
+    assert statistics['faces'] <= 40
+    assert dense.number_of_faces() == mesh.dense_mesh_size()['faces']
+
+    view.clear()
+    assert view.statistics()['patches'] == 0
+    assert view.statistics()['faces'] == 0
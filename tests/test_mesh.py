@@ -0,0 +1,13 @@
+from compas_pattern.datastructures.quad_mesh import QuadMesh
+
+from compas_pattern.datastructures.mesh import delete_face
+from compas_pattern.datastructures.mesh import mesh_topology_invariants
+
+
+def test_delete_face_invalidates_topology_invariants(grid):
+    mesh = grid(3, QuadMesh)
+    assert mesh_topology_invariants(mesh)['F'] == 9
+    delete_face(mesh, 4)
+    invariants = mesh_topology_invariants(mesh)
+    assert invariants['F'] == 8
+    assert invariants['B'] == 2
@@ -0,0 +1,17 @@
+from compas.datastructures.mesh import Mesh
+
+from compas_pattern.algorithms.patterning import batch_patterning
+
+
+def test_interleaved_batches(grid):
+    operators = ['conway_dual', 'conway_ambo', 'conway_kis']
+    for kwargs in [{'processes': 0}, {'processes': 2, 'threads': True}]:
+        expected = {}
+        for n in [2, 3]:
+            expected[n] = {result['operator']: result['metrics'] for result in batch_patterning(grid(n, Mesh), operators, **kwargs)}
+
+        batches = {n: batch_patterning(grid(n, Mesh), operators, **kwargs) for n in [2, 3]}
+        for k in range(len(operators)):
+            for n in [2, 3]:
+                result = next(batches[n])
+                assert result['metrics'] == expected[n][result['operator']]
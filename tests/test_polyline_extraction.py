@@ -0,0 +1,98 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+
+from compas_pattern.topology.polyline_extraction import boundary_successors
+from compas_pattern.topology.polyline_extraction import mesh_boundaries
+from compas_pattern.topology.polyline_extraction import quad_mesh_polylines
+from compas_pattern.topology.polyline_extraction import strip_polylines
+
+
+def polyline_edges(polylines):
+    return sorted([tuple(sorted(edge)) for polyline in polylines for edge in zip(polyline[:-1], polyline[1:])])
+
+
+def test_quad_mesh_polylines(grid):
+    mesh = grid(3, PseudoQuadMesh)
+    polylines = quad_mesh_polylines(mesh)
+    assert len(polylines) == 8
+    assert polyline_edges(polylines) == sorted([tuple(sorted(edge)) for edge in mesh.edges()])
+
+
+def test_quad_mesh_polylines_with_pole(grid):
+    vertices, faces = grid(3)
+    # collapse the corner face on a pole at vertex 0
+    faces[0] = [0, 0, 5, 4]
+    mesh = PseudoQuadMesh.from_vertices_and_faces(vertices, faces)
+    polylines = quad_mesh_polylines(mesh)
+    assert [0, 0] in polylines
+    assert polyline_edges(polylines) == sorted([tuple(sorted(edge)) for edge in mesh.edges()])
+
+
+def cylinder(n, m):
+    # n x m quads around the z-axis, without boundary along the strips around the axis
+    vertices = [[x, y, z] for z in range(m + 1) for x, y in [(1, 0), (0, 1), (-1, 0), (0, -1)][:n]]
+    faces = [[i * n + j, i * n + (j + 1) % n, (i + 1) * n + (j + 1) % n, (i + 1) * n + j] for i in range(m) for j in range(n)]
+    return PseudoQuadMesh.from_vertices_and_faces(vertices, faces)
+
+
+def normalise(polyline):
+    # a polyline as a tuple of points, in a canonical direction
+    polyline = [tuple([float(x) for x in point]) for point in polyline]
+    return tuple(min(polyline, polyline[::-1]))
+
+
+def test_strip_polylines(grid):
+    polylines = strip_polylines(grid(2, PseudoQuadMesh))
+
+    expected = [[[a, b, 0.] for b in range(3)] for a in [.5, 1.5]] + [[[b, a, 0.] for b in range(3)] for a in [.5, 1.5]]
+    assert sorted([normalise(polyline) for polyline in polylines]) == sorted([normalise(polyline) for polyline in expected])
+
+
+def test_strip_polylines_with_pole(pole_mesh):
+    polylines = [normalise(polyline) for polyline in strip_polylines(pole_mesh())]
+
+    # a strip ends at the pole, another one crosses the pseudo-quad face between its edges at the pole
+    assert normalise([[0., 0., 0.], [.5, 1., 0.], [.5, 2., 0.], [.5, 3., 0.]]) in polylines
+    assert normalise([[.5, .5, 0.], [0., .5, 0.]]) in polylines
+    assert len(polylines) == 7
+
+
+def test_strip_polylines_closed():
+    polylines = strip_polylines(cylinder(4, 2))
+
+    closed = [polyline for polyline in polylines if polyline[0] == polyline[-1]]
+    assert len(polylines) == 6
+    assert len(closed) == 2
+    assert all([len(polyline) == 5 for polyline in closed])
+
+
+def cycle(boundary):
+    # a closed boundary from its smallest vertex, independent of where the loop starts
+    loop = boundary[:-1]
+    k = loop.index(min(loop))
+    return loop[k:] + loop[:k] + [loop[k]]
+
+
+def test_boundary_successors(grid):
+    mesh = grid(3, PseudoQuadMesh)
+    successor = boundary_successors(mesh)
+
+    assert sorted(successor) == sorted(mesh.vertices_on_boundary())
+    assert all([mesh.halfedge[u][v] is None for u, v in successor.items()])
+
+
+def test_mesh_boundaries(grid):
+    mesh = grid(2, PseudoQuadMesh)
+
+    assert [cycle(boundary) for boundary in mesh_boundaries(mesh)] == [[0, 3, 6, 7, 8, 5, 2, 1, 0]]
+    assert sorted(mesh_boundaries(mesh, [0, 2])) == [[0, 3, 6, 7, 8, 5, 2], [2, 1, 0]]
+    # the splits not on the boundary are ignored
+    assert mesh_boundaries(mesh, [4, 6]) == [[6, 7, 8, 5, 2, 1, 0, 3, 6]]
+
+    # inner and outer boundaries, updated after a topology change
+    mesh = grid(3, PseudoQuadMesh)
+    assert len(mesh_boundaries(mesh)) == 1
+    mesh.delete_face(4)
+    assert sorted([cycle(boundary) for boundary in mesh_boundaries(mesh)]) == [[0, 4, 8, 12, 13, 14, 15, 11, 7, 3, 2, 1, 0], [5, 6, 10, 9, 5]]
+
+    # closed boundaries of a cylinder
+    assert sorted([cycle(boundary) for boundary in mesh_boundaries(cylinder(4, 2))]) == [[0, 3, 2, 1, 0], [8, 9, 10, 11, 8]]
@@ -0,0 +1,52 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+from compas_pattern.datastructures.pseudo_quad_arrays import PseudoQuadArrays
+
+
+def test_pole_flags(pole_mesh):
+    mesh = pole_mesh()
+    arrays = PseudoQuadArrays.from_mesh(mesh)
+
+    # the pole face is stored as a triangle, without self-loops
+    assert all([arrays.halfedge_vertex[h] != arrays.halfedge_vertex[arrays.halfedge_next[h]] for h in range(arrays.number_of_halfedges())])
+    assert [arrays.vertices[u] for u in arrays.poles()] == [0]
+    assert [f for f in range(arrays.number_of_faces()) if arrays.is_face_pseudo_quad(f)] == [0]
+    assert arrays.vertices[arrays.face_pole_vertex(0)] == 0
+    assert arrays.is_pseudo_quad_mesh()
+
+    # the faces are rebuilt with the repeated poles
+    result = arrays.to_mesh(PseudoQuadMesh)
+    assert [[arrays.vertices[u] for u in result.face_vertices(f)] for f in result.faces()] == [mesh.face_vertices(fkey) for fkey in mesh.faces()]
+
+
+def test_halfedge_opposite(pole_mesh):
+    arrays = PseudoQuadArrays.from_mesh(pole_mesh())
+
+    for f in range(arrays.number_of_faces()):
+        halfedges = list(range(arrays.face_offset[f], arrays.face_offset[f + 1]))
+        p = arrays.face_pole[f]
+        if p == -1:
+            assert all([arrays.halfedge_opposite(arrays.halfedge_opposite(h)) == h for h in halfedges])
+        else:
+            # the two edges at the pole are opposite, and the edge away from the pole has no opposite
+            assert arrays.halfedge_opposite(p) == arrays.halfedge_prev[p]
+            assert arrays.halfedge_opposite(arrays.halfedge_prev[p]) == p
+            assert arrays.halfedge_opposite(arrays.halfedge_next[p]) == -1
+
+
+def test_not_pseudo_quad_mesh(grid):
+    vertices, faces = grid(2)
+    faces[0] = [0, 1, 4]
+    arrays = PseudoQuadArrays.from_mesh(PseudoQuadMesh.from_vertices_and_faces(vertices, faces))
+
+    assert not arrays.is_pseudo_quad_mesh()
+    assert all([index is None for index in arrays.vertex_classification()[3]])
+    assert arrays.singularities() == []
+
+
+def test_singularities(pole_mesh):
+    arrays = PseudoQuadArrays.from_mesh(pole_mesh())
+    valence, boundary, pole, index = arrays.vertex_classification()
+
+    assert [arrays.vertices[u] for u in arrays.singularities()] == [arrays.vertices[u] for u in range(len(index)) if index[u] != 0]
+    assert [arrays.vertices[u] for u, flag in enumerate(pole) if flag] == [0]
+    assert [index[arrays.key_index[vkey]] for vkey in [0, 1, 5, 6]] == [.5, .25, -.5, 0.]
@@ -0,0 +1,61 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+from compas_pattern.datastructures.pseudo_quad_mesh import vertex_index
+from compas_pattern.datastructures.pseudo_quad_mesh import vertex_indices
+
+
+def reference_index(mesh, vkey):
+    # the index from the neighbours of the vertex, a pole being its own neighbour
+    neighbors = mesh.vertex_neighbors(vkey)
+    boundary = mesh.is_vertex_on_boundary(vkey)
+    if vkey in neighbors:
+        return 1. / 2. if boundary else 1.
+    if boundary:
+        return 1. / 4. * (3. - len(neighbors))
+    return 1. / 4. * (4. - len(neighbors))
+
+
+def test_edges_with_pole(pole_mesh):
+    mesh = pole_mesh()
+    edges = list(mesh.edges())
+
+    assert (0, 0) in edges
+    assert len(set([frozenset(edge) for edge in edges])) == len(edges)
+    assert set([frozenset(edge) for edge in edges]) == set([frozenset((u, v)) for u in mesh.halfedge for v in mesh.halfedge[u]])
+
+    # the data is shared by both directions of an edge
+    u, v = edges[1]
+    mesh.set_edge_attribute((u, v), 'density_parameter', 7)
+    assert mesh.get_edge_attribute((v, u), 'density_parameter') == 7
+
+
+def test_to_mesh_with_non_contiguous_keys():
+    mesh = PseudoQuadMesh()
+    for vkey in [10, 20, 30, 40, 50]:
+        mesh.add_vertex(vkey, attr_dict = {'x': vkey, 'y': 0., 'z': 0.})
+    mesh.add_face([10, 20, 30, 40])
+    mesh.add_face([10, 10, 40, 50])
+
+    for result in [mesh.to_mesh(), mesh.to_mesh_2()]:
+        faces = [[result.vertex[vkey]['x'] for vkey in result.face_vertices(fkey)] for fkey in result.faces()]
+        assert sorted(faces) == [[10, 20, 30, 40], [10, 40, 50]]
+
+
+def test_poles(pole_mesh):
+    mesh = pole_mesh()
+
+    assert mesh.poles() == [0]
+    assert mesh.is_vertex_pole(0)
+    assert not any([mesh.is_vertex_pole(vkey) for vkey in mesh.vertices() if vkey != 0])
+
+
+def test_vertex_indices(grid, pole_mesh):
+    for mesh in [grid(3, PseudoQuadMesh), pole_mesh()]:
+        indices = vertex_indices(mesh)
+        assert indices == {vkey: reference_index(mesh, vkey) for vkey in mesh.vertices()}
+        assert all([vertex_index(mesh, vkey) == indices[vkey] for vkey in mesh.vertices()])
+
+    # the classification follows the topology changes
+    mesh = grid(3, PseudoQuadMesh)
+    vertex_indices(mesh)
+    mesh.delete_face(4)
+    assert vertex_indices(mesh) == {vkey: reference_index(mesh, vkey) for vkey in mesh.vertices()}
@@ -0,0 +1,34 @@
+from compas_pattern.datastructures.pseudo_quad_mesh import PseudoQuadMesh
+
+
+def test_face_normal_after_direct_coordinate_write(grid):
+    mesh = grid(2, PseudoQuadMesh)
+    assert list(mesh.face_normal(0)) == [0.0, 0.0, 1.0]
+    mesh.vertex[0]['z'] = 1.0
+    assert list(mesh.face_normal(0)) != [0.0, 0.0, 1.0]
+
+
+def test_edge_attributes_keep_topology_caches(grid):
+    mesh = grid(2, PseudoQuadMesh)
+    arrays = mesh.pseudo_quad_arrays()
+    edges = list(mesh.edges())
+    misses = mesh.cache_statistics()['misses']
+
+    mesh.set_edges_attribute('strip', 0, edges[:3])
+    mesh.set_edge_attribute(edges[0], 'density_parameter', 2)
+    assert mesh.pseudo_quad_arrays() is arrays
+    assert list(mesh.edges()) == edges
+    assert mesh.cache_statistics()['misses'] == misses
+
+    # results depending on the edge attributes are updated
+    assert sorted(mesh.strips_to_edges_dict()[0]) == sorted(edges[:3])
+    mesh.set_edge_attribute(edges[0], 'strip', 1)
+    assert mesh.strips_to_edges_dict()[1] == [edges[0]]
+
+
+def test_topology_change_flushes_caches(grid):
+    mesh = grid(2, PseudoQuadMesh)
+    arrays = mesh.pseudo_quad_arrays()
+    mesh.delete_face(0)
+    assert mesh.pseudo_quad_arrays() is not arrays
+    assert len(mesh.pseudo_quad_arrays().faces) == 3
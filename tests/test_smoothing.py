@@ -0,0 +1,162 @@
+import math
+
+import pytest
+
+from compas.geometry import mesh_smooth_area
+from compas.geometry import mesh_smooth_centroid
+
+from compas_pattern.datastructures.quad_mesh import QuadMesh
+from compas_pattern.datastructures.coarse_quad_mesh import CoarseQuadMesh
+
+from compas_pattern.algorithms.incremental_densification import DensificationCache
+from compas_pattern.algorithms.smoothing import _smooth_area_targets
+from compas_pattern.algorithms.smoothing import mesh_smooth
+from compas_pattern.algorithms.smoothing import mesh_smooth_area_local
+from compas_pattern.algorithms.smoothing import mesh_smooth_multigrid
+
+
+def residual(mesh, fixed, damping = 0.5):
+    # the largest displacement of a smoothing step on the free vertices
+    targets = _smooth_area_targets(mesh, [vkey for vkey in mesh.vertices() if vkey not in fixed])
+    return max([damping * math.sqrt(sum([(a - b) ** 2 for a, b in zip(xyz, mesh.vertex_coordinates(vkey))])) for vkey, xyz in targets.items()])
+
+
+def perturbed_grid(grid, n = 6):
+    # a grid with its interior vertices moved out of the plane and off their positions
+    mesh = grid(n, QuadMesh)
+    fixed = mesh.vertices_on_boundary()
+    for vkey in mesh.vertices():
+        if vkey not in fixed:
+            mesh.vertex[vkey]['x'] += .3 * math.sin(vkey)
+            mesh.vertex[vkey]['z'] = math.cos(vkey)
+    return mesh, fixed
+
+
+def test_smoothing_against_compas(grid):
+    for method, reference in [('area', mesh_smooth_area), ('centroid', mesh_smooth_centroid)]:
+        mesh, fixed = perturbed_grid(grid)
+        expected = mesh.copy()
+
+        history = mesh_smooth(mesh, method, fixed, kmax = 20)
+        reference(expected, fixed, kmax = 20)
+
+        assert len(history) == 20
+        assert all([abs(a - b) < 1e-9 for vkey in mesh.vertices() for a, b in zip(mesh.vertex_coordinates(vkey), expected.vertex_coordinates(vkey))]), method
+
+
+def test_smoothing_tolerance(grid):
+    mesh, fixed = perturbed_grid(grid)
+
+    history = mesh_smooth(mesh, fixed = fixed, kmax = 1000, tol = 1e-4)
+
+    assert len(history) < 1000
+    assert [record['iteration'] for record in history] == list(range(len(history)))
+    assert history[-1]['max'] < 1e-4 <= history[-2]['max']
+    assert all([record['rms'] <= record['max'] for record in history])
+
+
+def test_smoothing_callback_and_monitor(grid):
+    mesh, fixed = perturbed_grid(grid)
+
+    # the displacement includes the callback, which flattens the mesh
+    def flatten(k, args):
+        for vkey in mesh.vertices():
+            mesh.vertex[vkey]['z'] = 0.
+
+    history = mesh_smooth(mesh, fixed = fixed, kmax = 100, callback = flatten, monitor = lambda record: record['iteration'] == 4)
+
+    assert len(history) == 5
+    assert history[0]['max'] >= max([abs(math.cos(vkey)) for vkey in mesh.vertices() if vkey not in fixed])
+    assert all([mesh.vertex[vkey]['z'] == 0. for vkey in mesh.vertices()])
+
+    with pytest.raises(ValueError):
+        mesh_smooth(mesh, method = 'laplacian')
+    with pytest.raises(ValueError):
+        mesh_smooth(mesh, monitor = 1)
+
+
+def test_local_smoothing_warm_start(grid):
+    mesh = grid(4, QuadMesh)
+    # the previous positions, under other keys, of all the vertices but the last one
+    correspondence = {vkey: vkey + 100 for vkey in mesh.vertices() if vkey != 24}
+    previous = {vkey + 100: [x, y, 1.] for vkey, (x, y, z) in [(vkey, mesh.vertex_coordinates(vkey)) for vkey in mesh.vertices()]}
+
+    mesh_smooth_area_local(mesh, [12], previous, correspondence, kmax = 0)
+
+    assert all([mesh.vertex[vkey]['z'] == 1. for vkey in correspondence if vkey != 12])
+    assert mesh.vertex[12]['z'] == 0.
+    assert mesh.vertex[24]['z'] == 0.
+
+
+def test_local_smoothing_stays_local(grid):
+    mesh = grid(20, QuadMesh)
+    fixed = set(mesh.vertices_on_boundary())
+    mesh.vertex[220]['z'] = 1.
+
+    history = mesh_smooth_area_local(mesh, [220], fixed = fixed, rings = 1, kmax = 1000, tol = 1e-3)
+
+    assert residual(mesh, fixed) < 1e-3
+    assert history[-1]['vertices'] > history[0]['vertices']
+    assert history[-1]['vertices'] < (mesh.number_of_vertices() - len(fixed)) / 2
+
+
+def test_local_smoothing_extends_to_tolerance(grid):
+    mesh = grid(20, QuadMesh)
+    fixed = set(mesh.vertices_on_boundary())
+    # move a fixed vertex, which changes the smoothed positions on the whole mesh
+    mesh.vertex[10]['y'] = -5.
+
+    history = mesh_smooth_area_local(mesh, [10], fixed = fixed, rings = 1, kmax = 2000, tol = 1e-3, global_ratio = 1.)
+
+    assert history[-1]['max'] < 1e-3
+    assert residual(mesh, fixed) < 1e-3
+    assert history[-1]['vertices'] > history[0]['vertices']
+
+
+def test_local_smoothing_falls_back_to_global(grid):
+    mesh = grid(10, QuadMesh)
+    fixed = set(mesh.vertices_on_boundary())
+    mesh.vertex[5]['y'] = -2.
+
+    history = mesh_smooth_area_local(mesh, [5], fixed = fixed, rings = 1, kmax = 1000, tol = 1e-3, global_ratio = 0.)
+
+    assert history[0]['vertices'] == mesh.number_of_vertices() - len(fixed)
+    assert residual(mesh, fixed) < 1e-3
+
+
+def densification(grid):
+    # a coarse grid with raised interior vertices, densified with 6 faces per edge
+    mesh = grid(3, CoarseQuadMesh)
+    for vkey in [5, 6, 9, 10]:
+        mesh.vertex[vkey]['z'] = 1.
+    mesh.vertex[5]['x'] += .3
+    mesh.collect_strip_edge_attribute()
+    mesh.density_global_parameter(6)
+    return DensificationCache(mesh)
+
+
+def test_multigrid_convergence(grid):
+    for method in ['centroid', 'area']:
+        reference = densification(grid).dense
+        fixed = reference.vertices_on_boundary()
+        mesh_smooth(reference, method = method, fixed = fixed, kmax = 5000, tol = 1e-8)
+
+        def error(mesh):
+            return max([math.sqrt(sum([(a - b) ** 2 for a, b in zip(mesh.vertex_coordinates(vkey), reference.vertex_coordinates(vkey))])) for vkey in mesh.vertices()])
+
+        plain = densification(grid).dense
+        mesh_smooth(plain, method = method, fixed = fixed, kmax = 10)
+        multigrid = densification(grid)
+        mesh_smooth_multigrid(multigrid, method = method, fixed = fixed, coarse_kmax = 100, kmax = 10, tol = 1e-9)
+
+        assert error(multigrid.dense) < error(plain) / 5, method
+
+
+def test_multigrid_callback_validated(grid):
+    cache = densification(grid)
+    xyz = {vkey: cache.dense.vertex_coordinates(vkey) for vkey in cache.dense.vertices()}
+
+    with pytest.raises(ValueError):
+        mesh_smooth_multigrid(cache, fixed = cache.dense.vertices_on_boundary(), callback = 'not callable')
+
+    assert all([cache.dense.vertex_coordinates(vkey) == xyz[vkey] for vkey in xyz])
@@ -0,0 +1,67 @@
+import os
+import struct
+
+from compas_pattern.algorithms.densification import densify_quad_mesh
+from compas_pattern.algorithms.streaming_densification import ObjWriter
+from compas_pattern.algorithms.streaming_densification import PlyWriter
+from compas_pattern.algorithms.streaming_densification import densify_quad_mesh_stream
+
+
+def read_obj(filepath):
+    vertices, faces = [], []
+    with open(filepath) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) > 0 and parts[0] == 'v':
+                vertices.append([float(x) for x in parts[1:]])
+            elif len(parts) > 0 and parts[0] == 'f':
+                faces.append([int(i) - 1 for i in parts[1:]])
+    return vertices, faces
+
+
+def read_ply(filepath):
+    with open(filepath, 'rb') as f:
+        header = []
+        while len(header) == 0 or header[-1] != 'end_header':
+            header.append(f.readline().decode('ascii').strip())
+        binary = 'binary_little_endian' in header[1]
+        number_of_vertices = int(header[2].split()[-1])
+        number_of_faces = int(header[6].split()[-1])
+        if binary:
+            vertices = [list(struct.unpack('<ddd', f.read(24))) for i in range(number_of_vertices)]
+            faces = []
+            for i in range(number_of_faces):
+                n = struct.unpack('<B', f.read(1))[0]
+                faces.append(list(struct.unpack('<{}i'.format(n), f.read(4 * n))))
+        else:
+            lines = f.read().decode('ascii').splitlines()
+            vertices = [[float(x) for x in line.split()] for line in lines[:number_of_vertices]]
+            faces = [[int(i) for i in line.split()[1:]] for line in lines[number_of_vertices:]]
+    return vertices, faces
+
+
+def test_stream_obj_against_welded_mesh(coarse_mesh, face_set, mesh_face_set, tmpdir):
+    mesh = coarse_mesh()
+    dense = densify_quad_mesh(mesh)
+    filepath = os.path.join(str(tmpdir), 'dense.obj')
+
+    size = densify_quad_mesh_stream(mesh, ObjWriter(filepath))
+    vertices, faces = read_obj(filepath)
+
+    assert (size['vertices'], size['faces']) == (dense.number_of_vertices(), dense.number_of_faces())
+    assert (len(vertices), len(faces)) == (dense.number_of_vertices(), dense.number_of_faces())
+    # the welded mesh rounds the coordinates to three decimals
+    assert face_set(vertices, faces, 3) == mesh_face_set(dense, 3)
+    # the boundary points of the patches are released once all the faces around them are densified
+    assert size['peak_index'] < size['vertices']
+
+
+def test_stream_ply_against_welded_mesh(coarse_mesh, face_set, mesh_face_set, tmpdir):
+    mesh = coarse_mesh()
+    expected = mesh_face_set(densify_quad_mesh(mesh), 3)
+
+    for binary in [False, True]:
+        filepath = os.path.join(str(tmpdir), 'dense.ply')
+        densify_quad_mesh_stream(mesh, PlyWriter(filepath, binary = binary))
+        vertices, faces = read_ply(filepath)
+        assert face_set(vertices, faces, 3) == expected, binary